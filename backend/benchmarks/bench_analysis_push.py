@@ -0,0 +1,197 @@
+# backend/benchmarks/bench_analysis_push.py
+"""
+Database queries per completed analysis when clients wait for results by
+polling /api/v1/analysis/{id}/status vs by the /events push stream.
+
+N clients each upload a photo and wait for its analysis to complete, at most
+C at a time:
+
+  poll  - GET /status every --poll-interval seconds until it isn't processing
+  push  - read /events (Server-Sent Events) until the "completed" event
+
+The server is the real app in a child process (lifespan on, in-process job
+worker, throwaway SQLite file) with stub cloud backends: KEY_1 answers after
+--cloud-seconds but fails a third of the time (after --fail-seconds, rarely
+enough to keep its breaker closed), and KEY_2 then answers after
+--cloud-seconds. Every statement either engine executes is
+counted, so the figures include the upload and the pipeline's own writes;
+the difference between the modes is what waiting costs. "seen after" is
+upload response to the client knowing the result is ready.
+
+Run from the backend directory:
+    python -m benchmarks.bench_analysis_push --analyses 50 --concurrency 10 --poll-interval 1
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def serve(port: int, fail_seconds: float, cloud_seconds: float) -> None:
+    """Child process: the app with stub cloud backends and a query counter."""
+    import itertools
+    import logging
+    import threading
+
+    import uvicorn
+    from sqlalchemy import event
+
+    import main
+    from services.fallback_service import CloudAnalyzer
+    from services.lazy_engine import LazyEngine
+
+    calls = itertools.count()
+    result = {
+        "damages": [{"part": "Front Bumper", "damageType": "dent", "confidence": 0.9, "severity": "moderate",
+                     "estimatedCost": 5000.0, "boundingBox": {"x": 10, "y": 10, "width": 20, "height": 20}}],
+        "confidence": 0.9,
+        "totalEstimatedCost": 5000.0,
+    }
+
+    async def flaky(image, prompt):
+        if next(calls) % 3 == 0:
+            await asyncio.sleep(fail_seconds)
+            return None
+        await asyncio.sleep(cloud_seconds)
+        return result
+
+    async def answering(image, prompt):
+        await asyncio.sleep(cloud_seconds)
+        return result
+
+    logging.disable(logging.WARNING)
+    main.cloud_engine = LazyEngine("cloud", lambda: CloudAnalyzer(
+        backends=[("KEY_1", flaky), ("KEY_2", answering)], hedging=False,
+    ))
+
+    lock = threading.Lock()
+    queries = [0]
+
+    def count(*_):
+        with lock:
+            queries[0] += 1
+
+    for engine in (main.engine, main.async_engine.sync_engine):
+        event.listen(engine, "before_cursor_execute", count)
+
+    @main.app.get("/bench/queries")
+    async def bench_queries():
+        return {"queries": queries[0]}
+
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def make_photo(seed: int) -> bytes:
+    from PIL import Image
+
+    # Distinct bytes per upload, so deduplication doesn't short-circuit the pipeline
+    image = Image.new("RGB", (640, 480), ((seed * 37) % 256, (seed * 91) % 256, (seed * 53) % 256))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+async def wait_polling(client, analysis_id: str, interval: float) -> int:
+    requests = 0
+    while True:
+        response = await client.get(f"/api/v1/analysis/{analysis_id}/status")
+        requests += 1
+        if response.json()["status"] != "processing":
+            return requests
+        await asyncio.sleep(interval)
+
+
+async def wait_pushed(client, analysis_id: str) -> int:
+    async with client.stream("GET", f"/api/v1/analysis/{analysis_id}/events") as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: ") and json.loads(line[len("data: "):])["status"] != "processing":
+                return 1
+    raise RuntimeError(f"Event stream for {analysis_id} ended without a result")
+
+
+async def run_clients(base_url: str, mode: str, analyses: int, concurrency: int, interval: float) -> tuple:
+    gate = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        async def one(i: int):
+            async with gate:
+                response = await client.post(
+                    "/api/v1/analysis/upload", files={"image": (f"{i}.jpg", make_photo(i), "image/jpeg")}
+                )
+                assert response.status_code == 200, response.text
+                uploaded = time.perf_counter()
+                analysis_id = response.json()["analysisId"]
+                if mode == "poll":
+                    requests = await wait_polling(client, analysis_id, interval)
+                else:
+                    requests = await wait_pushed(client, analysis_id)
+                return requests, time.perf_counter() - uploaded
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(analyses)))
+        return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyses", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10, help="clients waiting at once")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--fail-seconds", type=float, default=0.5, help="latency of the failing first backend")
+    parser.add_argument("--cloud-seconds", type=float, default=2.0, help="latency of the answering backend")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.fail_seconds, args.cloud_seconds)
+        return
+
+    pythonpath = os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    for mode in ("poll", "push"):
+        with tempfile.TemporaryDirectory() as folder:
+            url = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+            server = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_analysis_push", "--serve", "--port", str(args.port),
+                 "--fail-seconds", str(args.fail_seconds), "--cloud-seconds", str(args.cloud_seconds)],
+                # Run in the temp folder, so the relative uploads directory is a throwaway too
+                env={**os.environ, "DATABASE_URL": url, "PYTHONPATH": pythonpath}, cwd=folder,
+            )
+            try:
+                for _ in range(600):
+                    try:
+                        if httpx.get(f"{base_url}/api/v1/health").status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        time.sleep(0.1)
+                before = httpx.get(f"{base_url}/bench/queries").json()["queries"]
+                results, seconds = asyncio.run(
+                    run_clients(base_url, mode, args.analyses, args.concurrency, args.poll_interval)
+                )
+                queries = httpx.get(f"{base_url}/bench/queries").json()["queries"] - before
+            finally:
+                server.terminate()
+                server.wait()
+
+        requests = sum(count for count, _ in results)
+        seen = [latency for _, latency in results]
+        print(
+            f"{mode}: {queries / args.analyses:6.1f} queries/analysis  "
+            f"{requests / args.analyses:5.1f} wait requests/analysis  "
+            f"seen after p50 {statistics.median(seen):5.2f}s max {max(seen):5.2f}s  "
+            f"({args.analyses / seconds:5.1f} analyses/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
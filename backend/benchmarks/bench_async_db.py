@@ -0,0 +1,144 @@
+# backend/benchmarks/bench_async_db.py
+"""
+Mixed traffic against a live server: slow claim scans alongside cheap requests
+(claim lookups and the health check), measuring the cheap requests' latency.
+
+"async" sends the scans to GET /api/v1/claims, which awaits the database
+through AsyncSession. "blocking" sends them to a benchmark-only route that runs
+the same count + page queries on a sync Session inside the async handler,
+which is how every endpoint worked before; while it runs, nothing else on the
+event loop can. "dashboard" sends them to GET /api/v1/analytics/dashboard,
+which (without the lifespan's counters row) aggregates over every claim on a
+sync session in the thread pool.
+
+The server runs in a child process (its own GIL) on a throwaway SQLite file.
+Give it more than one core: on a single CPU the scan threads, the event loop
+and the load generator all share it, and tail latency is CPU-bound either way.
+
+Run from the backend directory:
+    python -m benchmarks.bench_async_db --claims 300000 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_trends import populate
+
+# Without the app lifespan the trigram search index isn't set up, so this is an ILIKE scan
+SCAN_QUERY = "AB12"
+
+
+def serve(port: int) -> None:
+    """Child process: the app on DATABASE_URL plus the blocking comparison route."""
+    import uvicorn
+    from sqlalchemy import desc, func, or_
+
+    from main import app
+    from models.database import ClaimModel, SessionLocal
+
+    @app.get("/bench/blocking-scan")
+    async def blocking_scan():
+        scan = or_(ClaimModel.claimNumber.ilike(f"%{SCAN_QUERY}%"), ClaimModel.vehiclePlate.ilike(f"%{SCAN_QUERY}%"))
+        with SessionLocal() as db:  # sync I/O inside an async handler
+            total = db.query(func.count(ClaimModel.id)).filter(scan).scalar()
+            page = db.query(ClaimModel).filter(scan).order_by(
+                desc(ClaimModel.submittedAt), desc(ClaimModel.id)
+            ).limit(20).all()
+            return {"total": total, "data": [claim.id for claim in page]}
+
+    # lifespan off: the engines and the job worker stay idle
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+async def drive(base_url: str, scan_path: str, claim_ids: list, args) -> dict:
+    latencies = {"scan": [], "lookup": [], "health": []}
+    deadline = time.perf_counter() + args.seconds
+    limits = httpx.Limits(max_connections=args.scans + 2 * args.lookups)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def loop(kind: str, path_for):
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(path_for())
+                assert response.status_code == 200, response.text
+                latencies[kind].append(time.perf_counter() - started)
+
+        tasks = [loop("scan", lambda: scan_path) for _ in range(args.scans)]
+        tasks += [loop("lookup", lambda: f"/api/v1/claims/{random.choice(claim_ids)}") for _ in range(args.lookups)]
+        tasks += [loop("health", lambda: "/api/v1/health") for _ in range(args.lookups)]
+        await asyncio.gather(*tasks)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=300_000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--scans", type=int, default=2, help="concurrent slow scan clients")
+    parser.add_argument("--lookups", type=int, default=8, help="concurrent clients per cheap endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    from models.database import Base, ClaimModel, create_db_engine
+
+    with tempfile.TemporaryDirectory() as folder:
+        url = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+        engine = create_db_engine(url, echo=False)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        populate(Session, args.claims, 30)
+        with Session() as db:
+            claim_ids = [row[0] for row in db.query(ClaimModel.id).limit(1000)]
+        engine.dispose()
+
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_async_db", "--serve", "--port", str(args.port)],
+            env={**os.environ, "DATABASE_URL": url},
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            for _ in range(600):
+                try:
+                    if httpx.get(f"{base_url}/api/v1/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+
+            for label, scan_path in (
+                ("blocking", "/bench/blocking-scan"),
+                ("async", f"/api/v1/claims?searchQuery={SCAN_QUERY}&view=summary&limit=20"),
+                ("dashboard", "/api/v1/analytics/dashboard"),
+            ):
+                latencies = asyncio.run(drive(base_url, scan_path, claim_ids, args))
+                for kind, values in latencies.items():
+                    print(
+                        f"{label:9} {kind:7}: {len(values) / args.seconds:8.1f} req/s  "
+                        f"p50 {percentile(values, 0.5):8.2f}ms  p99 {percentile(values, 0.99):8.2f}ms"
+                    )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# backend/benchmarks/bench_bulk_claims.py
+"""
+Claim triage throughput: looping over the single-claim endpoints
+(POST /api/v1/claims, POST /api/v1/claims/{id}/approve) vs the bulk endpoints
+(POST /api/v1/claims/bulk, POST /api/v1/claims/bulk/status) in batches.
+Runs the real endpoints through TestClient against a throwaway SQLite file,
+then checks that the dashboard counters still match the claims table.
+
+Run from the backend directory:
+    python -m benchmarks.bench_bulk_claims --analyses 2000 --batch 500
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from main import app, claim_stats
+from models.database import AnalysisResultModel, Base, create_async_db_engine, create_db_engine, get_db
+
+
+def add_analyses(Session, count: int) -> list:
+    ids = [str(uuid.uuid4()) for _ in range(count)]
+    with Session() as db:
+        db.add_all(
+            AnalysisResultModel(
+                id=analysis_id, imageUrl=f"/api/v1/uploads/{analysis_id}.jpg", vehiclePlateNumber=f"MH01AB{i:04d}",
+                damages=[], overallSeverityLevel="minor", overallSeverityScore=20.0,
+                overallSeverityDescription="Minor vehicle damage detected", totalEstimatedCost=1500.0,
+                aiConfidence=0.9, processedAt=datetime.utcnow(), status="completed", engine="bench",
+            )
+            for i, analysis_id in enumerate(ids)
+        )
+        db.commit()
+    return ids
+
+
+def timed(label: str, count: int, run) -> None:
+    started = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - started
+    print(f"{label:24}: {count / seconds:9.1f} claims/s ({seconds * 1000:8.1f}ms for {count})")
+
+
+def batches(ids: list, size: int):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyses", type=int, default=2000, help="analyses per mode")
+    parser.add_argument("--batch", type=int, default=500, help="ids per bulk request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        url = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+        engine = create_db_engine(url, echo=False)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            claim_stats.backfill_counters(db)
+
+        AsyncSession = async_sessionmaker(create_async_db_engine(url, echo=False), expire_on_commit=False)
+
+        async def override_get_db():
+            async with AsyncSession() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)  # no context manager: the app's lifespan (engines, worker) isn't started
+
+        def ok(response):
+            assert response.status_code == 200, response.text
+            return response.json()
+
+        single_ids = add_analyses(Session, args.analyses)
+        timed("single create", args.analyses, lambda: [
+            ok(client.post("/api/v1/claims", params={"analysis_id": analysis_id})) for analysis_id in single_ids
+        ])
+        timed("single approve", args.analyses, lambda: [
+            ok(client.post(f"/api/v1/claims/{claim_id}/approve", json={"notes": "bench"})) for claim_id in single_ids
+        ])
+
+        bulk_ids = add_analyses(Session, args.analyses)
+        timed(f"bulk create ({args.batch}/req)", args.analyses, lambda: [
+            ok(client.post("/api/v1/claims/bulk", json={"analysisIds": batch})) for batch in batches(bulk_ids, args.batch)
+        ])
+        timed(f"bulk approve ({args.batch}/req)", args.analyses, lambda: [
+            ok(client.post("/api/v1/claims/bulk/status", json={"claimIds": batch, "action": "approve", "notes": "bench"}))
+            for batch in batches(bulk_ids, args.batch)
+        ])
+        app.dependency_overrides.clear()
+
+        with Session() as db:
+            counters, totals = claim_stats.dashboard(db), claim_stats._aggregate_totals(db)
+        for key in ("totalClaims", "pendingClaims", "approvedToday", "totalPayouts"):
+            assert counters[key] == totals[key], (key, counters[key], totals[key])
+        print(f"counters match the claims table: {counters['totalClaims']} claims, {counters['approvedToday']} approved today")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# backend/benchmarks/bench_claims_pagination.py
+"""
+GET /api/v1/claims at increasing depth: OFFSET pages vs keyset cursors, and the
+cost of the exact count vs count=estimate / count=none. Runs the real endpoint
+through TestClient against a throwaway SQLite file.
+
+Run from the backend directory:
+    python -m benchmarks.bench_claims_pagination --claims 2000000 --limit 20
+    python -m benchmarks.bench_claims_pagination --claims 2000000 --status pending
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, desc
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_trends import populate
+from main import app, claim_stats, encode_claim_cursor
+from models.database import Base, ClaimModel, create_async_db_engine, get_db
+
+
+def timed_get(client, params: dict, repeats: int) -> float:
+    """Best of `repeats`, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.get("/api/v1/claims", params=params)
+        best = min(best, time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=2_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--status", default=None, help="also filter by status (the filters must keep working)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        engine = create_engine(f"sqlite:///{os.path.join(folder, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        started = time.perf_counter()
+        populate(Session, args.claims, 365)
+        print(f"populated {args.claims} claims in {time.perf_counter() - started:.1f}s")
+        with Session() as db:
+            claim_stats.backfill_counters(db)
+
+        AsyncSession = async_sessionmaker(
+            create_async_db_engine(f"sqlite:///{os.path.join(folder, 'bench.db')}", echo=False), expire_on_commit=False,
+        )
+
+        async def override_get_db():
+            async with AsyncSession() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)  # no context manager: the app's lifespan (engines, worker) isn't started
+        summary = {"limit": args.limit, "view": "summary", **({"status": args.status} if args.status else {})}
+
+        print(f"{'page':>10} {'offset+count':>14} {'offset':>10} {'cursor':>10}")
+        depth = 1
+        while (depth - 1) * args.limit < args.claims:
+            # Cursor that a client walking page by page would hold at this depth
+            cursor = None
+            if depth > 1:
+                with Session() as db:
+                    ordered = db.query(ClaimModel)
+                    if args.status:
+                        ordered = ordered.filter(ClaimModel.status == args.status)
+                    boundary = ordered.order_by(
+                        desc(ClaimModel.submittedAt), desc(ClaimModel.id)
+                    ).offset((depth - 1) * args.limit - 1).first()
+                if boundary is None:
+                    break
+                cursor = encode_claim_cursor(boundary, "next")
+
+            offset_counted = timed_get(client, {**summary, "page": depth}, args.repeats)
+            offset_only = timed_get(client, {**summary, "page": depth, "count": "none"}, args.repeats)
+            keyset = timed_get(
+                client, {**summary, "count": "none", **({"cursor": cursor} if cursor else {})}, args.repeats
+            )
+            print(f"{depth:>10} {offset_counted:>12.1f}ms {offset_only:>8.1f}ms {keyset:>8.1f}ms")
+
+            if cursor:
+                # Both paths must return the same page
+                by_offset = client.get("/api/v1/claims", params={**summary, "page": depth, "count": "none"}).json()
+                by_cursor = client.get("/api/v1/claims", params={**summary, "count": "none", "cursor": cursor}).json()
+                assert [c["id"] for c in by_offset["data"]] == [c["id"] for c in by_cursor["data"]]
+            depth *= 10
+
+        for mode in ("exact", "estimate", "none"):
+            print(f"count={mode:9}: {timed_get(client, {**summary, 'count': mode}, args.repeats):8.1f}ms (first page)")
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# backend/benchmarks/bench_cloud_hedging.py
+"""
+Tail latency of the strict cloud chain vs hedged racing, using local stub backends.
+
+The stubs mimic Gemini KEY_1 with an occasional very slow response, plus a
+steadier KEY_2 and Groq. No network or API keys are needed.
+
+Run from the backend directory:
+    python -m benchmarks.bench_cloud_hedging --requests 300
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from services.fallback_service import CloudAnalyzer
+from services.image_preprocessing import ImagePayload
+
+STUB_IMAGE = ImagePayload(b"", "image/jpeg")
+
+
+def stub_backend(median: float, slow_rate: float, slow: float):
+    async def call(image, prompt):
+        await asyncio.sleep(slow if random.random() < slow_rate else random.uniform(0.5, 1.5) * median)
+        return {"damages": [], "confidence": 0.9}
+    return call
+
+
+def measure(analyzer: CloudAnalyzer, requests: int, concurrency: int) -> list:
+    async def run():
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with gate:
+                started = time.perf_counter()
+                await analyzer.get_analysis_async("stub.jpg", image=STUB_IMAGE)
+                return time.perf_counter() - started
+
+        return await asyncio.gather(*(one() for _ in range(requests)))
+
+    return sorted(asyncio.run(run()))
+
+
+def summary(latencies: list) -> str:
+    pick = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return f"p50 {pick(0.5):7.1f}ms  p95 {pick(0.95):7.1f}ms  p99 {pick(0.99):7.1f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8, help="analyses in flight at once")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    random.seed(0)
+    backends = [
+        ("KEY_1", stub_backend(median=0.08, slow_rate=0.03, slow=1.0)),
+        ("KEY_2", stub_backend(median=0.10, slow_rate=0.02, slow=1.0)),
+        ("GROQ", stub_backend(median=0.12, slow_rate=0.0, slow=0.0)),
+    ]
+
+    chained = CloudAnalyzer(backends=backends, hedging=False)
+    hedged = CloudAnalyzer(backends=backends, hedging=True)
+    hedged.hedge_min_samples = 10
+    hedged.hedge_default_delay = 0.2
+    hedged.hedge_min_delay = 0.05  # stub latencies are ~10x shorter than real API calls
+
+    print(f"chain  : {summary(measure(chained, args.requests, args.concurrency))}")
+    print(f"hedged : {summary(measure(hedged, args.requests, args.concurrency))}")
+    print(f"hedge stats: {hedged.hedge_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_fast_json.py
+"""
+Analysis and claim reads with FAST_JSON_RESPONSES on (bodies built from the
+rows and encoded by orjson) vs off (Pydantic models, validated against
+response_model and encoded by the stdlib), through the real endpoints:
+
+  GET /api/v1/analysis/{id}                 with --damages damages
+  GET /api/v1/analysis/{id}/with-insurance  same analysis, plus insurance details
+  GET /api/v1/claims?limit=100              a full page, each claim with its analysis
+
+The fixtures come from tests/conftest.py, shared with tests/test_fast_json.py, which checks that every
+response is identical both ways.
+
+Runs the app through TestClient against a throwaway SQLite file.
+
+Run from the backend directory:
+    python -m benchmarks.bench_fast_json --damages 2000 --claims 100
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from main import app
+from models.database import Base, create_async_db_engine, get_db
+from tests.conftest import populate
+
+
+def timed(client, url: str, fast: bool, repeats: int) -> float:
+    """Median server round trip, in milliseconds."""
+    settings.FAST_JSON_RESPONSES = fast
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--damages", type=int, default=2000, help="damages on the large analysis")
+    parser.add_argument("--claims", type=int, default=100, help="claims on the page")
+    parser.add_argument("--repeats", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        url = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        populate(sessionmaker(bind=engine), args.damages, args.claims)
+
+        AsyncSession = async_sessionmaker(create_async_db_engine(url, echo=False), expire_on_commit=False)
+
+        async def override_get_db():
+            async with AsyncSession() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)  # no context manager: the app's lifespan (engines, worker) isn't started
+
+        page = f"/api/v1/claims?limit={min(args.claims, 100)}"
+        for label, path in (
+            (f"analysis, {args.damages} damages", "/api/v1/analysis/big"),
+            (f"with-insurance, {args.damages} damages", "/api/v1/analysis/big/with-insurance"),
+            (f"claims page, {min(args.claims, 100)} rows", page),
+        ):
+            slow = timed(client, path, False, args.repeats)
+            fast = timed(client, path, True, args.repeats)
+            print(f"{label:32}: pydantic {slow:8.2f}ms  fast {fast:8.2f}ms  ({slow / fast:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
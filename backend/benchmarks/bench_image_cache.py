@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_image_cache.py
+"""
+Bytes served for /api/v1/uploads/{filename} when a dashboard shows the same
+images over and over. Three clients view N images V times each:
+
+  refetch     - ignores caching headers and downloads every time (what every
+                view cost before uploads had validators)
+  revalidate  - keeps the ETag and sends If-None-Match (a browser with
+                max-age expired, or a "reload"), getting 304s
+  immutable   - honours Cache-Control: immutable and only downloads once
+
+Runs the real endpoint through TestClient on generated JPEGs in a temp folder.
+
+Run from the backend directory:
+    python -m benchmarks.bench_image_cache --images 20 --views 10
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from main import app
+
+
+def make_jpeg(rng: random.Random, width: int, height: int) -> bytes:
+    # Noise keeps the JPEG close to a phone photo's size for its resolution
+    image = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def run(client, label: str, urls: list, views: int) -> None:
+    cache = {}  # url -> etag
+    requests = served = 0
+    started = time.perf_counter()
+    for _ in range(views):
+        for url in urls:
+            if label == "immutable" and url in cache:
+                continue
+            headers = {"If-None-Match": cache[url]} if label == "revalidate" and url in cache else {}
+            response = client.get(url, headers=headers)
+            assert response.status_code in (200, 304), response.status_code
+            requests += 1
+            served += len(response.content)
+            cache[url] = response.headers["etag"]
+    seconds = time.perf_counter() - started
+    print(f"{label:10}: {requests:6} requests  {served / 1024 / 1024:9.1f}MB served  {seconds * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--views", type=int, default=10, help="times each image is shown")
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as folder:
+        # UPLOADS_DIR is relative, so the endpoint serves from the temp folder
+        os.chdir(folder)
+        os.makedirs("uploads")
+        urls = []
+        for i in range(args.images):
+            filename = f"bench-{i}.jpg"
+            with open(os.path.join("uploads", filename), "wb") as f:
+                f.write(make_jpeg(rng, args.width, args.height))
+            urls.append(f"/api/v1/uploads/{filename}")
+
+        client = TestClient(app)  # no context manager: the app's lifespan (engines, worker) isn't started
+        for label in ("refetch", "revalidate", "immutable"):
+            run(client, label, urls, args.views)
+
+
+if __name__ == "__main__":
+    main()
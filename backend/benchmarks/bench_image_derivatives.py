@@ -0,0 +1,105 @@
+# backend/benchmarks/bench_image_derivatives.py
+"""
+Bytes and latency of one page of claim previews: a ledger/dashboard page
+showing N uploads, each a full-size phone photo.
+
+  original      - /api/v1/uploads/{name}, the full photo (what previews cost
+                  before derivatives)
+  thumb cold    - ?width=320 with an empty derivative cache: every preview is
+                  resized on this request
+  thumb warm    - ?width=320 again, served from the cache (also what every
+                  page costs when DERIVATIVE_ON_INGEST made them in the worker)
+  medium warm   - ?width=1280, the dashboard's image viewer
+  jpeg warm     - ?width=320&format=jpeg, for clients without WebP
+
+Photos are synthetic (smooth shapes plus sensor-like grain) so they compress
+like a real photo rather than like noise. Latency is the server time for the
+whole page through TestClient, requests sent one after another; "on the wire"
+adds the time to transfer the page's bytes at --mbps.
+
+Run from the backend directory:
+    python -m benchmarks.bench_image_derivatives --images 25 --width 4032 --height 3024
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from PIL import Image, ImageFilter
+
+from main import app, derivative_cache
+
+
+def make_photo(rng: random.Random, width: int, height: int) -> bytes:
+    # Low-frequency colour blobs scaled up, plus fine grain, saved as a camera would
+    base = Image.frombytes("RGB", (16, 12), rng.randbytes(16 * 12 * 3)).resize((width, height), Image.BICUBIC)
+    grain = Image.effect_noise((width, height), 24).convert("RGB")
+    image = Image.blend(base, grain, 0.12).filter(ImageFilter.SMOOTH)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def load_page(client, urls: list, query: str, rounds: int) -> tuple:
+    """(bytes per page, median page ms) over `rounds` loads of every URL."""
+    timings = []
+    served = 0
+    for _ in range(rounds):
+        served = 0
+        started = time.perf_counter()
+        for url in urls:
+            response = client.get(url + query)
+            assert response.status_code == 200, response.text
+            served += len(response.content)
+        timings.append((time.perf_counter() - started) * 1000)
+    return served, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=25, help="previews on the page")
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--rounds", type=int, default=3, help="page loads per warm measurement")
+    parser.add_argument("--mbps", type=float, default=20.0, help="client bandwidth for the on-the-wire estimate")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as folder:
+        # UPLOADS_DIR and the cache directory are relative, so both live in the temp folder
+        os.chdir(folder)
+        os.makedirs("uploads")
+        urls = []
+        for i in range(args.images):
+            filename = f"bench-{i}.jpg"
+            with open(os.path.join("uploads", filename), "wb") as f:
+                f.write(make_photo(rng, args.width, args.height))
+            urls.append(f"/api/v1/uploads/{filename}")
+
+        client = TestClient(app)  # no context manager: the app's lifespan (engines, worker) isn't started
+        results = [
+            ("original", *load_page(client, urls, "", args.rounds)),
+            ("thumb cold", *load_page(client, urls, "?width=320", 1)),
+            ("thumb warm", *load_page(client, urls, "?width=320", args.rounds)),
+        ]
+        for label, query in (("medium warm", "?width=1280"), ("jpeg warm", "?width=320&format=jpeg")):
+            load_page(client, urls, query, 1)  # fill the cache first
+            results.append((label, *load_page(client, urls, query, args.rounds)))
+
+        original_bytes, original_ms = results[0][1], results[0][2]
+        print(f"{args.images} previews of {args.width}x{args.height} photos")
+        for label, served, ms in results:
+            wire_ms = ms + served * 8 / (args.mbps * 1e6) * 1000
+            print(
+                f"{label:12}: {served / 1024:9.0f}KB/page ({served / original_bytes:6.1%})  "
+                f"server {ms:8.1f}ms/page ({ms / original_ms:6.1%})  on the wire {wire_ms / 1000:6.2f}s"
+            )
+        print(f"cache: {derivative_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
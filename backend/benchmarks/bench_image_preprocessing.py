@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_image_preprocessing.py
+"""
+Bytes sent to the cloud, and local CPU time, for the old read-per-engine path
+vs the decode-once preprocessing stage.
+
+Old path: Gemini reads the file, Groq reads and base64-encodes it, and YOLO
+decodes the full-resolution file. New path: PreparedImage decodes it once and
+builds each engine's payload.
+
+Run from the backend directory (synthesises a 12MP phone photo unless --image is given):
+    python -m benchmarks.bench_image_preprocessing --uplink-mbps 20
+"""
+import argparse
+import base64
+import io
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from services.image_preprocessing import PreparedImage
+
+
+def synthetic_photo(path: str):
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, 4000)[None, :, None] * np.ones((3000, 1, 3))
+    pixels = (gradient + rng.normal(0, 12, (3000, 4000, 3))).clip(0, 255).astype(np.uint8)
+    Image.fromarray(pixels).save(path, "JPEG", quality=92)
+
+
+def old_path(path: str):
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        gemini_bytes = f.read()
+    with open(path, "rb") as f:
+        groq_b64 = base64.b64encode(f.read())
+    cv2.imread(path)  # what ultralytics does with a path
+    return time.perf_counter() - started, len(gemini_bytes), len(groq_b64)
+
+
+def new_path(path: str):
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        prepared = PreparedImage(f.read())
+    groq_url = prepared.cloud.data_url()
+    return time.perf_counter() - started, len(prepared.cloud.data), len(groq_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", help="photo to measure (default: synthetic 4000x3000 JPEG)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--uplink-mbps", type=float, default=20.0, help="server uplink used to estimate upload time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = args.image
+        if not path:
+            path = os.path.join(folder, "photo.jpg")
+            synthetic_photo(path)
+
+        old = [old_path(path) for _ in range(args.runs)]
+        new = [new_path(path) for _ in range(args.runs)]
+
+    bytes_per_second = args.uplink_mbps * 1_000_000 / 8
+    for name, runs in (("old", old), ("new", new)):
+        cpu = sorted(run[0] for run in runs)[len(runs) // 2] * 1000
+        gemini, groq = runs[0][1], runs[0][2]
+        upload_ms = gemini / bytes_per_second * 1000
+        print(
+            f"{name}: local prep {cpu:7.1f}ms | Gemini payload {gemini / 1024:8.1f} KiB "
+            f"(~{upload_ms:6.1f}ms at {args.uplink_mbps:g} Mbps) | Groq payload {groq / 1024:8.1f} KiB"
+        )
+    saved = old[0][1] - new[0][1]
+    print(f"saved per cloud call: {saved / 1024:.1f} KiB, ~{saved / bytes_per_second * 1000:.1f}ms of upload")
+
+
+if __name__ == "__main__":
+    main()
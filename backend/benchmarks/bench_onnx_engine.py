@@ -0,0 +1,161 @@
+# backend/benchmarks/bench_onnx_engine.py
+"""
+Latency, peak RSS and detection parity of the local engines:
+ultralytics/torch vs ONNX Runtime (fp32) vs ONNX Runtime (dynamic INT8).
+
+Each engine runs in its own subprocess so peak RSS isn't shared. Parity
+matches every ONNX box to a torch box of the same class at IoU >= 0.5.
+Point --images-dir at real vehicle photos for a meaningful parity check;
+random noise mostly yields no detections.
+
+Run from the backend directory:
+    python -m benchmarks.bench_onnx_engine --images-dir ../samples --repeats 3
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ENGINES = ("torch", "onnx", "onnx-int8")
+
+
+def load_images(images_dir: str, count: int, size: int) -> list:
+    if images_dir:
+        paths = sorted(glob.glob(os.path.join(images_dir, "*.jp*g")) + glob.glob(os.path.join(images_dir, "*.png")))
+        return [cv2.imread(path) for path in paths[:count]]
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (size, size, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def build_engine(name: str):
+    if name == "torch":
+        from services.yolo_service import LocalAnalyzer
+        return LocalAnalyzer()
+    from services.onnx_service import OnnxAnalyzer
+    return OnnxAnalyzer(quantize=name == "onnx-int8")
+
+
+def as_list(values) -> list:
+    values = values.cpu().numpy() if hasattr(values, "cpu") else np.asarray(values)
+    return values.tolist()
+
+
+def run_child(args) -> None:
+    """Measure one engine and print its results as JSON."""
+    images = load_images(args.images_dir, args.images, args.size)
+
+    started = time.perf_counter()
+    engine = build_engine(args.child)
+    load_seconds = time.perf_counter() - started
+    engine.warm_up()
+
+    latencies, detections = [], []
+    for repeat in range(args.repeats):
+        for image in images:
+            started = time.perf_counter()
+            result = engine.infer(image)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if repeat == 0:
+                boxes = result.boxes if result is not None else None
+                detections.append({
+                    "xyxy": as_list(boxes.xyxy) if boxes is not None else [],
+                    "conf": as_list(boxes.conf) if boxes is not None else [],
+                    "cls": as_list(boxes.cls) if boxes is not None else [],
+                })
+
+    latencies.sort()
+    print(json.dumps({
+        "loadSeconds": load_seconds,
+        "p50Ms": latencies[len(latencies) // 2],
+        "p95Ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "peakRssMb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "detections": detections,
+    }))
+
+
+def iou(a, b) -> float:
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def parity(reference: list, candidate: list) -> dict:
+    """Greedy same-class matching at IoU >= 0.5 between two engines' detections."""
+    matched = ref_total = cand_total = 0
+    conf_diffs, ious = [], []
+    for ref, cand in zip(reference, candidate):
+        ref_total += len(ref["conf"])
+        cand_total += len(cand["conf"])
+        used = set()
+        for box, conf, cls in zip(cand["xyxy"], cand["conf"], cand["cls"]):
+            best, best_iou = None, 0.5
+            for j, (ref_box, ref_cls) in enumerate(zip(ref["xyxy"], ref["cls"])):
+                if j in used or ref_cls != cls:
+                    continue
+                overlap = iou(box, ref_box)
+                if overlap >= best_iou:
+                    best, best_iou = j, overlap
+            if best is not None:
+                used.add(best)
+                matched += 1
+                ious.append(best_iou)
+                conf_diffs.append(abs(conf - ref["conf"][best]))
+    return {
+        "recall": matched / ref_total if ref_total else 1.0,
+        "precision": matched / cand_total if cand_total else 1.0,
+        "meanIoU": sum(ious) / len(ious) if ious else None,
+        "maxConfDiff": max(conf_diffs) if conf_diffs else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images-dir", default="")
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--size", type=int, default=640, help="synthetic image size")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--child", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    results = {}
+    for name in args.engines.split(","):
+        command = [
+            sys.executable, "-m", "benchmarks.bench_onnx_engine", "--child", name,
+            "--images", str(args.images), "--size", str(args.size), "--repeats", str(args.repeats),
+        ]
+        if args.images_dir:
+            command += ["--images-dir", args.images_dir]
+        proc = subprocess.run(command, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{name:10}: failed - {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            continue
+        results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    for name, r in results.items():
+        print(
+            f"{name:10}: load {r['loadSeconds']:6.2f}s  p50 {r['p50Ms']:8.2f}ms  "
+            f"p95 {r['p95Ms']:8.2f}ms  peak RSS {r['peakRssMb']:7.1f}MB"
+        )
+
+    if "torch" in results:
+        for name in results:
+            if name != "torch":
+                print(f"parity {name} vs torch: {parity(results['torch']['detections'], results[name]['detections'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# backend/benchmarks/bench_result_writer.py
+"""
+Completed analyses per second with per-analysis commits vs the group-commit
+ResultWriter, while API-style writers (one claim per transaction, like the
+upload and claim endpoints) commit alongside. Worker threads hand finished
+cloud results (a few damages each, so damage_assessments rows are written too)
+to the writer as fast as they can; "api" latency is for the concurrent claim
+commits.
+
+Run from the backend directory:
+    python -m benchmarks.bench_result_writer --analyses 3000 --workers 16
+    python -m benchmarks.bench_result_writer --synchronous FULL
+"""
+import argparse
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy.orm import sessionmaker
+
+from main import format_and_save_result
+from models.database import AnalysisResultModel, Base, ClaimModel, ClaimStatus, create_db_engine, sqlite_pragmas
+from services.result_writer import ResultWriter
+
+CLOUD_RESULT = {
+    "damages": [
+        {"part": part, "damageType": "dent", "confidence": 0.9, "estimatedCost": 4500,
+         "boundingBox": {"x": 10, "y": 20, "width": 100, "height": 80}, "severity": "moderate"}
+        for part in ("Front Bumper", "Hood", "Left Door")
+    ],
+    "confidence": 0.88,
+    "overallSeverity": "moderate",
+}
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def run(label: str, group_commit: bool, args) -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        engine = create_db_engine(
+            f"sqlite:///{os.path.join(folder, 'bench.db')}", echo=False,
+            pragmas={**sqlite_pragmas(), "synchronous": args.synchronous},
+        )
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        ids = [str(uuid.uuid4()) for _ in range(args.analyses)]
+        with Session() as db:
+            db.add_all(
+                AnalysisResultModel(
+                    id=analysis_id, status="processing", aiConfidence=0.0, overallSeverityLevel="minor",
+                    overallSeverityScore=0.0, overallSeverityDescription="Analyzing damage...",
+                )
+                for analysis_id in ids
+            )
+            db.commit()
+
+        writer = ResultWriter(
+            session_factory=Session, enabled=group_commit, max_batch=args.max_batch, max_delay_ms=args.max_delay_ms,
+        )
+        pending = queue.Queue()
+        for analysis_id in ids:
+            pending.put(analysis_id)
+        done = threading.Event()
+        lock = threading.Lock()
+        latencies = {"result": [], "api": []}
+
+        def worker():
+            while True:
+                try:
+                    analysis_id = pending.get_nowait()
+                except queue.Empty:
+                    return
+                started = time.perf_counter()
+                writer.write(analysis_id, lambda db_analysis, db: format_and_save_result(
+                    db_analysis, CLOUD_RESULT, "Cloud-Neural-Engine", db,
+                ))
+                with lock:
+                    latencies["result"].append(time.perf_counter() - started)
+
+        def api_writer():
+            while not done.is_set():
+                started = time.perf_counter()
+                with Session() as db:
+                    db.add(ClaimModel(
+                        id=str(uuid.uuid4()), claimNumber=f"BENCH-{uuid.uuid4().hex}", vehiclePlate="MH01AB0001",
+                        submittedAt=datetime.utcnow(), status=ClaimStatus.pending, aiConfidence=0.9, totalPayout=1000.0,
+                    ))
+                    db.commit()
+                with lock:
+                    latencies["api"].append(time.perf_counter() - started)
+
+        api_threads = [threading.Thread(target=api_writer) for _ in range(args.api_writers)]
+        workers = [threading.Thread(target=worker) for _ in range(args.workers)]
+        for thread in api_threads:
+            thread.start()
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        seconds = time.perf_counter() - started
+        done.set()
+        for thread in api_threads:
+            thread.join()
+        writer.close()
+
+        with Session() as db:
+            completed = db.query(AnalysisResultModel).filter(AnalysisResultModel.status == "completed").count()
+        assert completed == args.analyses, (completed, args.analyses)
+        engine.dispose()
+
+        stats = writer.stats()
+        print(
+            f"{label:13}: {args.analyses / seconds:8.1f} analyses/s  "
+            f"result p50 {percentile(latencies['result'], 0.5):7.2f}ms p99 {percentile(latencies['result'], 0.99):8.2f}ms  "
+            f"api {len(latencies['api']) / seconds:7.1f} commits/s p99 {percentile(latencies['api'], 0.99):8.2f}ms  "
+            f"avg batch {stats['avgBatchSize']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyses", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=16, help="threads finishing analyses")
+    parser.add_argument("--api-writers", type=int, default=2, help="concurrent claim writers")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=5)
+    parser.add_argument("--synchronous", default="NORMAL", help="SQLite synchronous pragma (NORMAL or FULL)")
+    args = parser.parse_args()
+
+    run("per-analysis", False, args)
+    run("group commit", True, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# backend/benchmarks/bench_sqlite_pragmas.py
+"""
+Concurrent writers and readers on SQLite: the default rollback journal vs the
+tuned connection pragmas from the settings (WAL, synchronous=NORMAL, busy
+timeout, cache, mmap). Writers commit one claim per transaction, like the API
+and the job worker; readers page through the claims list.
+
+Run from the backend directory:
+    python -m benchmarks.bench_sqlite_pragmas --writers 4 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import desc
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_trends import populate
+from models.database import Base, ClaimModel, ClaimStatus, create_db_engine, sqlite_pragmas
+
+# What a fresh sqlite3 connection does without any pragmas (5s lock wait from the driver)
+DEFAULT_PRAGMAS = {"busy_timeout": 5000}
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def run(label: str, pragmas: dict, args) -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        engine = create_db_engine(f"sqlite:///{os.path.join(folder, 'bench.db')}", echo=False, pragmas=pragmas)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        populate(Session, args.claims, 30)
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        results = {"write": [], "read": [], "errors": 0}
+
+        def record(kind: str, seconds: float):
+            with lock:
+                results[kind].append(seconds)
+
+        def writer():
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    with Session() as db:
+                        db.add(ClaimModel(
+                            id=str(uuid.uuid4()), claimNumber=f"BENCH-{uuid.uuid4().hex}", vehiclePlate="MH01AB0001",
+                            submittedAt=datetime.utcnow(), status=ClaimStatus.pending, aiConfidence=0.9, totalPayout=1000.0,
+                        ))
+                        db.commit()
+                    record("write", time.perf_counter() - started)
+                except OperationalError:
+                    with lock:
+                        results["errors"] += 1
+
+        def reader():
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    with Session() as db:
+                        db.query(ClaimModel).order_by(
+                            desc(ClaimModel.submittedAt), desc(ClaimModel.id)
+                        ).limit(20).all()
+                    record("read", time.perf_counter() - started)
+                except OperationalError:
+                    with lock:
+                        results["errors"] += 1
+
+        threads = [threading.Thread(target=writer) for _ in range(args.writers)]
+        threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+        print(
+            f"{label:8}: writes {len(results['write']) / args.seconds:8.1f}/s "
+            f"(p50 {percentile(results['write'], 0.5):7.2f}ms, p99 {percentile(results['write'], 0.99):8.2f}ms)  "
+            f"reads {len(results['read']) / args.seconds:8.1f}/s "
+            f"(p50 {percentile(results['read'], 0.5):7.2f}ms, p99 {percentile(results['read'], 0.99):8.2f}ms)  "
+            f"lock errors {results['errors']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=50_000, help="rows present before the run")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    run("default", DEFAULT_PRAGMAS, args)
+    run("tuned", sqlite_pragmas(), args)
+
+
+if __name__ == "__main__":
+    main()
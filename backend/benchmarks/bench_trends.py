@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_trends.py
+"""
+Claims trend over a large ledger: the old per-day count() loop vs one grouped
+query vs reading the daily rollup table. Runs against a throwaway SQLite file.
+
+Run from the backend directory:
+    python -m benchmarks.bench_trends --claims 1000000 --days 365
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base, ClaimModel, ClaimStatus
+from services.claim_stats import ClaimStats
+
+STATUSES = [ClaimStatus.pending, ClaimStatus.approved, ClaimStatus.rejected, ClaimStatus.under_review]
+
+
+def populate(Session, claims: int, days: int) -> None:
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    table = ClaimModel.__table__
+    with Session() as db:
+        for start in range(0, claims, 50_000):
+            rows = []
+            for i in range(start, min(start + 50_000, claims)):
+                submitted = now - timedelta(seconds=rng.randint(0, days * 86400))
+                rows.append({
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "claimNumber": f"CLM-{i:08d}",
+                    "vehiclePlate": f"MH{i % 100:02d}AB{i % 10000:04d}",
+                    "submittedAt": submitted,
+                    "processedAt": submitted + timedelta(hours=rng.randint(1, 72)),
+                    "status": rng.choice(STATUSES),
+                    "totalPayout": rng.uniform(1000, 100000),
+                    "aiConfidence": rng.uniform(0.5, 1.0),
+                })
+            db.execute(table.insert(), rows)
+            db.commit()
+
+
+def legacy_trend(db, days: int) -> list:
+    """The previous implementation: three count() queries per day."""
+    trends = []
+    for i in range(days):
+        day = datetime.utcnow() - timedelta(days=i)
+        start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
+        in_day = and_(ClaimModel.submittedAt >= start, ClaimModel.submittedAt <= end)
+        trends.append({
+            "date": day.strftime("%Y-%m-%d"),
+            "claims": db.query(ClaimModel).filter(in_day).count(),
+            "approved": db.query(ClaimModel).filter(in_day, ClaimModel.status == ClaimStatus.approved).count(),
+            "rejected": db.query(ClaimModel).filter(in_day, ClaimModel.status == ClaimStatus.rejected).count(),
+        })
+    return list(reversed(trends))
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--skip-legacy", action="store_true", help="the old loop takes minutes at 1M rows")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        engine = create_engine(f"sqlite:///{os.path.join(folder, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        _, seconds = timed(populate, Session, args.claims, args.days)
+        print(f"populated {args.claims} claims in {seconds:.1f}s")
+
+        grouped, rollup = ClaimStats(use_rollup=False), ClaimStats(use_rollup=True)
+        with Session() as db:
+            _, seconds = timed(rollup.backfill, db)
+            print(f"rollup backfill   : {seconds * 1000:10.1f}ms")
+
+            new, seconds = timed(grouped.trend, db, args.days)
+            print(f"grouped query     : {seconds * 1000:10.1f}ms")
+            from_rollup, seconds = timed(rollup.trend, db, args.days)
+            print(f"daily rollup      : {seconds * 1000:10.1f}ms")
+            assert new == from_rollup, "rollup disagrees with the grouped query"
+
+            if not args.skip_legacy:
+                old, seconds = timed(legacy_trend, db, args.days)
+                print(f"per-day loop      : {seconds * 1000:10.1f}ms ({args.days * 3} queries)")
+                assert old == new, "grouped query disagrees with the per-day loop"
+
+            # Cost of keeping the rollup current on the write path
+            claims = db.query(ClaimModel).limit(1000).all()
+            started = time.perf_counter()
+            for claim in claims:
+                before = rollup.snapshot(claim)
+                claim.status = ClaimStatus.approved if before.status != ClaimStatus.approved else ClaimStatus.rejected
+                rollup.claim_changed(db, claim, before)
+            db.commit()
+            print(f"rollup upkeep     : {(time.perf_counter() - started) / len(claims) * 1000:10.3f}ms per status change")
+            assert rollup.trend(db, args.days) == grouped.trend(db, args.days), "rollup drifted after updates"
+
+
+if __name__ == "__main__":
+    main()
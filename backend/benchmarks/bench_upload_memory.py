@@ -0,0 +1,129 @@
+# backend/benchmarks/bench_upload_memory.py
+"""
+Server memory under concurrent large uploads: N clients POST a large photo to
+/api/v1/analysis/upload at once, in several rounds, and the server's peak RSS
+(VmHWM) growth is reported per round.
+
+"streaming" is the real endpoint, which copies the spooled part to disk a
+chunk at a time. "buffered" is a benchmark-only route that does what the
+endpoint did before: image.read() of the whole file, then a blocking write on
+the event loop. Streaming should cost a fixed amount per upload in flight
+(Starlette's 1MB in-memory spool plus one UPLOAD_CHUNK_SIZE chunk) whatever
+the photo size; buffered holds every photo whole. Run it with two --size-mb
+values to see the difference. On a single core the blocking writes partly
+serialize the buffered uploads, which understates their peak.
+
+Each mode gets its own server process (peak RSS only goes up) on a throwaway
+SQLite file and uploads directory; the job worker is off, so uploads are only
+stored and queued. Linux only (reads /proc).
+
+Run from the backend directory:
+    python -m benchmarks.bench_upload_memory --concurrency 10 25 50 --size-mb 9.5
+    python -m benchmarks.bench_upload_memory --concurrency 50 --size-mb 3
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def serve(port: int) -> None:
+    """Child process: the app, plus the buffered comparison route."""
+    import uuid
+
+    import uvicorn
+    from fastapi import File, UploadFile
+
+    from main import app
+
+    @app.post("/bench/buffered-upload")
+    async def buffered_upload(image: UploadFile = File(...)):
+        content = await image.read()  # whole file in memory
+        with open(os.path.join("uploads", f"{uuid.uuid4()}.jpg"), "wb") as f:
+            f.write(content)
+        return {"size": len(content)}
+
+    # lifespan off: the engines and the job worker stay idle
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def upload_round(base_url: str, path: str, photo: bytes, concurrency: int) -> float:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        async def one():
+            response = await client.post(path, files={"image": ("photo.jpg", photo, "image/jpeg")})
+            assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 25, 50])
+    parser.add_argument("--size-mb", type=float, default=9.5, help="photo size (must fit MAX_UPLOAD_SIZE)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--serve", choices=("streaming", "buffered"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    # JPEG signature + incompressible filler; nothing decodes it since the worker is off
+    photo = b"\xff\xd8\xff\xe0" + os.urandom(int(args.size_mb * 1024 * 1024) - 4)
+    pythonpath = os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))
+
+    from models.database import Base, create_db_engine
+
+    for mode, path in (("buffered", "/bench/buffered-upload"), ("streaming", "/api/v1/analysis/upload")):
+        with tempfile.TemporaryDirectory() as folder:
+            url = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+            engine = create_db_engine(url, echo=False)
+            Base.metadata.create_all(engine)
+            engine.dispose()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_upload_memory", "--serve", mode, "--port", str(args.port)],
+                # Run in the temp folder, so the relative uploads directory is a throwaway too
+                env={**os.environ, "DATABASE_URL": url, "PYTHONPATH": pythonpath}, cwd=folder,
+            )
+            base_url = f"http://127.0.0.1:{args.port}"
+            try:
+                for _ in range(600):
+                    try:
+                        if httpx.get(f"{base_url}/api/v1/health").status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        time.sleep(0.1)
+                # One upload first, so imports and pools aren't counted as upload memory
+                asyncio.run(upload_round(base_url, path, photo, 1))
+                baseline = peak_rss_mb(server.pid)
+                print(f"{mode}: baseline peak RSS {baseline:.0f}MB")
+                for concurrency in args.concurrency:
+                    seconds = asyncio.run(upload_round(base_url, path, photo, concurrency))
+                    peak = peak_rss_mb(server.pid)
+                    print(
+                        f"{mode:9} x{concurrency:<4}: peak RSS {peak:7.0f}MB (+{peak - baseline:5.0f}MB)  "
+                        f"{concurrency * args.size_mb / seconds:7.1f}MB/s"
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# backend/benchmarks/bench_yolo_batching.py
+"""
+Throughput of the one-image YOLO path vs the micro-batching queue.
+
+Run from the backend directory:
+    python -m benchmarks.bench_yolo_batching --images 64 --clients 16
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from services.yolo_service import LocalAnalyzer, YoloBatchQueue
+
+
+def make_images(count: int, size: int, folder: str) -> list:
+    paths = []
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        path = os.path.join(folder, f"bench_{i}.jpg")
+        cv2.imwrite(path, rng.integers(0, 255, (size, size, 3), dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+def run(detect, paths: list, clients: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(detect, paths))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent callers")
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--batch", type=int, default=8, help="max batch size")
+    parser.add_argument("--window-ms", type=int, default=25)
+    args = parser.parse_args()
+
+    analyzer = LocalAnalyzer()
+    with tempfile.TemporaryDirectory() as folder:
+        paths = make_images(args.images, args.size, folder)
+        analyzer.detect(paths[0])  # warm-up
+
+        # A single YOLO model is not safe to call from several threads at once,
+        # so the one-image path is measured one call at a time.
+        single = run(analyzer.detect, paths, 1)
+        batcher = YoloBatchQueue(analyzer, max_batch_size=args.batch, window_ms=args.window_ms)
+        batched = run(batcher.detect, paths, args.clients)
+
+    print(f"one-image path : {args.images / single:8.2f} img/s ({single:.2f}s)")
+    print(f"batched queue  : {args.images / batched:8.2f} img/s ({batched:.2f}s)")
+    print(f"batch stats    : {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
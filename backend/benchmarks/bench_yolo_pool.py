@@ -0,0 +1,65 @@
+# backend/benchmarks/bench_yolo_pool.py
+"""
+Throughput of the process-pool YOLO mode as the number of worker processes grows.
+
+Images are handed over as decoded arrays (the shared-memory path). The
+in-process LocalAnalyzer, called one image at a time, is the baseline.
+
+Run from the backend directory:
+    python -m benchmarks.bench_yolo_pool --images 64 --max-workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from services.yolo_pool import YoloProcessPool
+from services.yolo_service import LocalAnalyzer
+
+
+def make_images(count: int, size: int) -> list:
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (size, size, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def run(detect, images: list, clients: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(detect, images))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    images = make_images(args.images, args.size)
+
+    analyzer = LocalAnalyzer()
+    analyzer.detect(images[0])  # warm-up
+    baseline = run(analyzer.detect, images, 1)
+    print(f"cores available    : {os.cpu_count()}")
+    print(f"in-process (1 call): {args.images / baseline:8.2f} img/s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        pool = YoloProcessPool(workers)
+        pool.warm_up()
+        pool.detect(images[0])
+        elapsed = run(pool.detect, images, workers * 2)
+        throughput = args.images / elapsed
+        print(
+            f"pool x{workers:<3}           : {throughput:8.2f} img/s "
+            f"({throughput * baseline / args.images:.2f}x baseline, p95 {pool.stats()['latencyMs']['p95']}ms)"
+        )
+        pool.close()
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
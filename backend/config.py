@@ -12,6 +12,20 @@ class Settings:
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./autoguard_ai.db")
+    DB_ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
+    
+    # SQLite connection pragmas (applied on every new connection)
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")  # readers no longer block the writer
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # fsync at checkpoints only; safe with WAL
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # page cache per connection
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    
+    # Connection pool for server databases (e.g. postgresql+psycopg2://...; install the driver separately)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
     
     # CORS
     ALLOWED_ORIGINS: list = [
@@ -28,7 +42,84 @@ class Settings:
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
     
     # File uploads
-    MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", str(10 * 1024 * 1024)))  # 10MB, enforced while copying
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))  # bytes held per upload in flight
     TEMP_DIR: str = "temp_uploads"
+    
+    # Resized upload variants for previews (?width=&format= on the uploads route)
+    DERIVATIVE_WIDTHS: list = [int(w) for w in os.getenv("DERIVATIVE_WIDTHS", "320,1280").split(",") if w.strip()]
+    DERIVATIVE_CACHE_DIR: str = os.getenv("DERIVATIVE_CACHE_DIR", "uploads/derivatives")
+    DERIVATIVE_CACHE_MAX_BYTES: int = int(os.getenv("DERIVATIVE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    DERIVATIVE_QUALITY: int = int(os.getenv("DERIVATIVE_QUALITY", "80"))
+    DERIVATIVE_ON_INGEST: bool = os.getenv("DERIVATIVE_ON_INGEST", "True").lower() == "true"  # thumbnail made by the worker
+    
+    # Local YOLO micro-batching
+    YOLO_BATCHING: bool = os.getenv("YOLO_BATCHING", "True").lower() == "true"
+    YOLO_MAX_BATCH_SIZE: int = int(os.getenv("YOLO_MAX_BATCH_SIZE", "8"))
+    YOLO_BATCH_WINDOW_MS: int = int(os.getenv("YOLO_BATCH_WINDOW_MS", "25"))
+    YOLO_INPUT_SIZE: int = int(os.getenv("YOLO_INPUT_SIZE", "640"))
+    
+    # Local YOLO inference engine: "torch" (ultralytics) or "onnx" (ONNX Runtime on CPU)
+    YOLO_ENGINE: str = os.getenv("YOLO_ENGINE", "torch").lower()
+    YOLO_ONNX_INT8: bool = os.getenv("YOLO_ONNX_INT8", "False").lower() == "true"
+    YOLO_ONNX_THREADS: int = int(os.getenv("YOLO_ONNX_THREADS", "0"))  # 0 lets onnxruntime decide
+    
+    # Local YOLO process pool (each worker process preloads its own model; 0 keeps YOLO in-process)
+    YOLO_PROCESS_WORKERS: int = int(os.getenv("YOLO_PROCESS_WORKERS", "0"))
+    
+    # Cloud image payloads (downscaled + re-encoded once per upload)
+    CLOUD_IMAGE_MAX_SIDE: int = int(os.getenv("CLOUD_IMAGE_MAX_SIDE", "1568"))
+    CLOUD_IMAGE_BYTE_BUDGET: int = int(os.getenv("CLOUD_IMAGE_BYTE_BUDGET", str(800 * 1024)))
+    CLOUD_IMAGE_QUALITY: int = int(os.getenv("CLOUD_IMAGE_QUALITY", "85"))
+    
+    # Cloud backend hedging (start the next backend when the current one is slower than its p95)
+    CLOUD_HEDGING: bool = os.getenv("CLOUD_HEDGING", "False").lower() == "true"
+    CLOUD_HEDGE_PERCENTILE: float = float(os.getenv("CLOUD_HEDGE_PERCENTILE", "0.95"))
+    CLOUD_HEDGE_DEFAULT_DELAY_MS: int = int(os.getenv("CLOUD_HEDGE_DEFAULT_DELAY_MS", "4000"))
+    CLOUD_HEDGE_MIN_DELAY_MS: int = int(os.getenv("CLOUD_HEDGE_MIN_DELAY_MS", "500"))
+    CLOUD_HEDGE_MIN_SAMPLES: int = int(os.getenv("CLOUD_HEDGE_MIN_SAMPLES", "20"))
+    
+    # Pooled connections per cloud client
+    CLOUD_MAX_CONNECTIONS: int = int(os.getenv("CLOUD_MAX_CONNECTIONS", "100"))
+    
+    # Circuit breakers (per AI backend)
+    BREAKER_WINDOW: int = int(os.getenv("BREAKER_WINDOW", "20"))
+    BREAKER_MIN_CALLS: int = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+    BREAKER_FAILURE_RATE: float = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+    BREAKER_SLOW_CALL_MS: int = int(os.getenv("BREAKER_SLOW_CALL_MS", "20000"))
+    BREAKER_SLOW_CALL_RATE: float = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8"))
+    BREAKER_OPEN_SECONDS: int = int(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+    BREAKER_HALF_OPEN_PROBES: int = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+    
+    # Analysis/claim reads serialised straight from the rows with orjson (rows that don't fit use Pydantic)
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "True").lower() == "true"
+    
+    # Durable analysis job queue
+    JOB_WORKER_IN_PROCESS: bool = os.getenv("JOB_WORKER_IN_PROCESS", "True").lower() == "true"
+    JOB_CONCURRENCY: int = int(os.getenv("JOB_CONCURRENCY", "8"))  # jobs in flight per worker process
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+    JOB_VISIBILITY_TIMEOUT: int = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))  # seconds a claim stays leased
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "5"))
+    JOB_RETRY_BACKOFF_MAX_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_MAX_SECONDS", "300"))
+    
+    # Pushed analysis progress (Server-Sent Events)
+    ANALYSIS_EVENTS_HISTORY: int = int(os.getenv("ANALYSIS_EVENTS_HISTORY", "10000"))  # analyses whose latest stage is kept
+    ANALYSIS_EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("ANALYSIS_EVENTS_HEARTBEAT_SECONDS", "15"))  # keep-alive and DB recheck
+    
+    # Finished analysis results are written by one thread in group commits (size- or time-bounded)
+    RESULT_WRITER_ENABLED: bool = os.getenv("RESULT_WRITER_ENABLED", "True").lower() == "true"
+    RESULT_WRITER_MAX_BATCH: int = int(os.getenv("RESULT_WRITER_MAX_BATCH", "64"))
+    RESULT_WRITER_MAX_DELAY_MS: float = float(os.getenv("RESULT_WRITER_MAX_DELAY_MS", "5"))  # wait for more results
+    
+    # Analytics: serve claim trends from the incrementally maintained daily rollup table
+    TRENDS_FROM_ROLLUP: bool = os.getenv("TRENDS_FROM_ROLLUP", "True").lower() == "true"
+    DASHBOARD_FROM_COUNTERS: bool = os.getenv("DASHBOARD_FROM_COUNTERS", "True").lower() == "true"
+    
+    # Claims search: FTS5 trigram index over claim number, normalized plate and owner (SQLite)
+    CLAIM_SEARCH_INDEX: bool = os.getenv("CLAIM_SEARCH_INDEX", "True").lower() == "true"
+    
+    # Bulk claim endpoints: most claims/analyses accepted per request (one transaction)
+    BULK_MAX_ITEMS: int = int(os.getenv("BULK_MAX_ITEMS", "500"))
 
 settings = Settings()
\ No newline at end of file
@@ -3,32 +3,58 @@ import os
 import shutil
 import uuid
 from datetime import datetime, timedelta, date
-from typing import Optional, List
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Form
+from typing import Any, Callable, Optional, List
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Form, Request
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, tuple_, select, func, update
 import uvicorn
 import logging
 from math import ceil
 import threading
+import asyncio
+import time
 from concurrent.futures import ThreadPoolExecutor
 import json
 
+# Everything from here on counts towards the app import time reported by /api/v1/ready
+_import_started = time.perf_counter()
+
 # Import custom services
-from services.yolo_service import LocalAnalyzer
+from services.yolo_service import YoloBatchQueue, create_local_analyzer
+from services.yolo_pool import YoloProcessPool
 from services.fallback_service import CloudAnalyzer
+from services.dedup_service import UploadDeduplicator
+from services.circuit_breaker import circuit_breakers, OPEN
+from services.image_preprocessing import PreparedImage, preprocessing_stats
+from services.job_queue import JobQueue, JobWorker
+from services.result_writer import ResultWriter
+from services.upload_storage import (
+    IMMUTABLE_CACHE_CONTROL, RangeNotSatisfiable, UnsupportedImage, UploadTooLarge,
+    byte_range, describe_upload, iter_file_range, not_modified, store_upload,
+)
+from services.image_derivatives import DerivativeCache, FORMATS as DERIVATIVE_FORMATS
+from services.analysis_events import AnalysisEventBus
+from services.fast_json import SchemaMismatch, analysis_payload, claim_payload
+from services.lazy_engine import LazyEngine, import_timings
+from services.claim_stats import ClaimSnapshot, ClaimStats
+from services.damage_analytics import DamageAnalytics, GROUP_COLUMNS, PERIODS
+from services.claim_search import ClaimSearchIndex
+from config import settings
 
 # Import database and schemas
-from models.database import init_db, get_db, engine, ClaimModel, AnalysisResultModel, Base, ClaimStatus, SessionLocal, InsuranceDetailsModel
+from models.database import init_db, get_db, get_sync_db, derived_damage_id, engine, async_engine, ClaimModel, AnalysisResultModel, Base, ClaimStatus, SessionLocal, AsyncSessionLocal, InsuranceDetailsModel
 from schemas import (
     UploadResponse, AnalysisResult, Claim, ClaimFilters, PaginatedResponse,
     DashboardStats, TrendDataPoint, ApproveClaimRequest, RejectClaimRequest,
     RequestReviewRequest, VehicleInfo, SeverityInfo, DamageAssessment, 
     BoundingBox, AnalysisStatus, ReportRequest, LoginRequest, Token, User,
-    InsuranceFormData, InsuranceCalculations, InsuranceDetailsResponse, AnalysisResultWithInsurance
+    InsuranceFormData, InsuranceCalculations, InsuranceDetailsResponse, AnalysisResultWithInsurance,
+    DamageAggregate, BulkCreateClaimsRequest, BulkStatusAction, BulkStatusRequest, BulkItemResult, BulkResponse
 )
 import base64
 from pathlib import Path
@@ -43,9 +69,38 @@ logger = logging.getLogger(__name__)
 # Initialize database and manage lifecycle
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    started = time.perf_counter()
     init_db()
+    app.state.db_init_seconds = round(time.perf_counter() - started, 3)
     logger.info("Database initialized")
+    with SessionLocal() as db:
+        claim_stats.ensure_rollup(db)
+        claim_stats.ensure_counters(db)
+        claim_search.ensure(db)
+        damage_analytics.ensure(db)
+    job_queue.recover_orphans(build_job_payload)
+    
+    # Load and prime the engines off the event loop; the port is bound meanwhile
+    # and /api/v1/ready reports 503 until they are done
+    warmup_task = asyncio.create_task(asyncio.to_thread(warm_up_engines))
+    
+    # Analyses run from the durable queue; standalone worker.py processes can share it
+    worker_task = asyncio.create_task(job_worker.run()) if settings.JOB_WORKER_IN_PROCESS else None
     yield
+    warmup_task.cancel()
+    if worker_task:
+        job_worker.stop()
+        try:
+            await asyncio.wait_for(worker_task, timeout=10)
+        except asyncio.TimeoutError:
+            # Unfinished jobs keep their lease and are reclaimed once it expires
+            logger.warning("Job worker did not drain in time; in-flight jobs will be retried")
+    result_writer.close()
+    if cloud_engine.peek():
+        cloud_engine.peek().close()
+    if isinstance(local_engine.peek(), YoloProcessPool):
+        local_engine.peek().close()
+    await async_engine.dispose()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -64,12 +119,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize AI Services
-local_ai = LocalAnalyzer()
-cloud_ai = CloudAnalyzer()
+# Initialize AI Services (built on first use or by the lifespan warm-up, not at import)
+def build_local_detector():
+    if settings.YOLO_PROCESS_WORKERS > 0:
+        # YOLO runs in worker processes that each load the model; the API process holds none
+        return YoloProcessPool(settings.YOLO_PROCESS_WORKERS)
+    
+    local_ai = create_local_analyzer()
+    if not settings.YOLO_BATCHING:
+        return local_ai
+    
+    # Concurrent YOLO fallbacks share one batched forward pass
+    return YoloBatchQueue(
+        local_ai,
+        max_batch_size=settings.YOLO_MAX_BATCH_SIZE,
+        window_ms=settings.YOLO_BATCH_WINDOW_MS,
+    )
+
+cloud_engine = LazyEngine("cloud", CloudAnalyzer)
+local_engine = LazyEngine("localYolo", build_local_detector, warm_up=lambda detector: detector.warm_up())
+
+def warm_up_engines():
+    """Build every engine and run a dummy inference through YOLO"""
+    for engine in (cloud_engine, local_engine):
+        engine.warm()
+
+# Reuses completed analyses of byte-identical resubmissions
+deduplicator = UploadDeduplicator()
+
+# Trend/dashboard aggregation, the per-day claim rollup and the running counters
+claim_stats = ClaimStats(
+    use_rollup=settings.TRENDS_FROM_ROLLUP,
+    use_counters=settings.DASHBOARD_FROM_COUNTERS,
+)
+
+# Substring/fuzzy claim search over claim number, plate and owner
+claim_search = ClaimSearchIndex(enabled=settings.CLAIM_SEARCH_INDEX)
+
+# Per-damage rows behind the damage aggregation endpoint
+damage_analytics = DamageAnalytics()
+
+# Create thread pool for background processing (wide enough to keep every YOLO worker process busy)
+executor = ThreadPoolExecutor(max_workers=max(2, settings.YOLO_PROCESS_WORKERS))
+
+# Uploads are persisted as jobs before the response, so a restart loses no work
+job_queue = JobQueue()
+
+# Finished results from every worker thread are committed together
+result_writer = ResultWriter()
+
+# Pipeline stage transitions, pushed to clients watching an analysis
+analysis_events = AnalysisEventBus()
 
-# Create thread pool for background processing
-executor = ThreadPoolExecutor(max_workers=2)
+# Resized previews of uploads, kept in a size-capped LRU directory
+derivative_cache = DerivativeCache()
+
+async def run_analysis_job(job: dict):
+    """Job handler: run the analysis pipeline for one queued upload"""
+    analysis_id = job["analysisId"]
+    payload = job["payload"]
+    
+    # A retry after a crash may find the analysis already written
+    with SessionLocal() as db:
+        db_analysis = db.get(AnalysisResultModel, analysis_id)
+        if not db_analysis or db_analysis.status != "processing":
+            logger.info(f"Skipping job for {analysis_id}: analysis is no longer processing")
+            return
+    
+    insurance = payload.get("insurance")
+    insurance_form = InsuranceFormData(**insurance) if insurance else None
+    analysis_events.publish(analysis_id, "started", jobAttempt=job["attempt"])
+    try:
+        await process_image(analysis_id, payload["imagePath"], insurance_form)
+    except Exception as e:
+        # The job queue requeues the job, or dead-letters it after the last attempt
+        stage = "failed" if job["attempt"] >= job["maxAttempts"] else "retrying"
+        analysis_events.publish(analysis_id, stage, jobAttempt=job["attempt"], error=str(e)[:200])
+        raise
+
+job_worker = JobWorker(job_queue, run_analysis_job)
+
+import_timings.setdefault("app", round(time.perf_counter() - _import_started, 3))
 
 # ============================================
 # HELPER FUNCTIONS
@@ -95,9 +225,10 @@ def model_to_analysis_result(db_result: AnalysisResultModel) -> AnalysisResult:
     # Parse damages from JSON
     damages = []
     if db_result.damages:
-        for dmg in db_result.damages:
+        for index, dmg in enumerate(db_result.damages):
             damage = DamageAssessment(
-                id=dmg.get("id", str(uuid.uuid4())),
+                # Ids are stored with the damages (migration 0008 filled in old rows); derive, never randomize
+                id=dmg["id"] if "id" in dmg else derived_damage_id(db_result.id, index),
                 partIdentified=dmg.get("partIdentified", "Unknown"),
                 damageType=dmg.get("damageType", "scratch"),
                 confidenceScore=dmg.get("confidenceScore", 0.0),
@@ -123,12 +254,15 @@ def model_to_analysis_result(db_result: AnalysisResultModel) -> AnalysisResult:
         status=db_result.status,
     )
 
-def model_to_claim(db_claim: ClaimModel, db: Session) -> Claim:
-    """Convert database ClaimModel to Pydantic Claim schema"""
+def model_to_claim(db_claim: ClaimModel, db: AsyncSession, include_analysis: bool = True) -> Claim:
+    """
+    Convert database ClaimModel to Pydantic Claim schema (include_analysis=False skips the nested analysis).
+    With include_analysis the claim's analysisResult must already be loaded (see load_claim).
+    """
     vehicle_info = VehicleInfo(**db_claim.vehicleInfoJson) if db_claim.vehicleInfoJson else VehicleInfo()
     
     analysis_result = None
-    if db_claim.analysisResult:
+    if include_analysis and db_claim.analysisResult:
         analysis_result = model_to_analysis_result(db_claim.analysisResult)
     
     return Claim(
@@ -145,6 +279,117 @@ def model_to_claim(db_claim: ClaimModel, db: Session) -> Claim:
         adjusterNotes=db_claim.adjusterNotes,
     )
 
+def fast_json_response(build: Callable[[], Any], fallback: Callable[[], Any]):
+    """
+    The body from build() (see services.fast_json) encoded by orjson, without
+    building and validating the response models. build() raises SchemaMismatch
+    for rows the schema would coerce or reject; fallback() answers those
+    through the Pydantic models, exactly as before.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        try:
+            return ORJSONResponse(build())
+        except SchemaMismatch:
+            pass
+    return fallback()
+
+async def load_claim(db: AsyncSession, claim_id: str) -> ClaimModel:
+    """Fetch a claim with its analysis eagerly loaded (async sessions can't lazy-load), or 404"""
+    claim = await db.scalar(
+        select(ClaimModel).options(selectinload(ClaimModel.analysisResult)).where(ClaimModel.id == claim_id)
+    )
+    if not claim:
+        raise HTTPException(status_code=404, detail="Claim not found")
+    return claim
+
+def claim_from_analysis(analysis: AnalysisResultModel) -> ClaimModel:
+    """A new pending claim for an analysis (the claim shares the analysis id)"""
+    return ClaimModel(
+        id=analysis.id,
+        claimNumber=generate_claim_number(),
+        vehiclePlate=analysis.vehiclePlateNumber or "Unknown",
+        vehicleInfoJson={
+            "make": analysis.vehicleMake,
+            "model": analysis.vehicleModel,
+            "year": analysis.vehicleYear,
+            "plateNumber": analysis.vehiclePlateNumber,
+            "vin": analysis.vehicleVin,
+            "color": analysis.vehicleColor,
+        },
+        analysisResultId=analysis.id,
+        aiConfidence=analysis.aiConfidence,
+        status=ClaimStatus.pending,
+        totalPayout=analysis.totalEstimatedCost,
+        submittedAt=datetime.utcnow(),
+    )
+
+def reuse_analysis_result(source: AnalysisResultModel, analysis_id: str) -> AnalysisResultModel:
+    """Create a completed analysis record that reuses the results (and stored image) of an earlier one"""
+    return AnalysisResultModel(
+        id=analysis_id,
+        imageUrl=source.imageUrl,
+        vehicleMake=source.vehicleMake,
+        vehicleModel=source.vehicleModel,
+        vehicleYear=source.vehicleYear,
+        vehiclePlateNumber=source.vehiclePlateNumber,
+        vehicleVin=source.vehicleVin,
+        vehicleColor=source.vehicleColor,
+        damages=list(source.damages or []),
+        overallSeverityLevel=source.overallSeverityLevel,
+        overallSeverityScore=source.overallSeverityScore,
+        overallSeverityDescription=source.overallSeverityDescription,
+        totalEstimatedCost=source.totalEstimatedCost,
+        aiConfidence=source.aiConfidence,
+        processedAt=datetime.utcnow(),
+        status="completed",
+        engine=source.engine,
+    )
+
+def build_job_payload(db_analysis: AnalysisResultModel) -> Optional[dict]:
+    """Rebuild a job payload for an analysis from what the upload stored (used for recovery)"""
+    if not db_analysis.imageUrl:
+        return None
+    image_path = UPLOADS_DIR / Path(db_analysis.imageUrl).name
+    if not image_path.exists():
+        return None
+    
+    insurance = None
+    details = db_analysis.insuranceDetails
+    if details:
+        insurance = InsuranceFormData(
+            ownerName=details.ownerName,
+            vehicleName=db_analysis.vehicleModel,
+            plateNumber=db_analysis.vehiclePlateNumber,
+            city=details.city,
+            fuelType=details.fuelType,
+            vehiclePriceLakhs=details.vehiclePriceLakhs,
+            purchaseDate=details.purchaseDate.isoformat() if details.purchaseDate else None,
+            vehicleCondition=details.vehicleCondition,
+            hasZeroDepreciation=details.hasZeroDepreciation,
+            hasReturnToInvoice=details.hasReturnToInvoice,
+            estimatedRepairBill=details.estimatedRepairBill,
+        ).model_dump()
+    
+    return {"imagePath": str(image_path), "insurance": insurance}
+
+def encode_claim_cursor(claim: ClaimModel, direction: str) -> str:
+    """Opaque keyset cursor for the claims list: the (submittedAt, id) of a boundary row."""
+    payload = json.dumps({"s": claim.submittedAt.isoformat(), "i": claim.id, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_claim_cursor(cursor: str):
+    """Returns (submittedAt, id, direction); raises ValueError for a malformed cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        submitted_at, claim_id, direction = datetime.fromisoformat(payload["s"]), str(payload["i"]), payload["d"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if direction not in ("next", "prev"):
+        raise ValueError("Invalid cursor direction")
+    return submitted_at, claim_id, direction
+
+
 def generate_claim_number() -> str:
     """Generate a unique claim number"""
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
@@ -378,7 +623,7 @@ UPLOADS_DIR.mkdir(exist_ok=True)
 async def upload_image(
     image: UploadFile = File(...), 
     insurance_data: Optional[str] = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload an image for vehicle damage analysis with optional insurance form data.
@@ -395,68 +640,103 @@ async def upload_image(
     if not image.content_type or not image.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Uploaded file is not an image.")
     
+    analysis_id = str(uuid.uuid4())
+    
+    # Streamed to disk a chunk at a time (hashed on the way) instead of read into memory
     try:
-        analysis_id = str(uuid.uuid4())
-        # Save with unique name
-        file_ext = Path(image.filename).suffix if image.filename else ".jpg"
-        saved_filename = f"{analysis_id}{file_ext}"
-        saved_path = UPLOADS_DIR / saved_filename
-        
-        # Save file to persistent storage
-        content = await image.read()
-        with open(saved_path, "wb") as f:
-            f.write(content)
-        
-        # Store relative URL path for frontend access
-        image_url = f"/api/v1/uploads/{saved_filename}"
-        
-        # Also keep temp path for AI processing
-        temp_path = str(saved_path)
-        
-        # Create pending analysis record
-        db_analysis = AnalysisResultModel(
-            id=analysis_id,
-            imageUrl=image_url,  # Store URL, not file path
-            status="processing",
-            aiConfidence=0.0,
-            overallSeverityLevel="minor",
-            overallSeverityScore=0.0,
-            overallSeverityDescription="Analyzing damage...",
+        stored = await store_upload(image, UPLOADS_DIR, analysis_id)
+    except UnsupportedImage:
+        raise HTTPException(status_code=400, detail="Uploaded file is not a JPEG, PNG or WebP image.")
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image is larger than the {settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB upload limit.",
         )
-        db.add(db_analysis)
-        db.commit()
+    
+    try:
+        image_hash = stored.sha256
         
-        # Parse and save insurance data if provided
+        # Parse insurance data if provided
         insurance_form = None
         if insurance_data:
             try:
                 insurance_json = json.loads(insurance_data)
                 insurance_form = InsuranceFormData(**insurance_json)
-                
-                # *** FIX: stamp vehicle name + plate onto the analysis record NOW ***
-                if insurance_form.vehicleName:
-                    db_analysis.vehicleModel = insurance_form.vehicleName
-                if insurance_form.plateNumber:
-                    db_analysis.vehiclePlateNumber = insurance_form.plateNumber
-                if insurance_form.ownerName:
-                    db_analysis.vehicleMake = insurance_form.ownerName
-                db.commit()  # persist vehicle info immediately
-                
-                # Calculate insurance values
-                calculations = calculate_insurance_values(insurance_form)
-                
-                # Save to database
-                save_insurance_details(db, analysis_id, insurance_form, calculations)
-                
-                logger.info(f"Saved insurance details for analysis {analysis_id}")
             except (json.JSONDecodeError, ValueError) as e:
                 logger.warning(f"Invalid insurance data format: {e}")
                 # Continue without insurance data - don't fail the upload
+        context_hash = deduplicator.hash_context(insurance_form)
+        
+        # Resubmitted photo with the same context: reuse the completed analysis, no inference
+        previous = await deduplicator.find_completed(db, image_hash, context_hash)
+        
+        if previous:
+            db_analysis = reuse_analysis_result(previous, analysis_id)
+            temp_path = None
+            # The reused analysis points at the earlier copy of these bytes
+            await asyncio.to_thread(stored.path.unlink, missing_ok=True)
+        else:
+            # Store relative URL path for frontend access
+            image_url = f"/api/v1/uploads/{stored.filename}"
+            
+            # Also keep temp path for AI processing
+            temp_path = str(stored.path)
+            
+            # Create pending analysis record
+            db_analysis = AnalysisResultModel(
+                id=analysis_id,
+                imageUrl=image_url,  # Store URL, not file path
+                status="processing",
+                aiConfidence=0.0,
+                overallSeverityLevel="minor",
+                overallSeverityScore=0.0,
+                overallSeverityDescription="Analyzing damage...",
+            )
+        db_analysis.imageHash = image_hash
+        db_analysis.contextHash = context_hash
+        db.add(db_analysis)
+        await db.commit()
+        
+        # Save insurance data if provided
+        if insurance_form:
+            # *** FIX: stamp vehicle name + plate onto the analysis record NOW ***
+            if insurance_form.vehicleName:
+                db_analysis.vehicleModel = insurance_form.vehicleName
+            if insurance_form.plateNumber:
+                db_analysis.vehiclePlateNumber = insurance_form.plateNumber
+            if insurance_form.ownerName:
+                db_analysis.vehicleMake = insurance_form.ownerName
+            await db.commit()  # persist vehicle info immediately
+            
+            # Calculate insurance values
+            calculations = calculate_insurance_values(insurance_form)
+            
+            # Save to database
+            await db.run_sync(save_insurance_details, analysis_id, insurance_form, calculations)
+            
+            logger.info(f"Saved insurance details for analysis {analysis_id}")
+        
+        if previous:
+            # After the insurance details, so the damage rows pick up the city
+            await db.run_sync(damage_analytics.analysis_saved, db_analysis)
+            await db.commit()
+            logger.info(f"Reused analysis {previous.id} for duplicate upload {analysis_id}")
+            return UploadResponse(
+                analysisId=analysis_id,
+                status="completed",
+                estimatedTime=0,
+            )
         
-        logger.info(f"Created analysis record: {analysis_id}, saved image to {saved_path}")
+        logger.info(f"Created analysis record: {analysis_id}, saved image to {temp_path}")
         
-        # Submit for background processing (pass insurance_form for enhanced prompt)
-        executor.submit(process_image_sync, analysis_id, temp_path, insurance_form)
+        # Queue for background processing (insurance_form travels with the job for the enhanced prompt)
+        job_queue.enqueue(db, analysis_id, {
+            "imagePath": temp_path,
+            "insurance": insurance_form.model_dump() if insurance_form else None,
+        })
+        await db.commit()
+        analysis_events.publish(analysis_id, "queued")
+        job_worker.notify()
         
         return UploadResponse(
             analysisId=analysis_id,
@@ -466,93 +746,219 @@ async def upload_image(
     
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
     
 @app.get("/api/v1/uploads/{filename}")
-async def get_uploaded_image(filename: str):
-    """Serve uploaded image files"""
-    file_path = UPLOADS_DIR / filename
+async def get_uploaded_image(
+    filename: str,
+    request: Request,
+    width: Optional[int] = Query(None, ge=1, description="Serve a resized copy at least this wide (snapped to DERIVATIVE_WIDTHS)"),
+    image_format: Optional[str] = Query(None, alias="format", description="webp (default) or jpeg, for resized copies"),
+):
+    """
+    Serve uploaded image files with their sniffed MIME type.
     
-    if not file_path.exists():
+    Stored names are never reused, so responses carry a strong ETag (the
+    image's content hash, recorded at ingest) and an immutable
+    Cache-Control; revalidations get 304 and Range requests 206.
+    With width and/or format, a downscaled copy is served instead, made on
+    first request (or by the worker at ingest) and kept in the derivative cache.
+    """
+    path = source = UPLOADS_DIR / Path(filename).name
+    if width is not None or image_format is not None:
+        if image_format is not None and image_format not in DERIVATIVE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(DERIVATIVE_FORMATS)}")
+        try:
+            path = await asyncio.to_thread(
+                derivative_cache.get, path, width or derivative_cache.widths[-1], image_format or "webp"
+            )
+        except (FileNotFoundError, IsADirectoryError):
+            raise HTTPException(status_code=404, detail="Image not found")
+        except Exception as e:
+            logger.warning(f"Resizing {filename} failed: {e}")
+            raise HTTPException(status_code=422, detail="Image cannot be resized")
+    
+    info = await asyncio.to_thread(describe_upload, path, source if path != source else None)
+    if info is None:
         raise HTTPException(status_code=404, detail="Image not found")
     
-    return FileResponse(file_path, media_type="image/jpeg")
+    headers = {
+        "ETag": info.etag,
+        "Last-Modified": info.last_modified,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if not_modified(info, request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+    
+    # If-Range: only honour the range while the client's copy is still current
+    range_header = request.headers.get("range")
+    if request.headers.get("if-range") not in (None, info.etag, info.last_modified):
+        range_header = None
+    try:
+        requested = byte_range(range_header, info.size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{info.size}"})
+    
+    if requested is None:
+        return FileResponse(info.path, media_type=info.mime, headers=headers, stat_result=info.stat)
+    
+    start, end = requested
+    return StreamingResponse(
+        iter_file_range(info.path, start, end),
+        status_code=206,
+        media_type=info.mime,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{info.size}", "Content-Length": str(end - start + 1)},
+    )
+
+
+def prepare_image(analysis_id: str, temp_path: str, content: Optional[bytes] = None) -> Optional[PreparedImage]:
+    """Decode the upload once into every engine's input; None means engines fall back to the file"""
+    try:
+        if content is not None:
+            return PreparedImage(content, stats=preprocessing_stats)
+        return PreparedImage.from_file(temp_path, stats=preprocessing_stats)
+    except Exception as e:
+        logger.warning(f"Preprocessing failed for {analysis_id}, engines will read {temp_path}: {e}")
+        return None
+
+
+async def process_image(
+    analysis_id: str,
+    temp_path: str,
+    insurance_form: Optional[InsuranceFormData] = None,
+    content: Optional[bytes] = None,
+):
+    """
+    Background pipeline for an upload.
+    
+    The cloud chain is awaited on the event loop, so any number of analyses can
+    wait on Gemini/Groq without holding a thread; only the local fallback and
+    the database write run on the executor. The image is decoded once up front
+    and each engine gets its own downscaled input from that.
+    """
+    logger.info(f"Starting background processing for {analysis_id}")
+    prepared = await asyncio.to_thread(prepare_image, analysis_id, temp_path, content)
+    
+    # PRIORITY 1: Cloud Analysis (Gemini) with insurance context
+    cloud_result = None
+    try:
+        logger.info(f"Attempting Cloud (Gemini) analysis for {analysis_id}")
+        cloud_ai = cloud_engine.peek() or await asyncio.to_thread(cloud_engine.get)
+        cloud_result = await cloud_ai.get_analysis_async(
+            temp_path, insurance_form, image=prepared.cloud if prepared else None,
+            on_attempt=cloud_attempt_publisher(analysis_id),
+        )
+    except Exception as e:
+        logger.error(f"Cloud analysis failed: {str(e)}")
+    
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, complete_analysis_sync, analysis_id, temp_path, cloud_result, prepared)
+
+
+def cloud_attempt_publisher(analysis_id: str):
+    """on_attempt callback for the cloud chain: each backend tried is a pushed stage"""
+    return lambda backend, attempt: analysis_events.publish(analysis_id, "cloud_attempt", backend=backend, attempt=attempt)
 
 
 def process_image_sync(analysis_id: str, temp_path: str, insurance_form: Optional[InsuranceFormData] = None):
+    """Blocking variant of process_image for callers outside the event loop"""
+    logger.info(f"Starting background processing for {analysis_id}")
+    prepared = prepare_image(analysis_id, temp_path)
+    
+    # PRIORITY 1: Cloud Analysis (Gemini) with insurance context
+    cloud_result = None
+    try:
+        logger.info(f"Attempting Cloud (Gemini) analysis for {analysis_id}")
+        cloud_result = cloud_engine.get().get_analysis(
+            temp_path, insurance_form, image=prepared.cloud if prepared else None,
+            on_attempt=cloud_attempt_publisher(analysis_id),
+        )
+    except Exception as e:
+        logger.error(f"Cloud analysis failed: {str(e)}")
+    
+    complete_analysis_sync(analysis_id, temp_path, cloud_result, prepared)
+
+
+def complete_analysis_sync(
+    analysis_id: str,
+    temp_path: str,
+    cloud_result: Optional[dict],
+    prepared: Optional[PreparedImage] = None,
+):
     """
     Background worker - does NOT delete image file.
     Image is stored persistently in uploads directory.
     
+    Saves the cloud result if it is usable, otherwise runs the local YOLO fallback.
+    The result is committed by the group-commit writer; this returns once it is durable.
+    
     Args:
         analysis_id: Unique ID for this analysis
         temp_path: Path to the uploaded image
-        insurance_form: Optional insurance form data for enhanced analysis
+        cloud_result: Normalised cloud analysis, or None if the cloud chain failed
+        prepared: Decoded upload; YOLO uses its model-sized array instead of re-reading the file
     """
-    db = SessionLocal()
     try:
-        logger.info(f"Starting background processing for {analysis_id}")
-        
-        db_analysis = db.query(AnalysisResultModel).filter(
-            AnalysisResultModel.id == analysis_id
-        ).first()
-        
-        if not db_analysis:
-            logger.error(f"Analysis {analysis_id} not found")
-            return
-        
-        # PRIORITY 1: Cloud Analysis (Gemini) with insurance context
+        # Check if we got valid damages or a high confidence result
         cloud_success = False
-        try:
-            logger.info(f"Attempting Cloud (Gemini) analysis for {analysis_id}")
-            cloud_result = cloud_ai.get_analysis(temp_path, insurance_form)
-            
-            # Check if we got valid damages or a high confidence result
-            if cloud_result and (cloud_result.get("damages") or cloud_result.get("confidence", 0) > 0):
-                format_and_save_result(db_analysis, cloud_result, "Cloud-Neural-Engine", db)
-                logger.info(f"Cloud analysis completed successfully for {analysis_id}")
-                cloud_success = True
-            else:
-                logger.warning(f"Cloud analysis returned empty/low confidence for {analysis_id}")
-        
-        except Exception as e:
-            logger.error(f"Cloud analysis failed: {str(e)}")
+        if cloud_result and (cloud_result.get("damages") or cloud_result.get("confidence", 0) > 0):
+            save_result = lambda db_analysis, db: format_and_save_result(db_analysis, cloud_result, "Cloud-Neural-Engine", db)
+            logger.info(f"Cloud analysis completed successfully for {analysis_id}")
+            cloud_success = True
+        else:
+            logger.warning(f"Cloud analysis returned empty/low confidence for {analysis_id}")
         
         # PRIORITY 2: Local Fallback (YOLO) if Cloud failed
-        if not cloud_success:
+        if not cloud_success and not circuit_breakers.get("LOCAL_YOLO").allow_request():
+            logger.warning(f"Circuit open for LOCAL_YOLO – skipping local fallback for {analysis_id}")
+            save_result = format_empty_result
+        elif not cloud_success:
             logger.info(f"Falling back to Local (YOLO) detection for {analysis_id}")
+            analysis_events.publish(analysis_id, "local_fallback")
             try:
-                yolo_result = local_ai.detect(temp_path)
+                yolo_source = prepared.yolo_input if prepared else temp_path
+                yolo_result = local_engine.get().detect(yolo_source)
                 
                 if yolo_result is not None:
-                    format_and_save_yolo_result_improved(db_analysis, yolo_result, "Local-Vision-Core", db)
+                    scale = prepared.yolo_scale if prepared else 1.0
+                    
+                    def save_result(db_analysis, db):
+                        try:
+                            format_and_save_yolo_result_improved(db_analysis, yolo_result, "Local-Vision-Core", db, scale=scale)
+                        except Exception as e:
+                            logger.error(f"Local analysis failed: {str(e)}")
+                            format_empty_result(db_analysis, db)
+                    
                     logger.info(f"YOLO analysis completed for {analysis_id}")
                 else:
                     logger.warning(f"All analysis methods failed for {analysis_id}")
-                    format_empty_result(db_analysis, db)
+                    save_result = format_empty_result
             except Exception as e:
                 logger.error(f"Local analysis failed: {str(e)}")
-                format_empty_result(db_analysis, db)
+                save_result = format_empty_result
         
-        db.commit()
+        analysis_events.publish(analysis_id, "saving")
+        result_writer.write(analysis_id, save_result)
         logger.info(f"Processing complete for {analysis_id}")
+        # Only once the result is committed, so a client reacting to it can read it
+        analysis_events.publish(analysis_id, "completed")
+        
+        if settings.DERIVATIVE_ON_INGEST:
+            # Previews are ready before the dashboard or ledger first asks for them
+            try:
+                for width in derivative_cache.widths:
+                    derivative_cache.get(Path(temp_path), width, "webp")
+            except Exception as e:
+                logger.warning(f"Preview generation failed for {analysis_id}: {e}")
         
     except Exception as e:
+        # The job queue retries with backoff and marks the analysis failed on the last attempt
         logger.error(f"Error processing {analysis_id}: {str(e)}")
-        try:
-            db_analysis = db.query(AnalysisResultModel).filter(
-                AnalysisResultModel.id == analysis_id
-            ).first()
-            if db_analysis:
-                db_analysis.status = "failed"
-                db_analysis.overallSeverityDescription = f"Processing error: {str(e)}"
-                db.commit()
-        except:
-            pass
+        raise
     
     finally:
-        db.close()
         # Do NOT delete the image file - it's stored persistently
         logger.info(f"Preserved image file at {temp_path}")
 
@@ -568,14 +974,16 @@ def format_empty_result(db_analysis: AnalysisResultModel, db: Session):
     db_analysis.overallSeverityLevel = "minor"
     db_analysis.overallSeverityScore = 0.0
     db_analysis.overallSeverityDescription = "No damages detected"
+    damage_analytics.analysis_saved(db, db_analysis)  # drops rows left by an earlier attempt
 
 def format_and_save_yolo_result_improved(
     db_analysis: AnalysisResultModel,
     yolo_result,
     engine: str,
-    db: Session
+    db: Session,
+    scale: float = 1.0,
 ):
-    """Parse YOLO results with realistic cost calculation"""
+    """Parse YOLO results with realistic cost calculation (scale maps model-input boxes to the original image)"""
     damages = []
     total_cost = 0.0
     confidence_scores = []
@@ -586,7 +994,7 @@ def format_and_save_yolo_result_improved(
             confidence_scores.append(confidence)
             
             xyxy = box.xyxy[0] if hasattr(box.xyxy, '__getitem__') else box.xyxy
-            x, y, x2, y2 = [float(v) for v in xyxy]
+            x, y, x2, y2 = [float(v) * scale for v in xyxy]
             
             # Determine damage type based on detection (you can improve this logic)
             damage_types = ["scratch", "dent", "crack", "shatter", "deformation", "missing"]
@@ -635,6 +1043,7 @@ def format_and_save_yolo_result_improved(
     db_analysis.overallSeverityLevel = severity_level
     db_analysis.overallSeverityScore = min(severity_score, 100.0)
     db_analysis.overallSeverityDescription = f"{severity_level.capitalize()} vehicle damage detected"
+    damage_analytics.analysis_saved(db, db_analysis)
 
 def format_and_save_result(
     db_analysis: AnalysisResultModel,
@@ -665,6 +1074,7 @@ def format_and_save_result(
             "confidenceScore": float(dmg.get("confidence", dmg.get("confidenceScore", 0.5))),
             "boundingBox": dmg.get("boundingBox", {"x": 0, "y": 0, "width": 0, "height": 0}),
             "estimatedCost": float(dmg.get("estimatedCost", 0)),
+            **({"severity": dmg["severity"]} if dmg.get("severity") in ("minor", "moderate", "severe") else {}),
         })
 
     db_analysis.damages = formatted_damages
@@ -676,33 +1086,33 @@ def format_and_save_result(
     db_analysis.overallSeverityLevel = severity_level
     db_analysis.overallSeverityScore = min(severity_score, 100.0)
     db_analysis.overallSeverityDescription = f"{severity_level.capitalize()} vehicle damage detected"
+    damage_analytics.analysis_saved(db, db_analysis)
 
 @app.get("/api/v1/analysis/{analysis_id}", response_model=AnalysisResult)
-async def get_analysis_result(analysis_id: str, db: Session = Depends(get_db)):
+async def get_analysis_result(analysis_id: str, db: AsyncSession = Depends(get_db)):
     """Retrieve analysis results by ID"""
-    db_analysis = db.query(AnalysisResultModel).filter(
+    db_analysis = await db.scalar(select(AnalysisResultModel).where(
         AnalysisResultModel.id == analysis_id
-    ).first()
+    ))
     
     if not db_analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    return model_to_analysis_result(db_analysis)
+    return fast_json_response(lambda: analysis_payload(db_analysis), lambda: model_to_analysis_result(db_analysis))
 
 
 @app.get("/api/v1/analysis/{analysis_id}/with-insurance", response_model=AnalysisResultWithInsurance)
-async def get_analysis_with_insurance(analysis_id: str, db: Session = Depends(get_db)):
+async def get_analysis_with_insurance(analysis_id: str, db: AsyncSession = Depends(get_db)):
     """Retrieve analysis results with insurance details"""
-    db_analysis = db.query(AnalysisResultModel).filter(
+    db_analysis = await db.scalar(select(AnalysisResultModel).options(
+        selectinload(AnalysisResultModel.insuranceDetails)
+    ).where(
         AnalysisResultModel.id == analysis_id
-    ).first()
+    ))
     
     if not db_analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    # Get base analysis result
-    result = model_to_analysis_result(db_analysis)
-    
     # Get insurance details if available
     insurance_details = None
     if db_analysis.insuranceDetails:
@@ -734,18 +1144,24 @@ async def get_analysis_with_insurance(analysis_id: str, db: Session = Depends(ge
             calculations=calculations
         )
     
-    return AnalysisResultWithInsurance(
-        **result.dict(),
-        insuranceDetails=insurance_details
+    return fast_json_response(
+        lambda: {
+            **analysis_payload(db_analysis),
+            "insuranceDetails": insurance_details.model_dump(mode="json") if insurance_details else None,
+        },
+        lambda: AnalysisResultWithInsurance(
+            **model_to_analysis_result(db_analysis).model_dump(),
+            insuranceDetails=insurance_details
+        ),
     )
 
 
 @app.get("/api/v1/analysis/{analysis_id}/insurance", response_model=InsuranceDetailsResponse)
-async def get_insurance_details(analysis_id: str, db: Session = Depends(get_db)):
+async def get_insurance_details(analysis_id: str, db: AsyncSession = Depends(get_db)):
     """Get insurance details for an analysis"""
-    insurance = db.query(InsuranceDetailsModel).filter(
+    insurance = await db.scalar(select(InsuranceDetailsModel).where(
         InsuranceDetailsModel.analysisId == analysis_id
-    ).first()
+    ))
     
     if not insurance:
         raise HTTPException(status_code=404, detail="Insurance details not found for this analysis")
@@ -779,23 +1195,77 @@ async def get_insurance_details(analysis_id: str, db: Session = Depends(get_db))
 
 
 @app.get("/api/v1/analysis/{analysis_id}/status", response_model=AnalysisStatus)
-async def get_analysis_status(analysis_id: str, db: Session = Depends(get_db)):
+async def get_analysis_status(analysis_id: str, db: AsyncSession = Depends(get_db)):
     """Get analysis processing status"""
-    db_analysis = db.query(AnalysisResultModel).filter(
+    db_analysis = await db.scalar(select(AnalysisResultModel).where(
         AnalysisResultModel.id == analysis_id
-    ).first()
+    ))
     
     if not db_analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    # Calculate progress based on status
-    progress = 100 if db_analysis.status == "completed" else \
-              50 if db_analysis.status == "processing" else \
-              0
-    
+    # Progress of the current pipeline stage (50 while processing if this process hasn't seen it)
     return AnalysisStatus(
         status=db_analysis.status,
-        progress=progress,
+        progress=analysis_events.current(analysis_id, db_analysis.status)["progress"],
+    )
+
+
+async def load_analysis_status(analysis_id: str) -> Optional[str]:
+    # A short session of its own: an event stream must not hold a connection while it waits
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(AnalysisResultModel.status).where(AnalysisResultModel.id == analysis_id))
+
+
+def format_sse(event: dict) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+
+async def analysis_event_stream(subscription, event: dict):
+    with subscription:
+        yield format_sse(event)
+        while event["status"] == "processing":
+            pushed = await subscription.next(timeout=settings.ANALYSIS_EVENTS_HEARTBEAT_SECONDS)
+            if pushed is None:
+                # Quiet for a while: this is also how analyses run by a standalone worker are seen to finish
+                status = await load_analysis_status(subscription.analysis_id)
+                if status == "processing":
+                    yield ": keep-alive\n\n"
+                    continue
+                pushed = analysis_events.current(subscription.analysis_id, status or "failed")
+            elif pushed is event:
+                continue  # published between subscribing and reading the status; already sent
+            event = pushed
+            yield format_sse(event)
+
+
+@app.get("/api/v1/analysis/{analysis_id}/events")
+async def stream_analysis_events(analysis_id: str):
+    """
+    Server-Sent Events stream of an analysis' progress, instead of polling /status.
+    
+    Each message is a JSON event {analysisId, stage, status, progress, at, ...}:
+    the current stage first, then every transition (queued, started,
+    cloud_attempt with backend and attempt, local_fallback, saving, retrying)
+    as the worker publishes it. The stream ends after "completed" or "failed".
+    While nothing happens a comment line is sent every
+    ANALYSIS_EVENTS_HEARTBEAT_SECONDS and the stored status is checked once.
+    """
+    # Subscribe before reading the status, so no transition falls in between
+    subscription = analysis_events.subscribe(analysis_id)
+    try:
+        status = await load_analysis_status(analysis_id)
+    except BaseException:
+        subscription.close()
+        raise
+    if status is None:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    return StreamingResponse(
+        analysis_event_stream(subscription, analysis_events.current(analysis_id, status)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 # ============================================
@@ -809,9 +1279,14 @@ async def get_claims(
     dateTo: Optional[str] = Query(None),
     minConfidence: Optional[float] = Query(None),
     searchQuery: Optional[str] = Query(None),
+    fuzzy: bool = Query(False),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    count: str = Query("exact", pattern="^(exact|estimate|none)$"),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve claims with filtering and pagination.
@@ -821,150 +1296,294 @@ async def get_claims(
     - dateFrom: Filter claims from this date (ISO format)
     - dateTo: Filter claims to this date (ISO format)
     - minConfidence: Filter by minimum AI confidence score
-    - searchQuery: Search by claim number or vehicle plate
-    - page: Page number (1-indexed)
+    - searchQuery: Search by claim number, vehicle plate (spacing/case/hyphen insensitive) or owner name
+    - fuzzy: Also match near misses of searchQuery (a mistyped character or two)
+    - page: Page number (1-indexed), offset pagination; ignored when a cursor is given
     - limit: Results per page
+    - cursor: nextCursor/prevCursor from a previous response; keyset pagination on
+      (submittedAt, id), so deep pages cost the same as the first one
+    - count: "exact" (default), "estimate" (the running counter when unfiltered) or "none" (skip the count)
+    - view: "full" (default) or "summary" - ledger columns only; the analysisResult key is left out
+    - fields: Comma-separated Claim fields to return (id is always included, other fields are left out)
+    
+    A key missing from a projected row means "not requested"; analysisResult: null
+    always means the claim has no analysis.
     """
-    query = db.query(ClaimModel)
+    selected_fields = None
+    if fields:
+        selected_fields = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = selected_fields - set(Claim.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        selected_fields.add("id")
+    if view == "summary":
+        selected_fields = (selected_fields or set(Claim.model_fields)) - {"analysisResult"}
+    include_analysis = selected_fields is None or "analysisResult" in selected_fields
+    
+    keyset = None
+    if cursor:
+        try:
+            keyset = decode_claim_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    query = select(ClaimModel)
     
     # Apply filters
     if status:
-        query = query.filter(ClaimModel.status == status)
+        query = query.where(ClaimModel.status == status)
     
     if dateFrom:
         try:
             date_from = datetime.fromisoformat(dateFrom)
-            query = query.filter(ClaimModel.submittedAt >= date_from)
+            query = query.where(ClaimModel.submittedAt >= date_from)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid dateFrom format")
     
     if dateTo:
         try:
             date_to = datetime.fromisoformat(dateTo)
-            query = query.filter(ClaimModel.submittedAt <= date_to)
+            query = query.where(ClaimModel.submittedAt <= date_to)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid dateTo format")
     
     if minConfidence is not None:
-        query = query.filter(ClaimModel.aiConfidence >= minConfidence)
+        query = query.where(ClaimModel.aiConfidence >= minConfidence)
     
     if searchQuery:
-        query = query.filter(
-            or_(
+        # Trigram index lookup; short queries (or no index) fall back to a LIKE scan
+        search = await db.run_sync(claim_search.filter_clause, searchQuery, fuzzy=fuzzy)
+        if search is None:
+            search = or_(
                 ClaimModel.claimNumber.ilike(f"%{searchQuery}%"),
                 ClaimModel.vehiclePlate.ilike(f"%{searchQuery}%"),
             )
-        )
-    
-    # Get total count before pagination
-    total = query.count()
-    
-    # Pagination
-    limit = min(limit, 100)
-    offset = (page - 1) * limit
-    
-    # Calculate total pages
-    total_pages = ceil(total / limit) if limit > 0 else 0
+        query = query.where(search)
+    
+    # Total count: the running counter is exact only when no filter applies
+    filtered = any([status, dateFrom, dateTo, minConfidence is not None, searchQuery])
+    if count == "none":
+        total = None
+    elif count == "estimate" and not filtered:
+        total = await db.run_sync(claim_stats.total_claims)
+    else:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    
+    total_pages = ceil(total / limit) if total is not None else None
+    
+    # Newest first, with id as the tie-breaker so the order (and every cursor) is stable.
+    # One extra row is fetched to tell whether another page follows.
+    if include_analysis:
+        # The page's analyses come in one extra IN query instead of one lazy load per claim
+        query = query.options(selectinload(ClaimModel.analysisResult))
+    if keyset:
+        submitted_at, claim_id, direction = keyset
+        key = tuple_(ClaimModel.submittedAt, ClaimModel.id)
+        if direction == "next":
+            query = query.where(key < (submitted_at, claim_id)).order_by(desc(ClaimModel.submittedAt), desc(ClaimModel.id))
+        else:
+            query = query.where(key > (submitted_at, claim_id)).order_by(ClaimModel.submittedAt, ClaimModel.id)
+        claims = list(await db.scalars(query.limit(limit + 1)))
+        more = len(claims) > limit
+        claims = claims[:limit]
+        if direction == "prev":
+            claims.reverse()
+        has_next, has_prev = (more, True) if direction == "next" else (True, more)
+    else:
+        offset = (page - 1) * limit
+        query = query.order_by(desc(ClaimModel.submittedAt), desc(ClaimModel.id))
+        claims = list(await db.scalars(query.offset(offset).limit(limit + 1)))
+        has_next, has_prev = len(claims) > limit, page > 1
+        claims = claims[:limit]
+    
+    page_info = {
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "totalPages": total_pages,
+        "nextCursor": encode_claim_cursor(claims[-1], "next") if claims and has_next else None,
+        "prevCursor": encode_claim_cursor(claims[0], "prev") if claims and has_prev else None,
+    }
     
-    # Get paginated data
-    claims = query.order_by(desc(ClaimModel.submittedAt)).offset(offset).limit(limit).all()
+    def fast_page():
+        rows = [claim_payload(claim, include_analysis) for claim in claims]
+        if selected_fields is not None:
+            rows = [{name: value for name, value in row.items() if name in selected_fields} for row in rows]
+        return {"data": rows, **page_info}
     
-    # Convert to Pydantic models
-    data = [model_to_claim(claim, db) for claim in claims]
+    def model_page():
+        response = PaginatedResponse(
+            data=[model_to_claim(claim, db, include_analysis=include_analysis) for claim in claims], **page_info
+        )
+        if selected_fields is None:
+            return response
+        # A projection doesn't fit the Claim schema, so it is serialised directly
+        return JSONResponse(jsonable_encoder(response.model_dump(include={
+            "data": {"__all__": selected_fields}, "total": True, "page": True, "limit": True, "totalPages": True,
+            "nextCursor": True, "prevCursor": True,
+        })))
     
-    return PaginatedResponse(
-        data=data,
-        total=total,
-        page=page,
-        limit=limit,
-        totalPages=total_pages
-    )
+    return fast_json_response(fast_page, model_page)
     
 
 @app.post("/api/v1/claims", response_model=Claim)
 async def create_claim(
     analysis_id: str = Query(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a claim from an analysis result"""
-    analysis = db.query(AnalysisResultModel).filter(
+    analysis = await db.scalar(select(AnalysisResultModel).where(
         AnalysisResultModel.id == analysis_id
-    ).first()
+    ))
     
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
     # Check if claim already exists
-    existing_claim = db.query(ClaimModel).filter(
+    existing_claim = await db.scalar(select(ClaimModel).options(
+        selectinload(ClaimModel.analysisResult)
+    ).where(
         ClaimModel.id == analysis_id
-    ).first()
+    ))
     
     if existing_claim:
         return model_to_claim(existing_claim, db)
     
     # Create new claim
-    claim_number = generate_claim_number()
-    
-    vehicle_info = {
-        "make": analysis.vehicleMake,
-        "model": analysis.vehicleModel,
-        "year": analysis.vehicleYear,
-        "plateNumber": analysis.vehiclePlateNumber,
-        "vin": analysis.vehicleVin,
-        "color": analysis.vehicleColor,
-    }
-    
-    new_claim = ClaimModel(
-        id=analysis_id,
-        claimNumber=claim_number,
-        vehiclePlate=analysis.vehiclePlateNumber or "Unknown",
-        vehicleInfoJson=vehicle_info,
-        analysisResultId=analysis_id,
-        aiConfidence=analysis.aiConfidence,
-        status=ClaimStatus.pending,
-        totalPayout=analysis.totalEstimatedCost,
-        submittedAt=datetime.utcnow(),
-    )
+    new_claim = claim_from_analysis(analysis)
+    new_claim.analysisResult = analysis
     
     db.add(new_claim)
-    db.commit()
-    db.refresh(new_claim)
-    
-    logger.info(f"Created claim {claim_number} for analysis {analysis_id}")
-    
+    await db.run_sync(claim_stats.claim_created, new_claim)
+    await db.run_sync(claim_search.claim_saved, new_claim)
+    await db.commit()
     
+    logger.info(f"Created claim {new_claim.claimNumber} for analysis {analysis_id}")
     
     return model_to_claim(new_claim, db)
 
+def unique_bulk_ids(ids: List[str]) -> List[str]:
+    """Request ids without repeats (first occurrence order); 400 above BULK_MAX_ITEMS"""
+    unique = list(dict.fromkeys(ids))
+    if len(unique) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_ITEMS} items per request")
+    return unique
+
+def bulk_response(results: List[BulkItemResult]) -> BulkResponse:
+    failed = sum(1 for item in results if item.result == "not_found")
+    return BulkResponse(succeeded=len(results) - failed, failed=failed, results=results)
+
+@app.post("/api/v1/claims/bulk", response_model=BulkResponse)
+async def bulk_create_claims(request: BulkCreateClaimsRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Create claims for many analyses in one transaction. Analyses that already
+    have a claim are reported as "exists"; unknown ids as "not_found".
+    """
+    analysis_ids = unique_bulk_ids(request.analysisIds)
+    analyses = {
+        analysis.id: analysis
+        for analysis in await db.scalars(select(AnalysisResultModel).where(AnalysisResultModel.id.in_(analysis_ids)))
+    }
+    existing = {
+        row.id: row
+        for row in await db.execute(
+            select(ClaimModel.id, ClaimModel.claimNumber, ClaimModel.status).where(ClaimModel.id.in_(analysis_ids))
+        )
+    }
+    
+    results, new_claims = [], []
+    for analysis_id in analysis_ids:
+        if analysis_id in existing:
+            claim = existing[analysis_id]
+            results.append(BulkItemResult(id=analysis_id, result="exists", claimNumber=claim.claimNumber, status=claim.status))
+        elif analysis_id in analyses:
+            claim = claim_from_analysis(analyses[analysis_id])
+            new_claims.append(claim)
+            results.append(BulkItemResult(id=analysis_id, result="created", claimNumber=claim.claimNumber, status=claim.status))
+        else:
+            results.append(BulkItemResult(id=analysis_id, result="not_found"))
+    
+    if new_claims:
+        db.add_all(new_claims)
+        await db.run_sync(claim_stats.claims_created, new_claims)
+        await db.run_sync(claim_search.claims_saved, new_claims)
+        await db.commit()
+        logger.info(f"Bulk-created {len(new_claims)} claims")
+    
+    return bulk_response(results)
+
+BULK_TARGET_STATUS = {
+    BulkStatusAction.approve: ClaimStatus.approved,
+    BulkStatusAction.reject: ClaimStatus.rejected,
+    BulkStatusAction.review: ClaimStatus.under_review,
+}
+
+@app.post("/api/v1/claims/bulk/status", response_model=BulkResponse)
+async def bulk_update_claim_status(request: BulkStatusRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Approve, reject or send many claims for review in one transaction: a single
+    UPDATE for the claims plus one aggregate update per affected day. Same
+    semantics as the single-claim endpoints (notes are the reject reason).
+    """
+    claim_ids = unique_bulk_ids(request.claimIds)
+    if request.action != BulkStatusAction.approve and not request.notes:
+        raise HTTPException(status_code=400, detail=f"notes are required to {request.action.value} claims")
+    
+    target = BULK_TARGET_STATUS[request.action]
+    values = {"status": target}
+    if request.action != BulkStatusAction.review:
+        values["processedAt"] = datetime.utcnow()
+    if request.notes:
+        values["adjusterNotes"] = request.notes
+    
+    rows = (await db.execute(
+        select(ClaimModel.id, ClaimModel.claimNumber, ClaimModel.submittedAt, ClaimModel.status, ClaimModel.processedAt)
+        .where(ClaimModel.id.in_(claim_ids))
+    )).all()
+    if rows:
+        await db.execute(
+            update(ClaimModel).where(ClaimModel.id.in_([row.id for row in rows])).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.run_sync(claim_stats.claims_changed, [
+            (row.submittedAt, ClaimSnapshot(row.status, row.processedAt),
+             ClaimSnapshot(target, values.get("processedAt", row.processedAt)))
+            for row in rows
+        ])
+        await db.commit()
+        logger.info(f"Bulk {request.action.value}: {len(rows)} claims")
+    
+    found = {row.id: row for row in rows}
+    return bulk_response([
+        BulkItemResult(id=claim_id, result="updated", claimNumber=found[claim_id].claimNumber, status=target)
+        if claim_id in found else BulkItemResult(id=claim_id, result="not_found")
+        for claim_id in claim_ids
+    ])
+
 @app.get("/api/v1/claims/{claim_id}", response_model=Claim)
-async def get_claim(claim_id: str, db: Session = Depends(get_db)):
+async def get_claim(claim_id: str, db: AsyncSession = Depends(get_db)):
     """Retrieve a specific claim by ID"""
-    claim = db.query(ClaimModel).filter(ClaimModel.id == claim_id).first()
+    claim = await load_claim(db, claim_id)
     
-    if not claim:
-        raise HTTPException(status_code=404, detail="Claim not found")
-    
-    return model_to_claim(claim, db)
+    return fast_json_response(lambda: claim_payload(claim), lambda: model_to_claim(claim, db))
 
 @app.post("/api/v1/claims/{claim_id}/approve", response_model=Claim)
 async def approve_claim(
     claim_id: str,
     request: ApproveClaimRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Approve a claim"""
-    claim = db.query(ClaimModel).filter(ClaimModel.id == claim_id).first()
-    
-    if not claim:
-        raise HTTPException(status_code=404, detail="Claim not found")
+    claim = await load_claim(db, claim_id)
     
+    before = claim_stats.snapshot(claim)
     claim.status = ClaimStatus.approved
     claim.processedAt = datetime.utcnow()
     if request.notes:
         claim.adjusterNotes = request.notes
+    await db.run_sync(claim_stats.claim_changed, claim, before)
     
-    db.commit()
-    db.refresh(claim)
+    await db.commit()
     
     return model_to_claim(claim, db)
 
@@ -972,20 +1591,18 @@ async def approve_claim(
 async def reject_claim(
     claim_id: str,
     request: RejectClaimRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Reject a claim"""
-    claim = db.query(ClaimModel).filter(ClaimModel.id == claim_id).first()
-    
-    if not claim:
-        raise HTTPException(status_code=404, detail="Claim not found")
+    claim = await load_claim(db, claim_id)
     
+    before = claim_stats.snapshot(claim)
     claim.status = ClaimStatus.rejected
     claim.processedAt = datetime.utcnow()
     claim.adjusterNotes = request.reason
+    await db.run_sync(claim_stats.claim_changed, claim, before)
     
-    db.commit()
-    db.refresh(claim)
+    await db.commit()
     
     return model_to_claim(claim, db)
 
@@ -993,19 +1610,17 @@ async def reject_claim(
 async def request_review(
     claim_id: str,
     request: RequestReviewRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Request review for a claim"""
-    claim = db.query(ClaimModel).filter(ClaimModel.id == claim_id).first()
-    
-    if not claim:
-        raise HTTPException(status_code=404, detail="Claim not found")
+    claim = await load_claim(db, claim_id)
     
+    before = claim_stats.snapshot(claim)
     claim.status = ClaimStatus.under_review
     claim.adjusterNotes = request.notes
+    await db.run_sync(claim_stats.claim_changed, claim, before)
     
-    db.commit()
-    db.refresh(claim)
+    await db.commit()
     
     return model_to_claim(claim, db)
 
@@ -1016,20 +1631,17 @@ async def request_review(
 @app.post("/api/v1/reports/generate")
 async def generate_report(
     request: ReportRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Generate a report (PDF/JSON) for a claim"""
-    claim = db.query(ClaimModel).filter(ClaimModel.id == request.claimId).first()
-    
-    if not claim:
-        raise HTTPException(status_code=404, detail="Claim not found")
+    claim = await load_claim(db, request.claimId)
     
     # Build report data
     
     if request.format == "json":
         # Return JSON report
         report_data = {
-            "claim": model_to_claim(claim, db).dict(),
+            "claim": model_to_claim(claim, db).model_dump(),
             "includedImages": request.includeImages,
             "includedMetrics": request.includeConfidenceMetrics,
         }
@@ -1043,9 +1655,9 @@ async def generate_report(
         raise HTTPException(status_code=400, detail="Invalid format. Use 'json' or 'pdf'")
 
 @app.get("/api/v1/reports/{claim_id}/download")
-async def download_report(claim_id: str, db: Session = Depends(get_db)):
+async def download_report(claim_id: str, db: AsyncSession = Depends(get_db)):
     """Get download URL for a report"""
-    claim = db.query(ClaimModel).filter(ClaimModel.id == claim_id).first()
+    claim = await db.scalar(select(ClaimModel.id).where(ClaimModel.id == claim_id))
     
     if not claim:
         raise HTTPException(status_code=404, detail="Claim not found")
@@ -1060,91 +1672,57 @@ async def download_report(claim_id: str, db: Session = Depends(get_db)):
 # ============================================
 
 @app.get("/api/v1/analytics/dashboard", response_model=DashboardStats)
-async def get_dashboard_stats(db: Session = Depends(get_db)):
-    """Get aggregated dashboard statistics"""
-    total_claims = db.query(ClaimModel).count()
-    pending_claims = db.query(ClaimModel).filter(
-        ClaimModel.status == ClaimStatus.pending
-    ).count()
-    
-    # Count approved claims from today
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    approved_today = db.query(ClaimModel).filter(
-        and_(
-            ClaimModel.status == ClaimStatus.approved,
-            ClaimModel.processedAt >= today,
-        )
-    ).count()
-    
-    # Calculate average processing time (in hours)
-    processed_claims = db.query(ClaimModel).filter(
-        ClaimModel.processedAt.isnot(None)
-    ).all()
-    
-    if processed_claims:
-        total_time = sum(
-            (claim.processedAt - claim.submittedAt).total_seconds() / 3600
-            for claim in processed_claims
-        )
-        average_processing_time = total_time / len(processed_claims)
-    else:
-        average_processing_time = 0.0
-    
-    # Calculate total payouts
-    total_payouts = sum(claim.totalPayout for claim in db.query(ClaimModel).all())
-    
-    return DashboardStats(
-        totalClaims=total_claims,
-        pendingClaims=pending_claims,
-        approvedToday=approved_today,
-        averageProcessingTime=average_processing_time,
-        totalPayouts=total_payouts,
-    )
+async def get_dashboard_stats(sync_db: Session = Depends(get_sync_db)):
+    """Get aggregated dashboard statistics (running counters, or SQL aggregates)"""
+    return DashboardStats(**await asyncio.to_thread(claim_stats.dashboard, sync_db))
 
 @app.get("/api/v1/analytics/trends", response_model=List[TrendDataPoint])
-async def get_claims_trend(days: int = Query(30, ge=1, le=365), db: Session = Depends(get_db)):
-    """Get claims trend over the specified number of days"""
-    trends = []
-    
-    for i in range(days):
-        date = datetime.utcnow() - timedelta(days=i)
-        date_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        date_end = date.replace(hour=23, minute=59, second=59, microsecond=999999)
-        
-        claims_count = db.query(ClaimModel).filter(
-            and_(
-                ClaimModel.submittedAt >= date_start,
-                ClaimModel.submittedAt <= date_end,
-            )
-        ).count()
-        
-        approved_count = db.query(ClaimModel).filter(
-            and_(
-                ClaimModel.status == ClaimStatus.approved,
-                ClaimModel.submittedAt >= date_start,
-                ClaimModel.submittedAt <= date_end,
-            )
-        ).count()
-        
-        rejected_count = db.query(ClaimModel).filter(
-            and_(
-                ClaimModel.status == ClaimStatus.rejected,
-                ClaimModel.submittedAt >= date_start,
-                ClaimModel.submittedAt <= date_end,
-            )
-        ).count()
-        
-        trends.append(
-            TrendDataPoint(
-                date=date.strftime("%Y-%m-%d"),
-                claims=claims_count,
-                approved=approved_count,
-                rejected=rejected_count,
-            )
-        )
-    
-    # Reverse to have chronological order
-    return list(reversed(trends))
+async def get_claims_trend(days: int = Query(30, ge=1, le=365), sync_db: Session = Depends(get_sync_db)):
+    """Get claims trend over the specified number of days (one grouped query, or the daily rollup)"""
+    return [TrendDataPoint(**point) for point in await asyncio.to_thread(claim_stats.trend, sync_db, days)]
+
+@app.get("/api/v1/analytics/damages", response_model=List[DamageAggregate])
+async def get_damage_aggregates(
+    groupBy: Optional[str] = Query(None, description="Comma-separated: part, damageType, severity, city, engine"),
+    period: Optional[str] = Query(None, description="day or month of processedAt"),
+    part: Optional[str] = Query(None),
+    damageType: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    city: Optional[str] = Query(None),
+    engine: Optional[str] = Query(None),
+    dateFrom: Optional[str] = Query(None),
+    dateTo: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    sync_db: Session = Depends(get_sync_db),
+):
+    """
+    Damage count, total/average repair cost and average confidence, aggregated in SQL
+    over the damage_assessments rows, e.g. ?groupBy=part,damageType&city=Mumbai&period=month
+    """
+    group_by = [name.strip() for name in groupBy.split(",") if name.strip()] if groupBy else []
+    unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid groupBy: {', '.join(unknown)}")
+    if period and period not in PERIODS:
+        raise HTTPException(status_code=400, detail="Invalid period (day or month)")
+    
+    dates = {}
+    for name, value in (("dateFrom", dateFrom), ("dateTo", dateTo)):
+        if value:
+            try:
+                dates[name] = datetime.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid {name} format")
+    
+    filters = {
+        name: value for name, value in (
+            ("part", part), ("damageType", damageType), ("severity", severity), ("city", city), ("engine", engine),
+        ) if value
+    }
+    rows = await asyncio.to_thread(
+        damage_analytics.aggregate, sync_db, group_by, period, filters, dates.get("dateFrom"), dates.get("dateTo"), limit,
+    )
+    return [DamageAggregate(**row) for row in rows]
 
 # ============================================
 # HEALTH CHECK
@@ -1158,6 +1736,57 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat(),
     }
 
+@app.get("/api/v1/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the database is initialised and every engine is loaded and warmed up"""
+    engines = {engine.name: engine.status() for engine in (cloud_engine, local_engine)}
+    db_init_seconds = getattr(app.state, "db_init_seconds", None)
+    ready = db_init_seconds is not None and cloud_engine.ready and local_engine.ready
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "timestamp": datetime.utcnow().isoformat(),
+            "engines": engines,
+            "timings": {"dbInitSeconds": db_init_seconds, "imports": dict(import_timings)},
+        },
+    )
+
+@app.get("/api/v1/system/breakers")
+async def circuit_breaker_status():
+    """Circuit breaker state and health score for every AI backend, in routing order"""
+    # A monitoring poll must not build the cloud engine; until it exists, report the breakers that do
+    cloud_ai = cloud_engine.peek()
+    cloud_labels = cloud_ai.backend_labels() if cloud_ai else [
+        label for label in circuit_breakers.snapshot() if label != "LOCAL_YOLO"
+    ]
+    labels = cloud_labels + ["LOCAL_YOLO"]
+    backends = {label: circuit_breakers.get(label).snapshot() for label in labels}
+    for label in cloud_labels:
+        # Hedge race losers: cancelled rather than failed, so the breaker's own counts leave them out
+        backends[label]["cancelledCalls"] = cloud_ai.cancelled_calls(label) if cloud_ai else 0
+    return {
+        "routingOrder": [label for label in labels if backends[label]["state"] != OPEN],
+        "backends": backends,
+    }
+
+@app.get("/api/v1/system/stats")
+async def system_stats():
+    """Runtime statistics for the analysis pipeline"""
+    local_detector = local_engine.peek()
+    cloud_ai = cloud_engine.peek()
+    return {
+        "yoloBatching": local_detector.stats() if isinstance(local_detector, YoloBatchQueue) else None,
+        "yoloProcessPool": local_detector.stats() if isinstance(local_detector, YoloProcessPool) else None,
+        "uploadDedup": deduplicator.stats(),
+        "cloudHedging": cloud_ai.hedge_stats() if cloud_ai else None,
+        "imagePreprocessing": preprocessing_stats.stats(),
+        "jobQueue": {**job_queue.stats(), "inFlight": job_worker.in_flight},
+        "resultWriter": result_writer.stats(),
+        "imageDerivatives": derivative_cache.stats(),
+        "analysisEvents": analysis_events.stats(),
+    }
+
 # ============================================
 # ROOT ENDPOINT
 # ============================================
@@ -0,0 +1,64 @@
+# backend/migrations/env.py
+# Alembic environment: runs the revisions against settings.DATABASE_URL, or the connection init_db hands over
+from logging.config import fileConfig
+
+from alembic import context
+
+from config import settings
+from models.database import Base, create_db_engine
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Leave the claim search index (FTS5 virtual and shadow tables, revision 0009) out of autogenerate"""
+    return not (type_ == "table" and name.startswith("claim_search"))
+
+
+def run_migrations_offline() -> None:
+    """Emit the SQL instead of running it (alembic upgrade head --sql)"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection) -> None:
+    # Batch mode, so ALTERs SQLite can't do in place are run as a table copy
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # Called from init_db: the app's engine and logging are already set up
+        run_migrations(connection)
+        return
+
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+    engine = create_db_engine(echo=False)
+    try:
+        with engine.connect() as connection:
+            run_migrations(connection)
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
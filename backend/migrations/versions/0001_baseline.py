@@ -0,0 +1,101 @@
+"""baseline: analysis results, insurance details and claims
+
+The schema before migrations were introduced. Databases created by earlier
+versions of the app (create_all, no alembic_version table) are stamped at
+this revision by init_db and upgraded from here.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'analysis_results',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('imageUrl', sa.String(), nullable=True),
+        sa.Column('vehicleMake', sa.String(), nullable=True),
+        sa.Column('vehicleModel', sa.String(), nullable=True),
+        sa.Column('vehicleYear', sa.Integer(), nullable=True),
+        sa.Column('vehiclePlateNumber', sa.String(), nullable=True),
+        sa.Column('vehicleVin', sa.String(), nullable=True),
+        sa.Column('vehicleColor', sa.String(), nullable=True),
+        sa.Column('damages', sa.JSON(), nullable=True),
+        sa.Column('overallSeverityLevel', sa.Enum('minor', 'moderate', 'severe', name='severitylevel'), nullable=True),
+        sa.Column('overallSeverityScore', sa.Float(), nullable=True),
+        sa.Column('overallSeverityDescription', sa.String(), nullable=True),
+        sa.Column('totalEstimatedCost', sa.Float(), nullable=True),
+        sa.Column('aiConfidence', sa.Float(), nullable=True),
+        sa.Column('processedAt', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('engine', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'insurance_details',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('analysisId', sa.String(), nullable=False),
+        sa.Column('ownerName', sa.String(), nullable=True),
+        sa.Column('city', sa.String(), nullable=True),
+        sa.Column('fuelType', sa.String(), nullable=True),
+        sa.Column('vehiclePriceLakhs', sa.Float(), nullable=True),
+        sa.Column('purchaseDate', sa.Date(), nullable=True),
+        sa.Column('vehicleCondition', sa.Float(), nullable=True),
+        sa.Column('hasZeroDepreciation', sa.Boolean(), nullable=True),
+        sa.Column('hasReturnToInvoice', sa.Boolean(), nullable=True),
+        sa.Column('estimatedRepairBill', sa.Float(), nullable=True),
+        sa.Column('calculatedIDV', sa.Float(), nullable=True),
+        sa.Column('estimatedResale', sa.Float(), nullable=True),
+        sa.Column('insurerPayout', sa.Float(), nullable=True),
+        sa.Column('ownerLiability', sa.Float(), nullable=True),
+        sa.Column('vehicleAgeYears', sa.Float(), nullable=True),
+        sa.Column('createdAt', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['analysisId'], ['analysis_results.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('analysisId'),
+    )
+    op.create_table(
+        'claims',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('claimNumber', sa.String(), nullable=True),
+        sa.Column('vehiclePlate', sa.String(), nullable=True),
+        sa.Column('vehicleInfoJson', sa.JSON(), nullable=True),
+        sa.Column('submittedAt', sa.DateTime(), nullable=True),
+        sa.Column('processedAt', sa.DateTime(), nullable=True),
+        sa.Column('aiConfidence', sa.Float(), nullable=True),
+        sa.Column(
+            'status',
+            sa.Enum('pending', 'processing', 'approved', 'rejected', 'under_review', name='claimstatus'),
+            nullable=True,
+        ),
+        sa.Column('totalPayout', sa.Float(), nullable=True),
+        sa.Column('analysisResultId', sa.String(), nullable=True),
+        sa.Column('adjusterNotes', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['analysisResultId'], ['analysis_results.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_claims_claimNumber', 'claims', ['claimNumber'], unique=True)
+    op.create_index('ix_claims_status', 'claims', ['status'], unique=False)
+    op.create_index('ix_claims_vehiclePlate', 'claims', ['vehiclePlate'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_claims_vehiclePlate', table_name='claims')
+    op.drop_index('ix_claims_status', table_name='claims')
+    op.drop_index('ix_claims_claimNumber', table_name='claims')
+    op.drop_table('claims')
+    op.drop_table('insurance_details')
+    op.drop_table('analysis_results')
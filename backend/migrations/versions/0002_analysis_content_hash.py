@@ -0,0 +1,36 @@
+"""content and insurance-context hashes on analysis results, for upload deduplication
+
+Analyses stored before this revision keep NULL hashes: the insurance form
+they were submitted with isn't stored verbatim, so their context hash can't
+be recomputed, and they are simply never matched as duplicates.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('analysis_results') as batch_op:
+        batch_op.add_column(sa.Column('imageHash', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('contextHash', sa.String(), nullable=True))
+        batch_op.create_index('ix_analysis_results_image_context', ['imageHash', 'contextHash'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('analysis_results') as batch_op:
+        batch_op.drop_index('ix_analysis_results_image_context')
+        batch_op.drop_column('contextHash')
+        batch_op.drop_column('imageHash')
@@ -0,0 +1,46 @@
+"""durable analysis job queue
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'analysis_jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('analysisId', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('maxAttempts', sa.Integer(), nullable=True),
+        sa.Column('availableAt', sa.DateTime(), nullable=True),
+        sa.Column('leaseExpiresAt', sa.DateTime(), nullable=True),
+        sa.Column('leasedBy', sa.String(), nullable=True),
+        sa.Column('lastError', sa.Text(), nullable=True),
+        sa.Column('createdAt', sa.DateTime(), nullable=True),
+        sa.Column('updatedAt', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['analysisId'], ['analysis_results.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_analysis_jobs_analysisId', 'analysis_jobs', ['analysisId'], unique=False)
+    op.create_index('ix_analysis_jobs_status_available', 'analysis_jobs', ['status', 'availableAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analysis_jobs_status_available', table_name='analysis_jobs')
+    op.drop_index('ix_analysis_jobs_analysisId', table_name='analysis_jobs')
+    op.drop_table('analysis_jobs')
@@ -0,0 +1,37 @@
+"""per-day claim rollup for the trends endpoint
+
+Filled from the claims table on the next start (ClaimStats.ensure_rollup),
+since the rollup has to be rebuilt from the same grouped query anyway.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'claim_daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('claims', sa.Integer(), nullable=True),
+        sa.Column('approved', sa.Integer(), nullable=True),
+        sa.Column('rejected', sa.Integer(), nullable=True),
+        sa.Column('updatedAt', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('day'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('claim_daily_stats')
@@ -0,0 +1,41 @@
+"""running dashboard counters
+
+The single counters row is computed from the claims table on the next start
+(ClaimStats.ensure_counters).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'claim_counters',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('totalClaims', sa.Integer(), nullable=True),
+        sa.Column('pendingClaims', sa.Integer(), nullable=True),
+        sa.Column('totalPayouts', sa.Float(), nullable=True),
+        sa.Column('processedClaims', sa.Integer(), nullable=True),
+        sa.Column('processingHoursSum', sa.Float(), nullable=True),
+        sa.Column('approvedDay', sa.Date(), nullable=True),
+        sa.Column('approvedOnDay', sa.Integer(), nullable=True),
+        sa.Column('updatedAt', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('claim_counters')
@@ -0,0 +1,28 @@
+"""indexes for newest-first claim listing and keyset pagination on (submittedAt, id)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_claims_submitted_id', 'claims', ['submittedAt', 'id'], unique=False)
+    op.create_index('ix_claims_status_submitted_id', 'claims', ['status', 'submittedAt', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_claims_status_submitted_id', table_name='claims')
+    op.drop_index('ix_claims_submitted_id', table_name='claims')
@@ -0,0 +1,61 @@
+"""normalized damage rows for SQL-side damage analytics
+
+Rows for analyses completed before this revision are written from their
+damages JSON on the next start (DamageAnalytics.ensure), with the same code
+that writes them for new analyses.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'damage_assessments',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('analysisId', sa.String(), nullable=False),
+        sa.Column('part', sa.String(), nullable=True),
+        sa.Column('damageType', sa.String(), nullable=True),
+        sa.Column('severity', sa.String(), nullable=True),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('estimatedCost', sa.Float(), nullable=True),
+        sa.Column('bboxX', sa.Float(), nullable=True),
+        sa.Column('bboxY', sa.Float(), nullable=True),
+        sa.Column('bboxWidth', sa.Float(), nullable=True),
+        sa.Column('bboxHeight', sa.Float(), nullable=True),
+        sa.Column('engine', sa.String(), nullable=True),
+        sa.Column('city', sa.String(), nullable=True),
+        sa.Column('processedAt', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['analysisId'], ['analysis_results.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_damage_assessments_analysisId', 'damage_assessments', ['analysisId'], unique=False)
+    op.create_index('ix_damage_assessments_city_processed', 'damage_assessments', ['city', 'processedAt'], unique=False)
+    op.create_index('ix_damage_assessments_part_processed', 'damage_assessments', ['part', 'processedAt'], unique=False)
+    op.create_index('ix_damage_assessments_processed', 'damage_assessments', ['processedAt'], unique=False)
+    op.create_index(
+        'ix_damage_assessments_type_part_processed', 'damage_assessments',
+        ['damageType', 'part', 'processedAt'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_damage_assessments_type_part_processed', table_name='damage_assessments')
+    op.drop_index('ix_damage_assessments_processed', table_name='damage_assessments')
+    op.drop_index('ix_damage_assessments_part_processed', table_name='damage_assessments')
+    op.drop_index('ix_damage_assessments_city_processed', table_name='damage_assessments')
+    op.drop_index('ix_damage_assessments_analysisId', table_name='damage_assessments')
+    op.drop_table('damage_assessments')
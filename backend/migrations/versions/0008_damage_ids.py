@@ -0,0 +1,65 @@
+"""stable ids for stored damages that were saved without one
+
+Damages are given an id when their analysis is written; older rows may lack
+it. Reads of such rows derive one from the analysis id and the damage's
+position (derived_damage_id), and this writes that same id into the stored
+JSON, so ids clients have already seen don't change.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.database import derived_damage_id
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHUNK = 1000
+
+analysis_results = sa.table(
+    'analysis_results',
+    sa.column('id', sa.String()),
+    sa.column('damages', sa.JSON()),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(analysis_results.c.id, analysis_results.c.damages)
+            .where(analysis_results.c.id > last_id)
+            .order_by(analysis_results.c.id)
+            .limit(CHUNK)
+        ).all()
+        if not rows:
+            break
+        for analysis_id, damages in rows:
+            missing = [
+                (index, damage) for index, damage in enumerate(damages or ())
+                if isinstance(damage, dict) and "id" not in damage
+            ]
+            if not missing:
+                continue
+            for index, damage in missing:
+                damage["id"] = derived_damage_id(analysis_id, index)
+            bind.execute(
+                analysis_results.update().where(analysis_results.c.id == analysis_id).values(damages=damages)
+            )
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    # The ids are valid data for the previous revision too
+    pass
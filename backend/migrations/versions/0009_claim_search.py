@@ -0,0 +1,49 @@
+"""FTS5 trigram index for claim search (SQLite only)
+
+The index is two virtual tables the models don't describe: claim_search
+(one row per claim) and claim_search_vocab (its per-trigram counts). env.py
+leaves every claim_search* table, including the FTS5 shadow tables, out of
+autogenerate. On other databases, or a SQLite build without FTS5 trigram
+support, nothing is created and the claims list keeps its LIKE filter.
+ClaimSearchIndex.ensure fills the index from existing claims on the next
+start.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    try:
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS claim_search USING fts5("
+            "claim_id UNINDEXED, claimNumber, plate, owner, tokenize='trigram')"
+        )
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS claim_search_vocab USING fts5vocab(claim_search, 'row')")
+    except sa.exc.OperationalError as e:
+        logger.warning(f"Claim search index not created, searches will use LIKE scans: {e}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TABLE IF EXISTS claim_search_vocab")
+    op.execute("DROP TABLE IF EXISTS claim_search")
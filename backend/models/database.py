@@ -1,20 +1,107 @@
 # backend/models/database.py
-from sqlalchemy import create_engine, Column, String, Float, Integer, DateTime, JSON, Enum, Text, ForeignKey, Boolean, Date
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, Column, String, Float, Integer, DateTime, JSON, Enum, Text, ForeignKey, Boolean, Date, Index, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime, date
+from typing import Optional
 import enum
+import os
 import uuid
 
-DATABASE_URL = "sqlite:///./autoguard_ai.db"
+from config import settings
 
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False},
-    echo=True  # Set to False in production
-)
+DATABASE_URL = settings.DATABASE_URL
+
+def sqlite_pragmas() -> dict:
+    """Connection pragmas for SQLite from the settings (WAL, synchronous, busy timeout, cache, mmap)"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # negative = KiB rather than pages
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": "MEMORY",
+    }
+
+# Async drivers used for each backend when the configured URL names a sync one
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+def async_database_url(url: str) -> str:
+    """The same database with its async driver (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ASYNC_DRIVERS and parsed.get_driver_name() != ASYNC_DRIVERS[backend]:
+        parsed = parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return parsed.render_as_string(hide_password=False)
+
+def _engine_options(url: str, echo: bool, pragmas: Optional[dict]):
+    """create_engine keyword arguments for a URL, plus the SQLite pragmas to apply on connect"""
+    if make_url(url).get_backend_name() != "sqlite":
+        return {
+            "echo": echo,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": True,
+        }, {}
+    
+    pragmas = sqlite_pragmas() if pragmas is None else dict(pragmas)
+    if make_url(url).database in (None, "", ":memory:"):
+        pragmas.pop("journal_mode", None)  # in-memory databases have no WAL
+        pragmas.pop("mmap_size", None)
+    return {
+        "echo": echo,
+        "connect_args": {
+            "check_same_thread": False,
+            # sqlite3's own lock wait; busy_timeout below sets the same thing per connection
+            "timeout": pragmas.get("busy_timeout", 5000) / 1000,
+        },
+    }, pragmas
+
+def _apply_sqlite_pragmas(sync_engine, pragmas: dict):
+    if not pragmas:
+        return
+    
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_db_engine(url: str = DATABASE_URL, echo: bool = settings.DB_ECHO, pragmas: Optional[dict] = None):
+    """
+    Build the (sync) engine for a database URL.
+    
+    SQLite gets its pragmas applied on every new connection (pragmas=None uses
+    the settings, {} leaves SQLite's defaults). Server databases get a
+    pre-pinged QueuePool sized by DB_POOL_SIZE / DB_MAX_OVERFLOW.
+    """
+    options, pragmas = _engine_options(url, echo, pragmas)
+    db_engine = create_engine(url, **options)
+    _apply_sqlite_pragmas(db_engine, pragmas)
+    return db_engine
+
+def create_async_db_engine(url: str = DATABASE_URL, echo: bool = settings.DB_ECHO, pragmas: Optional[dict] = None):
+    """Async engine for the same database (aiosqlite / asyncpg), with the same pragmas and pool options"""
+    options, pragmas = _engine_options(url, echo, pragmas)
+    db_engine = create_async_engine(async_database_url(url), **options)
+    _apply_sqlite_pragmas(db_engine.sync_engine, pragmas)
+    return db_engine
+
+# The API's request handlers use the async engine; the job worker, startup
+# maintenance and other thread-pool code keep the sync one
+engine = create_db_engine()
+async_engine = create_async_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Attributes stay loaded after commit: an expired attribute would need an awaited refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 class ClaimStatus(str, enum.Enum):
@@ -64,10 +151,21 @@ class AnalysisResultModel(Base):
     processedAt = Column(DateTime, default=datetime.utcnow)
     status = Column(String, default="processing")  # processing, completed, failed
     engine = Column(String, nullable=True)  # Local-Vision-Core or Cloud-Neural-Engine
+    imageHash = Column(String, nullable=True)  # SHA-256 of the uploaded image bytes
+    contextHash = Column(String, nullable=True)  # SHA-256 of the insurance context sent with it
     
     # Relationship
     claims = relationship("ClaimModel", back_populates="analysisResult")
     insuranceDetails = relationship("InsuranceDetailsModel", back_populates="analysis", uselist=False)
+    
+    __table_args__ = (
+        Index("ix_analysis_results_image_context", "imageHash", "contextHash"),
+    )
+
+
+def derived_damage_id(analysis_id: str, index: int) -> str:
+    """Id for a stored damage saved without one, from its analysis and position, so every read gets the same id"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{analysis_id}/damages/{index}"))
 
 
 class InsuranceDetailsModel(Base):
@@ -121,13 +219,125 @@ class ClaimModel(Base):
     
     # Relationships
     analysisResult = relationship("AnalysisResultModel", back_populates="claims")
+    
+    __table_args__ = (
+        # Newest-first listing and keyset pagination on (submittedAt, id)
+        Index("ix_claims_submitted_id", "submittedAt", "id"),
+        Index("ix_claims_status_submitted_id", "status", "submittedAt", "id"),
+    )
 
-def get_db():
+class DamageAssessmentModel(Base):
+    """One row per detected damage (mirrors AnalysisResultModel.damages) so damage analytics run as SQL aggregates"""
+    __tablename__ = "damage_assessments"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    analysisId = Column(String, ForeignKey("analysis_results.id"), nullable=False, index=True)
+    part = Column(String, nullable=True)
+    damageType = Column(String, nullable=True)
+    severity = Column(String, nullable=True)  # the damage's own severity, else the analysis' overall level
+    confidence = Column(Float, default=0.0)
+    estimatedCost = Column(Float, default=0.0)
+    bboxX = Column(Float, default=0.0)
+    bboxY = Column(Float, default=0.0)
+    bboxWidth = Column(Float, default=0.0)
+    bboxHeight = Column(Float, default=0.0)
+    
+    # Copied from the analysis / insurance details so filters don't need joins
+    engine = Column(String, nullable=True)
+    city = Column(String, nullable=True)
+    processedAt = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_damage_assessments_type_part_processed", "damageType", "part", "processedAt"),
+        Index("ix_damage_assessments_part_processed", "part", "processedAt"),
+        Index("ix_damage_assessments_city_processed", "city", "processedAt"),
+        Index("ix_damage_assessments_processed", "processedAt"),
+    )
+
+class ClaimDailyStatsModel(Base):
+    """Per-day claim counts (by submission day), kept up to date as claims are created and change status"""
+    __tablename__ = "claim_daily_stats"
+    
+    day = Column(Date, primary_key=True)
+    claims = Column(Integer, default=0)
+    approved = Column(Integer, default=0)
+    rejected = Column(Integer, default=0)
+    updatedAt = Column(DateTime, default=datetime.utcnow)
+
+class ClaimCountersModel(Base):
+    """Single-row running totals for the dashboard, updated alongside every claim write"""
+    __tablename__ = "claim_counters"
+    
+    id = Column(Integer, primary_key=True, default=1)
+    totalClaims = Column(Integer, default=0)
+    pendingClaims = Column(Integer, default=0)
+    totalPayouts = Column(Float, default=0.0)
+    processedClaims = Column(Integer, default=0)  # claims with a processedAt
+    processingHoursSum = Column(Float, default=0.0)  # sum of processedAt - submittedAt over those
+    approvedDay = Column(Date, nullable=True)  # day approvedOnDay refers to (UTC)
+    approvedOnDay = Column(Integer, default=0)
+    updatedAt = Column(DateTime, default=datetime.utcnow)
+
+class AnalysisJobModel(Base):
+    """Durable background work item for an analysis (claimed by workers under a lease)"""
+    __tablename__ = "analysis_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    analysisId = Column(String, ForeignKey("analysis_results.id"), nullable=False, index=True)
+    payload = Column(JSON, default=dict)  # image path + insurance form
+    status = Column(String, default="queued")  # queued, running, succeeded, failed
+    attempts = Column(Integer, default=0)
+    maxAttempts = Column(Integer, default=3)
+    availableAt = Column(DateTime, default=datetime.utcnow)  # not claimable before this (retry backoff)
+    leaseExpiresAt = Column(DateTime, nullable=True)  # visibility timeout of the current claim
+    leasedBy = Column(String, nullable=True)
+    lastError = Column(Text, nullable=True)
+    createdAt = Column(DateTime, default=datetime.utcnow)
+    updatedAt = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_available", "status", "availableAt"),
+    )
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_sync_db():
+    """
+    Sync session for the read-only service code (aggregates, search) that
+    handlers run in the thread pool with asyncio.to_thread. Through
+    AsyncSession.run_sync its statement building and row processing would run
+    on the event loop, and a heavy aggregate would stall every other request.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+# Revision that the schema of databases created before migrations (by create_all) corresponds to
+BASELINE_REVISION = "0001"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def alembic_config():
+    """Alembic config for the migrations in backend/migrations, whatever the working directory"""
+    alembic_cfg = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return alembic_cfg
+
+def init_db(db_engine=None):
+    """
+    Bring the schema up to date by running the alembic revisions (alembic upgrade head).
+    
+    A fresh database is created from scratch; one created by create_all before
+    migrations existed is first stamped as the baseline revision.
+    """
+    db_engine = db_engine if db_engine is not None else engine
+    alembic_cfg = alembic_config()
+    with db_engine.begin() as connection:
+        alembic_cfg.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and AnalysisResultModel.__tablename__ in tables:
+            command.stamp(alembic_cfg, BASELINE_REVISION)
+        command.upgrade(alembic_cfg, "head")
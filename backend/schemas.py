@@ -119,10 +119,12 @@ class ClaimFilters(BaseModel):
 # PaginatedResponse
 class PaginatedResponse(BaseModel):
     data: List[Claim]
-    total: int
+    total: Optional[int] = None  # None when the count was skipped (count=none)
     page: int
     limit: int
-    totalPages: int
+    totalPages: Optional[int] = None
+    nextCursor: Optional[str] = None  # opaque keyset cursors; pass back as ?cursor=
+    prevCursor: Optional[str] = None
 
 # ReportRequest
 class ReportRequest(BaseModel):
@@ -141,6 +143,31 @@ class RejectClaimRequest(BaseModel):
 class RequestReviewRequest(BaseModel):
     notes: str
 
+# Bulk claim operations
+class BulkCreateClaimsRequest(BaseModel):
+    analysisIds: List[str] = Field(..., min_length=1)
+
+class BulkStatusAction(str, Enum):
+    approve = "approve"
+    reject = "reject"
+    review = "review"
+
+class BulkStatusRequest(BaseModel):
+    claimIds: List[str] = Field(..., min_length=1)
+    action: BulkStatusAction
+    notes: Optional[str] = Field(None, description="Adjuster notes; required for review, the reason for reject")
+
+class BulkItemResult(BaseModel):
+    id: str
+    result: str  # created, exists, updated, not_found
+    claimNumber: Optional[str] = None
+    status: Optional[ClaimStatusEnum] = None
+
+class BulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
 # Dashboard Stats
 class DashboardStats(BaseModel):
     totalClaims: int
@@ -156,6 +183,19 @@ class TrendDataPoint(BaseModel):
     approved: int
     rejected: int
 
+# Damage aggregate (one group of damage_assessments rows)
+class DamageAggregate(BaseModel):
+    part: Optional[str] = None
+    damageType: Optional[str] = None
+    severity: Optional[str] = None
+    city: Optional[str] = None
+    engine: Optional[str] = None
+    period: Optional[str] = None
+    count: int
+    totalCost: float
+    avgCost: float
+    avgConfidence: float
+
 # API Error
 class ApiError(BaseModel):
     code: str
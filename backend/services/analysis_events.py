@@ -0,0 +1,157 @@
+# backend/services/analysis_events.py
+# In-process event bus: analysis stage transitions pushed to per-analysis subscribers (Server-Sent Events)
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Stage -> progress shown to clients. A retry starts the pipeline over, so its progress drops back.
+STAGE_PROGRESS = {
+    "queued": 5,
+    "processing": 50,  # stage unknown here, e.g. the analysis runs in a standalone worker
+    "retrying": 5,
+    "started": 10,
+    "cloud_attempt": 20,  # +10 per further backend tried, up to 50
+    "local_fallback": 60,
+    "saving": 85,
+    "completed": 100,
+    "failed": 100,
+}
+TERMINAL_STAGES = ("completed", "failed")
+
+
+def stage_progress(stage: str, attempt: int = 1) -> int:
+    if stage == "cloud_attempt":
+        return min(STAGE_PROGRESS[stage] + 10 * (attempt - 1), 50)
+    return STAGE_PROGRESS.get(stage, 0)
+
+
+class Subscription:
+    """One subscriber's queue of events for an analysis; iterate with next() on its event loop."""
+
+    def __init__(self, bus: "AnalysisEventBus", analysis_id: str, loop: asyncio.AbstractEventLoop):
+        self.analysis_id = analysis_id
+        self._bus = bus
+        self._loop = loop
+        self._queue: "asyncio.Queue[dict]" = asyncio.Queue()
+
+    def _deliver(self, event: dict) -> bool:
+        # Publishers run on worker threads and the cloud analyzer's loop, not the subscriber's
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        except RuntimeError:  # subscriber's loop already closed
+            return False
+        return True
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """The next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AnalysisEventBus:
+    """
+    Fan-out of pipeline stage events (queued, started, cloud attempt N, local
+    fallback, saving, completed / retrying / failed) to whoever is watching
+    that analysis, so clients get pushed progress instead of polling the
+    database.
+
+    Events only reach subscribers in the process that published them. With
+    the job worker in the API process (JOB_WORKER_IN_PROCESS) that is every
+    stage; analyses run by a standalone worker.py publish nothing here, and
+    subscribers have to fall back to checking the database now and then.
+
+    The latest event of the most recent `history` analyses is kept, so a
+    subscriber that connects mid-analysis starts from the current stage.
+    """
+
+    def __init__(self, history: Optional[int] = None):
+        self.history = history if history is not None else settings.ANALYSIS_EVENTS_HISTORY
+        self._lock = threading.Lock()
+        self._latest: "OrderedDict[str, dict]" = OrderedDict()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+
+    def publish(self, analysis_id: str, stage: str, **details) -> dict:
+        """Record a stage transition and push it to the analysis' subscribers (safe from any thread)."""
+        event = {
+            "analysisId": analysis_id,
+            "stage": stage,
+            "status": stage if stage in TERMINAL_STAGES else "processing",
+            "progress": stage_progress(stage, details.get("attempt", 1)),
+            "at": datetime.utcnow().isoformat(),
+            **details,
+        }
+        with self._lock:
+            self.published += 1
+            self._latest[analysis_id] = event
+            self._latest.move_to_end(analysis_id)
+            while len(self._latest) > self.history:
+                self._latest.popitem(last=False)
+            subscribers = list(self._subscribers.get(analysis_id, ()))
+        delivered = sum(1 for subscription in subscribers if subscription._deliver(event))
+        if delivered:
+            with self._lock:
+                self.delivered += delivered
+        return event
+
+    def latest(self, analysis_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._latest.get(analysis_id)
+
+    def current(self, analysis_id: str, status: str) -> dict:
+        """The event describing an analysis whose stored status is `status` (the latest one if it agrees)."""
+        latest = self.latest(analysis_id)
+        if latest is not None and latest["status"] == status:
+            return latest
+        stage = status if status in TERMINAL_STAGES else "processing"
+        return {
+            "analysisId": analysis_id,
+            "stage": stage,
+            "status": stage if stage in TERMINAL_STAGES else "processing",
+            "progress": stage_progress(stage),
+            "at": datetime.utcnow().isoformat(),
+        }
+
+    def subscribe(self, analysis_id: str) -> Subscription:
+        """Start receiving an analysis' events on the running event loop; close() when done."""
+        subscription = Subscription(self, analysis_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(analysis_id, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.analysis_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.analysis_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "published": self.published,
+                "delivered": self.delivered,
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "watchedAnalyses": len(self._subscribers),
+                "trackedAnalyses": len(self._latest),
+            }
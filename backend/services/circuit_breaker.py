@@ -0,0 +1,207 @@
+# backend/services/circuit_breaker.py
+# Per-backend circuit breakers with rolling error-rate / latency windows
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tracks the last ``window`` calls to one backend.
+
+    The circuit opens when, over at least ``min_calls`` calls, the error rate or
+    the slow-call rate reaches its threshold. Open circuits reject calls for
+    ``open_seconds``, then go half-open and let ``half_open_probes`` probe calls
+    through: a successful probe closes the circuit, a failed one re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=window)  # (ok, latency_seconds)
+        self._state = CLOSED
+        self._state_since = time.monotonic()
+        self._probes = 0
+        self._opened_reason: Optional[str] = None
+        self._last_error: Optional[str] = None
+        self._last_transition: Optional[str] = None
+        self._rejected = 0
+
+    # ----------------------------------------------------------
+    # CALL GATING
+    # ----------------------------------------------------------
+
+    def allow_request(self) -> bool:
+        """True if a call may go to this backend now (counts as a probe when half-open)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN and now - self._state_since >= self.open_seconds:
+                self._transition(HALF_OPEN, now)
+            if self._state == HALF_OPEN:
+                # A probe that never reported back (e.g. cancelled) frees its slot after a cooldown
+                if self._probes >= self.half_open_probes and now - self._state_since >= self.open_seconds:
+                    self._probes = 0
+                    self._state_since = now
+                if self._probes < self.half_open_probes:
+                    self._probes += 1
+                    return True
+            if self._state == CLOSED:
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._calls.append((True, latency))
+            if self._state == HALF_OPEN:
+                self._calls.clear()
+                self._calls.append((True, latency))
+                self._transition(CLOSED)
+            else:
+                self._evaluate()
+
+    def record_failure(self, latency: float, error: Optional[str] = None):
+        with self._lock:
+            self._calls.append((False, latency))
+            self._last_error = error
+            if self._state == HALF_OPEN:
+                self._opened_reason = f"half-open probe failed: {error}" if error else "half-open probe failed"
+                self._transition(OPEN)
+            else:
+                self._evaluate()
+
+    def _evaluate(self):
+        if self._state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        error_rate, slow_rate = self._rates()
+        if error_rate >= self.failure_rate_threshold:
+            self._opened_reason = f"error rate {error_rate:.0%} over last {len(self._calls)} calls"
+            self._transition(OPEN)
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._opened_reason = f"{slow_rate:.0%} of last {len(self._calls)} calls slower than {self.slow_call_seconds:.0f}s"
+            self._transition(OPEN)
+
+    def _transition(self, state: str, now: Optional[float] = None):
+        logger.warning(f"Circuit {self.name}: {self._state} -> {state}" + (f" ({self._opened_reason})" if state == OPEN else ""))
+        self._state = state
+        self._state_since = now if now is not None else time.monotonic()
+        self._last_transition = datetime.utcnow().isoformat()
+        self._probes = 0
+
+    # ----------------------------------------------------------
+    # HEALTH
+    # ----------------------------------------------------------
+
+    def _rates(self):
+        calls = list(self._calls)
+        if not calls:
+            return 0.0, 0.0
+        errors = sum(1 for ok, _ in calls if not ok)
+        slow = sum(1 for _, latency in calls if latency >= self.slow_call_seconds)
+        return errors / len(calls), slow / len(calls)
+
+    def _latency_percentile(self, p: float) -> Optional[float]:
+        latencies = sorted(latency for _, latency in self._calls)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    def health_score(self) -> float:
+        """0-100: success rate scaled down when p95 latency exceeds the slow-call threshold."""
+        with self._lock:
+            return self._health_score()
+
+    def _health_score(self) -> float:
+        if self._state == OPEN:
+            return 0.0
+        error_rate, _ = self._rates()
+        p95 = self._latency_percentile(0.95)
+        latency_factor = 1.0 if not p95 else min(1.0, self.slow_call_seconds / p95)
+        return round(100 * (1 - error_rate) * latency_factor, 1)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            error_rate, slow_rate = self._rates()
+            p50, p95 = self._latency_percentile(0.5), self._latency_percentile(0.95)
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = round(max(0.0, self.open_seconds - (time.monotonic() - self._state_since)), 1)
+            return {
+                "state": self._state,
+                "healthScore": self._health_score(),
+                "calls": len(self._calls),
+                "errorRate": round(error_rate, 4),
+                "slowCallRate": round(slow_rate, 4),
+                "p50Ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95Ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "rejectedCalls": self._rejected,
+                "openedReason": self._opened_reason if self._state != CLOSED else None,
+                "retryInSeconds": retry_in,
+                "lastError": self._last_error,
+                "lastTransition": self._last_transition,
+            }
+
+
+class BreakerRegistry:
+    """One CircuitBreaker per backend label, created with the configured thresholds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(
+                    name,
+                    window=settings.BREAKER_WINDOW,
+                    min_calls=settings.BREAKER_MIN_CALLS,
+                    failure_rate=settings.BREAKER_FAILURE_RATE,
+                    slow_call_seconds=settings.BREAKER_SLOW_CALL_MS / 1000.0,
+                    slow_call_rate=settings.BREAKER_SLOW_CALL_RATE,
+                    open_seconds=settings.BREAKER_OPEN_SECONDS,
+                    half_open_probes=settings.BREAKER_HALF_OPEN_PROBES,
+                )
+            return self._breakers[name]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+
+# Shared by the cloud chain and the local YOLO engine
+circuit_breakers = BreakerRegistry()
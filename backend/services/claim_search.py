@@ -0,0 +1,211 @@
+# backend/services/claim_search.py
+# Claim search index: SQLite FTS5 trigram table over claim number, normalized plate and owner name
+import logging
+import re
+from typing import List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError
+
+from models.database import ClaimModel, InsuranceDetailsModel
+
+logger = logging.getLogger(__name__)
+
+TABLE = "claim_search"
+VOCAB_TABLE = "claim_search_vocab"
+
+# Trigram indexes can't answer queries shorter than one trigram
+MIN_INDEXED_LENGTH = 3
+
+# Fuzzy matching: candidates share one of the query's rarest trigrams (common ones like
+# "clm" would pull in every row) and are kept above this similarity
+FUZZY_TERMS = 6
+FUZZY_TERM_SPREAD = 8  # skip terms in more than 8x as many claims as the rarest one
+FUZZY_CANDIDATES = 500
+FUZZY_THRESHOLD = 0.5
+
+_SEPARATORS = re.compile(r"[\s\-_./]+")
+
+
+def normalize_identifier(value: Optional[str]) -> str:
+    """Plate / claim number form used for matching: upper case without spaces, hyphens, dots or slashes."""
+    return _SEPARATORS.sub("", value or "").upper()
+
+
+def normalize_name(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).lower()
+
+
+def trigrams(value: str) -> set:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Trigram similarity of the query against a field: shared / query trigrams (pg_trgm word_similarity-like)."""
+    query = trigrams(a)
+    if not query:
+        return 0.0
+    return len(query & trigrams(b)) / len(query)
+
+
+def _phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+class ClaimSearchIndex:
+    """
+    Substring and fuzzy search for the claims list.
+
+    One FTS5 row per claim, with the trigram tokenizer so any substring of
+    three or more characters is an index lookup instead of a LIKE '%q%' scan.
+    Claim numbers and plates are stored normalized, so "mh 12-ab 1234" finds
+    MH12AB1234. The table lives next to the claims in the same SQLite file and
+    is written in the caller's transaction by claim_saved(); every path that
+    creates a claim (or changes its plate/number) must call it.
+
+    On other databases, or a SQLite build without FTS5 trigram support,
+    `available` is False and callers keep the ILIKE filter.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.available = False
+
+    def ensure(self, db) -> None:
+        """
+        Use the index tables (created by migration 0009, with the vocab table of
+        per-trigram counts for fuzzy search) if they exist, and fill the index
+        from the claims table when it is empty.
+        """
+        if not self.enabled or db.get_bind().dialect.name != "sqlite":
+            return
+        try:
+            indexed = db.execute(text(f"SELECT count(*) FROM {TABLE}")).scalar()
+            db.execute(text(f"SELECT 1 FROM {VOCAB_TABLE} LIMIT 1")).all()
+        except OperationalError as e:
+            db.rollback()
+            logger.warning(f"Claim search index unavailable, falling back to LIKE scans: {e}")
+            return
+        self.available = True
+
+        if not indexed and db.query(ClaimModel.id).first() is not None:
+            logger.info(f"Indexed {self.rebuild(db)} claims for search")
+
+    def rebuild(self, db) -> int:
+        """Re-index every claim (one joined query); returns the number of claims."""
+        db.execute(text(f"DELETE FROM {TABLE}"))
+        rows = db.query(
+            ClaimModel.id, ClaimModel.claimNumber, ClaimModel.vehiclePlate, InsuranceDetailsModel.ownerName,
+        ).outerjoin(
+            InsuranceDetailsModel, InsuranceDetailsModel.analysisId == ClaimModel.analysisResultId,
+        ).all()
+        if rows:
+            db.execute(
+                text(f"INSERT INTO {TABLE} (claim_id, claimNumber, plate, owner) VALUES (:id, :number, :plate, :owner)"),
+                [self._row(claim_id, number, plate, owner) for claim_id, number, plate, owner in rows],
+            )
+        db.commit()
+        return len(rows)
+
+    # ---- write hook ----
+
+    def claim_saved(self, db, claim: ClaimModel, owner_name: Optional[str] = None) -> None:
+        """(Re)index one claim in the caller's transaction."""
+        if not self.available:
+            return
+        if owner_name is None and claim.analysisResultId:
+            owner_name = db.query(InsuranceDetailsModel.ownerName).filter(
+                InsuranceDetailsModel.analysisId == claim.analysisResultId
+            ).scalar()
+        db.execute(text(f"DELETE FROM {TABLE} WHERE claim_id = :id"), {"id": claim.id})
+        db.execute(
+            text(f"INSERT INTO {TABLE} (claim_id, claimNumber, plate, owner) VALUES (:id, :number, :plate, :owner)"),
+            self._row(claim.id, claim.claimNumber, claim.vehiclePlate, owner_name),
+        )
+
+    def claims_saved(self, db, claims: List[ClaimModel]) -> None:
+        """claim_saved for many claims: one owner lookup, one delete and one executemany insert."""
+        if not self.available or not claims:
+            return
+        analysis_ids = [claim.analysisResultId for claim in claims if claim.analysisResultId]
+        owners = dict(db.query(InsuranceDetailsModel.analysisId, InsuranceDetailsModel.ownerName).filter(
+            InsuranceDetailsModel.analysisId.in_(analysis_ids)
+        ).all()) if analysis_ids else {}
+        db.execute(
+            text(f"DELETE FROM {TABLE} WHERE claim_id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": [claim.id for claim in claims]},
+        )
+        db.execute(
+            text(f"INSERT INTO {TABLE} (claim_id, claimNumber, plate, owner) VALUES (:id, :number, :plate, :owner)"),
+            [self._row(claim.id, claim.claimNumber, claim.vehiclePlate, owners.get(claim.analysisResultId))
+             for claim in claims],
+        )
+
+    @staticmethod
+    def _row(claim_id, number, plate, owner) -> dict:
+        return {
+            "id": claim_id,
+            "number": normalize_identifier(number),
+            "plate": normalize_identifier(plate),
+            "owner": normalize_name(owner),
+        }
+
+    # ---- reads ----
+
+    def filter_clause(self, db, query: str, fuzzy: bool = False):
+        """
+        A criterion on ClaimModel.id for the search, or None when the index
+        can't serve it (unavailable, or the query is shorter than a trigram).
+        """
+        if not self.available:
+            return None
+        identifier, name = normalize_identifier(query), normalize_name(query)
+        if len(identifier) < MIN_INDEXED_LENGTH and len(name) < MIN_INDEXED_LENGTH:
+            return None
+
+        if fuzzy:
+            return ClaimModel.id.in_(self.fuzzy_ids(db, identifier, name))
+
+        match = self._match_expression(identifier, name)
+        matches = text(f"SELECT claim_id FROM {TABLE} WHERE {TABLE} MATCH :match").bindparams(match=match)
+        return ClaimModel.id.in_(matches)
+
+    def fuzzy_ids(self, db, identifier: str, name: str) -> List[str]:
+        """
+        Claims whose number, plate or owner share most of the query's trigrams
+        (tolerates a typo or two). Candidates come from the index through the
+        query's rarest trigrams, ranked by bm25; the similarity cut-off is
+        applied here.
+        """
+        # The tokenizer folds case, so the vocabulary is lower case
+        terms = {term.lower() for term in trigrams(identifier) | trigrams(name)}
+        if not terms:
+            return []
+        params = {f"t{i}": term for i, term in enumerate(terms)}
+        vocabulary = db.execute(
+            text(f"SELECT term, doc FROM {VOCAB_TABLE} WHERE term IN ({', '.join(':' + key for key in params)}) "
+                 "ORDER BY doc LIMIT :limit"),
+            {**params, "limit": FUZZY_TERMS},
+        ).all()
+        if not vocabulary:
+            return []
+        rarest = vocabulary[0][1]
+        rare_terms = [term for term, docs in vocabulary if docs <= rarest * FUZZY_TERM_SPREAD]
+        rows = db.execute(
+            text(f"SELECT claim_id, claimNumber, plate, owner FROM {TABLE} WHERE {TABLE} MATCH :match "
+                 "ORDER BY rank LIMIT :limit"),
+            {"match": " OR ".join(_phrase(term) for term in rare_terms), "limit": FUZZY_CANDIDATES},
+        ).all()
+        return [
+            claim_id for claim_id, number, plate, owner in rows
+            if max(similarity(identifier, number), similarity(identifier, plate), similarity(name, owner)) >= FUZZY_THRESHOLD
+        ]
+
+    @staticmethod
+    def _match_expression(identifier: str, name: str) -> str:
+        parts = []
+        if len(identifier) >= MIN_INDEXED_LENGTH:
+            parts.append(f"{{claimNumber plate}} : {_phrase(identifier)}")
+        if len(name) >= MIN_INDEXED_LENGTH:
+            parts.append(f"owner : {_phrase(name)}")
+        return " OR ".join(parts)
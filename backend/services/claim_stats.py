@@ -0,0 +1,327 @@
+# backend/services/claim_stats.py
+# Claim analytics: grouped trend aggregation, the daily rollup and the dashboard counters
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.exc import IntegrityError
+
+from models.database import ClaimCountersModel, ClaimDailyStatsModel, ClaimModel, ClaimStatus
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_ID = 1
+
+
+class ClaimSnapshot(NamedTuple):
+    """The fields the aggregates depend on, captured before a claim is modified"""
+    status: Optional[ClaimStatus]
+    processedAt: Optional[datetime]
+
+
+def _processing_hours(claim_submitted: datetime, processed: datetime) -> float:
+    return (processed - claim_submitted).total_seconds() / 3600
+
+
+def _status_deltas(status: Optional[ClaimStatus], sign: int) -> Dict[str, int]:
+    if status == ClaimStatus.approved:
+        return {"approved": sign}
+    if status == ClaimStatus.rejected:
+        return {"rejected": sign}
+    return {}
+
+
+class ClaimStats:
+    """
+    Answers the trends chart and the dashboard, and keeps the claim_daily_stats
+    rollup and the claim_counters row in step with the claims table.
+
+    Rollup rows are keyed by submission day, like the chart. The write hooks
+    run in the caller's transaction, so a claim change and its aggregate
+    updates commit (or roll back) together. Every path that creates a claim or
+    changes its status/processedAt must call them.
+    """
+
+    def __init__(self, use_rollup: bool = True, use_counters: bool = True):
+        self.use_rollup = use_rollup
+        self.use_counters = use_counters
+
+    # ---- write hooks ----
+
+    @staticmethod
+    def snapshot(claim: ClaimModel) -> ClaimSnapshot:
+        return ClaimSnapshot(claim.status, claim.processedAt)
+
+    def claim_created(self, db, claim: ClaimModel) -> None:
+        self.claims_created(db, [claim])
+
+    def claims_created(self, db, claims: List[ClaimModel]) -> None:
+        """Batched claim_created: one rollup update per submission day and one counters update."""
+        by_day: Dict[date, Dict[str, int]] = {}
+        counters: Dict[str, float] = {}
+        approved_today = 0
+        for claim in claims:
+            _add(by_day.setdefault(claim.submittedAt.date(), {}), {"claims": 1, **_status_deltas(claim.status, 1)})
+            claim_counters = {"totalClaims": 1, "totalPayouts": claim.totalPayout or 0.0}
+            if claim.status == ClaimStatus.pending:
+                claim_counters["pendingClaims"] = 1
+            if claim.processedAt is not None:
+                claim_counters["processedClaims"] = 1
+                claim_counters["processingHoursSum"] = _processing_hours(claim.submittedAt, claim.processedAt)
+            _add(counters, claim_counters)
+            approved_today += int(_approved_today(self.snapshot(claim)))
+
+        for day, deltas in by_day.items():
+            self._bump(db, day, **deltas)
+        if counters or approved_today:
+            self._bump_counters(db, counters, approved_today=approved_today)
+
+    def claim_changed(self, db, claim: ClaimModel, before: ClaimSnapshot) -> None:
+        """Apply the difference between `before` and the claim's current state."""
+        self.claims_changed(db, [(claim.submittedAt, before, self.snapshot(claim))])
+
+    def claims_changed(self, db, changes: List[Tuple[datetime, ClaimSnapshot, ClaimSnapshot]]) -> None:
+        """
+        Batched claim_changed over (submittedAt, before, after) snapshots, for
+        bulk UPDATEs that never load the claims: one rollup update per affected
+        day and one counters update.
+        """
+        by_day: Dict[date, Dict[str, int]] = {}
+        counters: Dict[str, float] = {}
+        approved_today = 0
+        for submitted_at, before, after in changes:
+            if before.status != after.status:
+                day_deltas = _status_deltas(before.status, -1)
+                _add(day_deltas, _status_deltas(after.status, 1))
+                _add(by_day.setdefault(submitted_at.date(), {}), day_deltas)
+
+            pending_delta = int(after.status == ClaimStatus.pending) - int(before.status == ClaimStatus.pending)
+            if pending_delta:
+                _add(counters, {"pendingClaims": pending_delta})
+            if before.processedAt != after.processedAt:
+                hours = 0.0
+                if before.processedAt is not None:
+                    hours -= _processing_hours(submitted_at, before.processedAt)
+                if after.processedAt is not None:
+                    hours += _processing_hours(submitted_at, after.processedAt)
+                _add(counters, {
+                    "processedClaims": int(after.processedAt is not None) - int(before.processedAt is not None),
+                    "processingHoursSum": hours,
+                })
+            approved_today += int(_approved_today(after)) - int(_approved_today(before))
+
+        for day, deltas in by_day.items():
+            deltas = {column: delta for column, delta in deltas.items() if delta}
+            if deltas:
+                self._bump(db, day, **deltas)
+        if counters or approved_today:
+            self._bump_counters(db, counters, approved_today=approved_today)
+
+    def _bump_counters(self, db, deltas: Dict[str, float], approved_today: int = 0) -> None:
+        """Atomically add deltas to the counters row (created by ensure_counters at startup)."""
+        values = {getattr(ClaimCountersModel, column): getattr(ClaimCountersModel, column) + delta
+                  for column, delta in deltas.items() if delta}
+        if approved_today:
+            # approvedOnDay only counts for approvedDay; the first approval of a new day resets it
+            today = datetime.utcnow().date()
+            same_day = ClaimCountersModel.approvedDay == today
+            values[ClaimCountersModel.approvedOnDay] = case(
+                (same_day, ClaimCountersModel.approvedOnDay + approved_today),
+                else_=max(approved_today, 0),
+            )
+            values[ClaimCountersModel.approvedDay] = today
+        if not values:
+            return
+        values[ClaimCountersModel.updatedAt] = datetime.utcnow()
+        db.query(ClaimCountersModel).filter(
+            ClaimCountersModel.id == COUNTERS_ID
+        ).update(values, synchronize_session=False)
+
+    def _bump(self, db, day: date, **deltas: int) -> None:
+        """Add deltas to a day's row, creating the row on first use."""
+        values = {getattr(ClaimDailyStatsModel, column): getattr(ClaimDailyStatsModel, column) + delta
+                  for column, delta in deltas.items()}
+        values[ClaimDailyStatsModel.updatedAt] = datetime.utcnow()
+
+        updated = db.query(ClaimDailyStatsModel).filter(
+            ClaimDailyStatsModel.day == day
+        ).update(values, synchronize_session=False)
+        if updated:
+            return
+
+        try:
+            with db.begin_nested():
+                db.add(ClaimDailyStatsModel(
+                    day=day,
+                    claims=deltas.get("claims", 0),
+                    approved=deltas.get("approved", 0),
+                    rejected=deltas.get("rejected", 0),
+                    updatedAt=datetime.utcnow(),
+                ))
+        except IntegrityError:
+            # Another writer created the row in between
+            db.query(ClaimDailyStatsModel).filter(
+                ClaimDailyStatsModel.day == day
+            ).update(values, synchronize_session=False)
+
+    def backfill(self, db) -> int:
+        """Rebuild the rollup from the claims table (one grouped query); returns the number of days."""
+        db.query(ClaimDailyStatsModel).delete(synchronize_session=False)
+        rows = self._grouped_counts(db).all()
+        now = datetime.utcnow()
+        db.add_all(
+            ClaimDailyStatsModel(
+                day=_as_date(day), claims=claims, approved=approved or 0, rejected=rejected or 0, updatedAt=now,
+            )
+            for day, claims, approved, rejected in rows
+        )
+        db.commit()
+        return len(rows)
+
+    def ensure_rollup(self, db) -> None:
+        """Populate an empty rollup for claims created before it existed."""
+        if not self.use_rollup:
+            return
+        if db.query(ClaimDailyStatsModel.day).first() is None and db.query(ClaimModel.id).first() is not None:
+            days = self.backfill(db)
+            logger.info(f"Backfilled claim_daily_stats with {days} days")
+
+    def backfill_counters(self, db) -> None:
+        """Recompute the counters row from the claims table with SQL aggregates."""
+        totals = self._aggregate_totals(db)
+        counters = db.get(ClaimCountersModel, COUNTERS_ID) or ClaimCountersModel(id=COUNTERS_ID)
+        counters.totalClaims = totals["totalClaims"]
+        counters.pendingClaims = totals["pendingClaims"]
+        counters.totalPayouts = totals["totalPayouts"]
+        counters.processedClaims = totals["processedClaims"]
+        counters.processingHoursSum = totals["processingHoursSum"]
+        counters.approvedDay = datetime.utcnow().date()
+        counters.approvedOnDay = totals["approvedToday"]
+        counters.updatedAt = datetime.utcnow()
+        db.add(counters)
+        db.commit()
+
+    def ensure_counters(self, db) -> None:
+        """Create the counters row on first start (from the existing claims)."""
+        if db.get(ClaimCountersModel, COUNTERS_ID) is None:
+            self.backfill_counters(db)
+            logger.info("Initialised claim_counters from the claims table")
+
+    # ---- reads ----
+
+    def trend(self, db, days: int) -> List[Dict]:
+        """Counts for each of the last `days` days (oldest first), including days without claims."""
+        today = datetime.utcnow().date()
+        first_day = today - timedelta(days=days - 1)
+
+        if self.use_rollup:
+            rows = db.query(
+                ClaimDailyStatsModel.day,
+                ClaimDailyStatsModel.claims,
+                ClaimDailyStatsModel.approved,
+                ClaimDailyStatsModel.rejected,
+            ).filter(
+                ClaimDailyStatsModel.day >= first_day,
+                ClaimDailyStatsModel.day <= today,
+            ).all()
+        else:
+            rows = self._grouped_counts(db).filter(
+                ClaimModel.submittedAt >= datetime.combine(first_day, time.min),
+                ClaimModel.submittedAt < datetime.combine(today + timedelta(days=1), time.min),
+            ).all()
+
+        by_day = {_as_date(day): (claims, approved or 0, rejected or 0) for day, claims, approved, rejected in rows}
+        trend = []
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            claims, approved, rejected = by_day.get(day, (0, 0, 0))
+            trend.append({"date": day.isoformat(), "claims": claims, "approved": approved, "rejected": rejected})
+        return trend
+
+    def dashboard(self, db) -> Dict:
+        """Dashboard totals: one row read from the counters, or SQL aggregates over the claims."""
+        counters = db.get(ClaimCountersModel, COUNTERS_ID) if self.use_counters else None
+        if counters is None:
+            totals = self._aggregate_totals(db)
+        else:
+            totals = {
+                "totalClaims": counters.totalClaims,
+                "pendingClaims": counters.pendingClaims,
+                "totalPayouts": counters.totalPayouts,
+                "processedClaims": counters.processedClaims,
+                "processingHoursSum": counters.processingHoursSum,
+                "approvedToday": counters.approvedOnDay if counters.approvedDay == datetime.utcnow().date() else 0,
+            }
+
+        processed = totals["processedClaims"]
+        return {
+            "totalClaims": totals["totalClaims"],
+            "pendingClaims": totals["pendingClaims"],
+            "approvedToday": totals["approvedToday"],
+            "averageProcessingTime": totals["processingHoursSum"] / processed if processed else 0.0,
+            "totalPayouts": totals["totalPayouts"],
+        }
+
+    def total_claims(self, db) -> int:
+        """Unfiltered claim count: the counters row when it is kept, else count()."""
+        counters = db.get(ClaimCountersModel, COUNTERS_ID) if self.use_counters else None
+        if counters is not None:
+            return counters.totalClaims
+        return db.query(func.count(ClaimModel.id)).scalar() or 0
+
+    @staticmethod
+    def _aggregate_totals(db) -> Dict:
+        """All dashboard totals in a single aggregate query."""
+        if db.get_bind().dialect.name == "sqlite":
+            hours = (func.julianday(ClaimModel.processedAt) - func.julianday(ClaimModel.submittedAt)) * 24
+        else:
+            hours = func.extract("epoch", ClaimModel.processedAt - ClaimModel.submittedAt) / 3600
+        today = datetime.combine(datetime.utcnow().date(), time.min)
+
+        row = db.query(
+            func.count(ClaimModel.id),
+            func.sum(case((ClaimModel.status == ClaimStatus.pending, 1), else_=0)),
+            func.sum(case((and_(ClaimModel.status == ClaimStatus.approved, ClaimModel.processedAt >= today), 1), else_=0)),
+            func.count(ClaimModel.processedAt),
+            func.sum(hours),
+            func.sum(ClaimModel.totalPayout),
+        ).one()
+        return {
+            "totalClaims": row[0] or 0,
+            "pendingClaims": row[1] or 0,
+            "approvedToday": row[2] or 0,
+            "processedClaims": row[3] or 0,
+            "processingHoursSum": float(row[4] or 0.0),
+            "totalPayouts": float(row[5] or 0.0),
+        }
+
+    @staticmethod
+    def _grouped_counts(db):
+        day = func.date(ClaimModel.submittedAt)
+        return db.query(
+            day,
+            func.count(ClaimModel.id),
+            func.sum(case((ClaimModel.status == ClaimStatus.approved, 1), else_=0)),
+            func.sum(case((ClaimModel.status == ClaimStatus.rejected, 1), else_=0)),
+        ).group_by(day)
+
+
+def _is_today(moment: Optional[datetime]) -> bool:
+    return moment is not None and moment.date() == datetime.utcnow().date()
+
+
+def _approved_today(state: ClaimSnapshot) -> bool:
+    return state.status == ClaimStatus.approved and _is_today(state.processedAt)
+
+
+def _add(totals: Dict, deltas: Dict) -> None:
+    for column, delta in deltas.items():
+        totals[column] = totals.get(column, 0) + delta
+
+
+def _as_date(value) -> date:
+    """date() comes back as text on SQLite and as a date elsewhere"""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
@@ -0,0 +1,172 @@
+# backend/services/damage_analytics.py
+# Normalized damage rows: written with each analysis result, backfilled from the JSON, aggregated in SQL
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from models.database import AnalysisResultModel, DamageAssessmentModel, InsuranceDetailsModel
+
+logger = logging.getLogger(__name__)
+
+# Dimensions the aggregate endpoint can group and filter by
+GROUP_COLUMNS = {
+    "part": DamageAssessmentModel.part,
+    "damageType": DamageAssessmentModel.damageType,
+    "severity": DamageAssessmentModel.severity,
+    "city": DamageAssessmentModel.city,
+    "engine": DamageAssessmentModel.engine,
+}
+PERIODS = ("day", "month")
+
+DAMAGES = DamageAssessmentModel.__table__
+
+
+def _as_float(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def damage_rows(analysis: AnalysisResultModel, city: Optional[str] = None) -> List[Dict]:
+    """damage_assessments rows (as insert dicts) for an analysis' damages JSON."""
+    rows = []
+    for damage in analysis.damages or []:
+        box = damage.get("boundingBox") or {}
+        rows.append({
+            # Reused analyses share damage ids with their source, so rows get their own
+            "id": str(uuid.uuid4()),
+            "analysisId": analysis.id,
+            "part": damage.get("partIdentified"),
+            "damageType": damage.get("damageType"),
+            "severity": damage.get("severity") or analysis.overallSeverityLevel,
+            "confidence": _as_float(damage.get("confidenceScore")),
+            "estimatedCost": _as_float(damage.get("estimatedCost")),
+            "bboxX": _as_float(box.get("x")),
+            "bboxY": _as_float(box.get("y")),
+            "bboxWidth": _as_float(box.get("width")),
+            "bboxHeight": _as_float(box.get("height")),
+            "engine": analysis.engine,
+            "city": city,
+            "processedAt": analysis.processedAt,
+        })
+    return rows
+
+
+class DamageAnalytics:
+    """
+    Keeps damage_assessments in step with AnalysisResultModel.damages and
+    answers damage-level questions ("average cost of dents on the front
+    bumper in Mumbai this month") with one indexed GROUP BY.
+
+    The JSON stays the source for the analysis views; these rows are written
+    in the same transaction as the result (analysis_saved), so a retried job
+    replaces rather than duplicates them.
+    """
+
+    BACKFILL_CHUNK = 1000
+
+    # ---- write hook ----
+
+    def analysis_saved(self, db, analysis: AnalysisResultModel) -> None:
+        """Replace an analysis' damage rows from its damages JSON, in the caller's transaction."""
+        # Core statements: this runs once per finished analysis, the ORM bulk paths cost more than the SQL
+        db.execute(DAMAGES.delete().where(DAMAGES.c.analysisId == analysis.id))
+        city = db.execute(
+            select(InsuranceDetailsModel.__table__.c.city).where(InsuranceDetailsModel.__table__.c.analysisId == analysis.id)
+        ).scalar()
+        rows = damage_rows(analysis, city)
+        if rows:
+            db.execute(DAMAGES.insert(), rows)
+
+    # ---- maintenance ----
+
+    def backfill(self, db) -> int:
+        """Rebuild every row from the analyses' JSON (in id-ordered chunks); returns the number of damages."""
+        db.query(DamageAssessmentModel).delete(synchronize_session=False)
+        written, last_id = 0, ""
+        while True:
+            batch = db.query(AnalysisResultModel, InsuranceDetailsModel.city).outerjoin(
+                InsuranceDetailsModel, InsuranceDetailsModel.analysisId == AnalysisResultModel.id,
+            ).filter(
+                AnalysisResultModel.status == "completed",
+                AnalysisResultModel.id > last_id,
+            ).order_by(AnalysisResultModel.id).limit(self.BACKFILL_CHUNK).all()
+            if not batch:
+                break
+            rows = [row for analysis, city in batch for row in damage_rows(analysis, city)]
+            if rows:
+                db.execute(DAMAGES.insert(), rows)
+            written += len(rows)
+            last_id = batch[-1][0].id
+            db.expunge_all()
+        db.commit()
+        return written
+
+    def ensure(self, db) -> None:
+        """Backfill an empty table for analyses completed before it existed."""
+        if db.query(DamageAssessmentModel.id).first() is not None:
+            return
+        if db.query(AnalysisResultModel.id).filter(AnalysisResultModel.status == "completed").first() is None:
+            return
+        logger.info(f"Backfilled {self.backfill(db)} damage_assessments rows from analysis JSON")
+
+    # ---- reads ----
+
+    def aggregate(
+        self,
+        db,
+        group_by: List[str],
+        period: Optional[str] = None,
+        filters: Optional[Dict[str, str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Dict]:
+        """
+        Count, total/average cost and average confidence of damages, grouped by
+        any of GROUP_COLUMNS (and optionally a day/month period of processedAt).
+        """
+        keys = [GROUP_COLUMNS[name].label(name) for name in group_by]
+        if period:
+            keys.append(self._period(db, period).label("period"))
+
+        query = db.query(
+            *keys,
+            func.count(DamageAssessmentModel.id).label("count"),
+            func.sum(DamageAssessmentModel.estimatedCost).label("totalCost"),
+            func.avg(DamageAssessmentModel.estimatedCost).label("avgCost"),
+            func.avg(DamageAssessmentModel.confidence).label("avgConfidence"),
+        )
+        for name, value in (filters or {}).items():
+            query = query.filter(GROUP_COLUMNS[name] == value)
+        if date_from:
+            query = query.filter(DamageAssessmentModel.processedAt >= date_from)
+        if date_to:
+            query = query.filter(DamageAssessmentModel.processedAt <= date_to)
+
+        if keys:
+            query = query.group_by(*keys)
+        # Periods read oldest first; otherwise the most frequent groups first
+        query = query.order_by(keys[-1] if period else func.count(DamageAssessmentModel.id).desc())
+
+        return [
+            {
+                **{name: getattr(row, name) for name in [*group_by, *(["period"] if period else [])]},
+                "count": row.count,
+                "totalCost": float(row.totalCost or 0.0),
+                "avgCost": float(row.avgCost or 0.0),
+                "avgConfidence": float(row.avgConfidence or 0.0),
+            }
+            for row in query.limit(limit).all()
+        ]
+
+    @staticmethod
+    def _period(db, period: str):
+        column = DamageAssessmentModel.processedAt
+        if db.get_bind().dialect.name == "sqlite":
+            return func.strftime("%Y-%m" if period == "month" else "%Y-%m-%d", column)
+        return func.to_char(column, "YYYY-MM" if period == "month" else "YYYY-MM-DD")
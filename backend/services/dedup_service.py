@@ -0,0 +1,66 @@
+# backend/services/dedup_service.py
+# Content-hash deduplication of uploads so resubmitted photos skip inference
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Optional
+
+from sqlalchemy import select
+
+from models.database import AnalysisResultModel
+
+logger = logging.getLogger(__name__)
+
+
+class UploadDeduplicator:
+    """
+    Matches an upload against completed analyses of the same image bytes and
+    insurance context, and keeps hit/miss counters for the stats endpoint.
+    """
+
+    # Results that did not come from a real inference are never reused
+    NON_REUSABLE_ENGINES = ("Fallback-Empty",)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_image(content: bytes) -> str:
+        # Uploads get the same digest from store_upload, computed while streaming to disk
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def hash_context(insurance_form: Optional[Any] = None) -> str:
+        """Stable hash of the insurance form; field order and formatting don't matter."""
+        payload = insurance_form.model_dump() if insurance_form is not None else {}
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    async def find_completed(self, db, image_hash: str, context_hash: str):
+        """Return a completed analysis for this image + context, counting the lookup as a hit or miss (async session)."""
+        match = await db.scalar(select(AnalysisResultModel).where(
+            AnalysisResultModel.imageHash == image_hash,
+            AnalysisResultModel.contextHash == context_hash,
+            AnalysisResultModel.status == "completed",
+            AnalysisResultModel.engine.notin_(self.NON_REUSABLE_ENGINES),
+        ).order_by(AnalysisResultModel.processedAt.desc()).limit(1))
+
+        with self._lock:
+            if match is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return match
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+        }
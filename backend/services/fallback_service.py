@@ -1,13 +1,21 @@
 # backend/services/fallback_service.py
-# Robust multi-model AI analyzer with key rotation and Groq fallback
+# Robust multi-model AI analyzer with key rotation and Groq fallback (asyncio-native)
 import os
 import logging
 import json
-import base64
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Awaitable, Callable, List, Tuple
 
 from dotenv import load_dotenv
 
+from config import settings
+from services.circuit_breaker import BreakerRegistry, circuit_breakers
+from services.image_preprocessing import ImagePayload
+from services.lazy_engine import timed_import
+
 logger = logging.getLogger(__name__)
 load_dotenv()
 
@@ -91,12 +99,90 @@ CALIBRATION INSTRUCTIONS:
     return base
 
 
+# ============================================================
+# LATENCY TRACKING (drives the hedge delay)
+# ============================================================
+
+# A backend is awaited as fn(image, prompt) and returns a normalised dict or None
+Backend = Tuple[str, Callable[[ImagePayload, str], Awaitable[Optional[Dict]]]]
+# Told (backend label, attempt number) whenever a backend is started for an analysis
+AttemptCallback = Callable[[str, int], None]
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies for one backend.
+
+    A censored sample is a call cancelled before it finished (a hedge race
+    loser): its latency is only known to be at least that long, and it counts
+    at that lower bound.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)  # (seconds, censored)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, censored: bool = False):
+        with self._lock:
+            self._samples.append((seconds, censored))
+
+    def __len__(self):
+        return len(self._samples)
+
+    def censored(self) -> int:
+        with self._lock:
+            return sum(1 for _, censored in self._samples if censored)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Kaplan-Meier estimate of the p-quantile: a censored sample only leaves
+        the at-risk set, so a loser cancelled early doesn't pass for a fast call.
+        Without censored samples this is the plain order statistic.
+        """
+        with self._lock:
+            # Completed calls first on ties: a call cancelled at t was still at risk at t
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        survival = 1.0
+        at_risk = len(samples)
+        for seconds, censored in samples:
+            if not censored:
+                survival *= (at_risk - 1) / at_risk
+                if 1.0 - survival > p + 1e-9:
+                    return seconds
+            at_risk -= 1
+        # Quantile beyond the last completed call: the longest wait seen is a lower bound
+        return samples[-1][0]
+
+
 # ============================================================
 # CLOUD ANALYZER (Gemini primary + secondary key rotation)
 # ============================================================
 
 class CloudAnalyzer:
-    def __init__(self):
+    """
+    Cloud analysis chain running on asyncio.
+
+    All network I/O happens on one event loop owned by the analyzer, using
+    long-lived clients per key so connections are pooled and reused. Any number
+    of analyses can be in flight at once without holding a thread each.
+    ``get_analysis_async`` can be awaited from any event loop, and
+    ``get_analysis`` is the blocking wrapper for worker threads.
+    """
+
+    def __init__(
+        self,
+        backends: Optional[List[Backend]] = None,
+        hedging: Optional[bool] = None,
+        breakers: Optional[BreakerRegistry] = None,
+    ):
+        """
+        Args:
+            backends: Optional ordered (label, async fn) chain replacing Gemini/Groq - e.g. local stubs
+            hedging: Race backends instead of strictly chaining them (defaults to CLOUD_HEDGING)
+            breakers: Circuit breaker registry (defaults to the shared one)
+        """
         self.primary_key = os.getenv("GEMINI_API_KEY")
         self.secondary_key = os.getenv("GEMINI_API_KEY_2")
         self.groq_key = os.getenv("GROQ_API_KEY")
@@ -104,13 +190,38 @@ class CloudAnalyzer:
 
         self._primary_client = None
         self._secondary_client = None
-
-        self._init_gemini()
+        self._groq_client = None  # created on the analyzer loop at first use
+
+        if backends is None:
+            self._init_gemini()
+        self._backends_override = backends
+        self.breakers = breakers if breakers is not None else circuit_breakers
+
+        # Hedged racing
+        self.hedging = settings.CLOUD_HEDGING if hedging is None else hedging
+        self.hedge_percentile = settings.CLOUD_HEDGE_PERCENTILE
+        self.hedge_default_delay = settings.CLOUD_HEDGE_DEFAULT_DELAY_MS / 1000.0
+        self.hedge_min_delay = settings.CLOUD_HEDGE_MIN_DELAY_MS / 1000.0
+        self.hedge_min_samples = settings.CLOUD_HEDGE_MIN_SAMPLES
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._stats_lock = threading.Lock()
+        self._races = 0
+        self._hedges_fired = 0
+        self._all_failed = 0
+        self._wins: Dict[str, int] = {}
+        self._cancelled: Dict[str, int] = {}  # calls cancelled in flight, mostly hedge race losers
+        self._in_flight = 0
+
+        # Dedicated event loop that owns every cloud client and request
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="cloud-analyzer-loop", daemon=True)
+        self._loop_thread.start()
 
     def _init_gemini(self):
         """Initialise both Gemini clients."""
         try:
-            from google import genai
+            with timed_import("google.genai"):
+                from google import genai
             if self.primary_key:
                 self._primary_client = genai.Client(api_key=self.primary_key)
                 logger.info("Gemini primary client initialised (KEY_1)")
@@ -120,59 +231,307 @@ class CloudAnalyzer:
         except Exception as e:
             logger.error(f"Gemini init failed: {e}")
 
+    def _get_groq_client(self):
+        """Long-lived AsyncGroq client with a pooled HTTP connection limit."""
+        if self._groq_client is None:
+            import httpx
+            from groq import AsyncGroq
+
+            self._groq_client = AsyncGroq(
+                api_key=self.groq_key,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.CLOUD_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.CLOUD_MAX_CONNECTIONS,
+                    ),
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                ),
+            )
+            logger.info("Groq async client initialised")
+        return self._groq_client
+
+    async def aclose(self):
+        if self._groq_client is not None:
+            await self._groq_client.close()
+            self._groq_client = None
+
+    def close(self):
+        """Close pooled clients and stop the analyzer loop."""
+        if not self._loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self.aclose(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=10)
+
     # ----------------------------------------------------------
-    # PUBLIC ENTRY POINT
+    # PUBLIC ENTRY POINTS
     # ----------------------------------------------------------
 
-    def get_analysis(self, image_path: str, insurance_data: Optional[Any] = None) -> Dict[str, Any]:
+    def get_analysis(
+        self,
+        image_path: str,
+        insurance_data: Optional[Any] = None,
+        image: Optional[ImagePayload] = None,
+        on_attempt: Optional[AttemptCallback] = None,
+    ) -> Dict[str, Any]:
+        """Blocking wrapper around get_analysis_async for worker threads."""
+        future = asyncio.run_coroutine_threadsafe(self._analyze(image_path, insurance_data, image, on_attempt), self._loop)
+        return future.result()
+
+    async def get_analysis_async(
+        self,
+        image_path: str,
+        insurance_data: Optional[Any] = None,
+        image: Optional[ImagePayload] = None,
+        on_attempt: Optional[AttemptCallback] = None,
+    ) -> Dict[str, Any]:
+        """Awaitable from any event loop; the work itself runs on the analyzer loop."""
+        future = asyncio.run_coroutine_threadsafe(self._analyze(image_path, insurance_data, image, on_attempt), self._loop)
+        return await asyncio.wrap_future(future)
+
+    async def _analyze(
+        self,
+        image_path: str,
+        insurance_data: Optional[Any] = None,
+        image: Optional[ImagePayload] = None,
+        on_attempt: Optional[AttemptCallback] = None,
+    ) -> Dict[str, Any]:
         """
         Try Gemini (primary key) → Gemini (secondary key) → Groq → mock.
-        Returns a standardised analysis dict.
+        With hedging on, a slow backend does not block the next one: it is
+        started in parallel once the current one exceeds its hedge delay.
+        
+        ``image`` is the preprocessed payload sent to every backend; without it
+        the file at image_path is read once and sent as-is. ``on_attempt`` is
+        called with (backend label, attempt number) as each backend starts; it
+        runs on the analyzer loop, so it must not block.
+        Returns a standardised analysis dict, with bounding boxes in the
+        coordinates of the original image.
         """
         prompt = build_vehicle_damage_prompt(insurance_data)
+        backends = self._backends()
+        if image is None and backends:
+            image = await asyncio.to_thread(ImagePayload.from_file, image_path)
+
+        self._in_flight += 1
+        try:
+            if self.hedging:
+                result = await self._race(backends, image, prompt, on_attempt)
+            else:
+                result = await self._chain(backends, image, prompt, on_attempt)
+        finally:
+            self._in_flight -= 1
+        if result:
+            return self._rescale_boxes(result, image.scale)
+
+        # 4. Final mock fallback
+        logger.error("All AI backends failed – returning mock result")
+        return self._mock_analysis(insurance_data)
 
+    def _backends(self) -> List[Backend]:
+        """Ordered backend chain: Gemini KEY_1 → Gemini KEY_2 → Groq."""
+        if self._backends_override is not None:
+            return list(self._backends_override)
+
+        backends: List[Backend] = []
         # 1. Gemini primary
         if self._primary_client:
-            result = self._call_gemini(self._primary_client, image_path, prompt, key_label="KEY_1")
-            if result:
-                return result
-
+            backends.append(("KEY_1", lambda image, prompt: self._call_gemini(self._primary_client, image, prompt, key_label="KEY_1")))
         # 2. Gemini secondary
         if self._secondary_client:
-            logger.warning("Primary Gemini key failed – trying secondary KEY_2")
-            result = self._call_gemini(self._secondary_client, image_path, prompt, key_label="KEY_2")
-            if result:
-                return result
-
+            backends.append(("KEY_2", lambda image, prompt: self._call_gemini(self._secondary_client, image, prompt, key_label="KEY_2")))
         # 3. Groq vision fallback
         if self.groq_key:
-            logger.warning("Both Gemini keys failed – trying Groq vision")
-            result = self._call_groq(image_path, prompt)
+            backends.append(("GROQ", self._call_groq))
+        return backends
+
+    def backend_labels(self) -> List[str]:
+        return [label for label, _ in self._backends()]
+
+    async def _timed_call(self, label: str, fn: Callable, image: ImagePayload, prompt: str) -> Optional[Dict]:
+        """Run one backend, recording its latency and outcome (cancelled racers as lower-bound latencies)."""
+        breaker = self.breakers.get(label)
+        started = time.perf_counter()
+        try:
+            result = await fn(image, prompt)
+        except asyncio.CancelledError:
+            # Race losers are the slow calls; leaving them out would drag the p95, and with it
+            # the hedge delay, down until nearly every analysis hedged. Not a breaker failure.
+            self._tracker(label).record(time.perf_counter() - started, censored=True)
+            with self._stats_lock:
+                self._cancelled[label] = self._cancelled.get(label, 0) + 1
+            raise
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            logger.error(f"{label} backend error: {e}")
+            self._tracker(label).record(elapsed)
+            breaker.record_failure(elapsed, str(e)[:200])
+            return None
+
+        elapsed = time.perf_counter() - started
+        self._tracker(label).record(elapsed)
+        if result:
+            breaker.record_success(elapsed)
+        else:
+            breaker.record_failure(elapsed, "no usable result")
+        return result
+
+    def _admit(self, label: str) -> bool:
+        """Breaker gate: open circuits are skipped without waiting for them to fail."""
+        if self.breakers.get(label).allow_request():
+            return True
+        logger.warning(f"Circuit open for {label} – skipping")
+        return False
+
+    @staticmethod
+    def _started(on_attempt: Optional[AttemptCallback], label: str, attempt: int) -> None:
+        if on_attempt is None:
+            return
+        try:
+            on_attempt(label, attempt)
+        except Exception as e:
+            logger.warning(f"Attempt callback failed for {label}: {e}")
+
+    async def _chain(
+        self, backends: List[Backend], image: ImagePayload, prompt: str, on_attempt: Optional[AttemptCallback] = None
+    ) -> Optional[Dict]:
+        """Strict one-after-another fallback."""
+        previous = None
+        attempts = 0
+        for label, fn in backends:
+            if not self._admit(label):
+                continue
+            if previous:
+                logger.warning(f"{previous} failed – trying {label}")
+            attempts += 1
+            self._started(on_attempt, label, attempts)
+            result = await self._timed_call(label, fn, image, prompt)
             if result:
+                self._record_race(winner=label, hedges=0)
                 return result
+            previous = label
+        self._record_race(winner=None, hedges=0)
+        return None
 
-        # 4. Final mock fallback
-        logger.error("All AI backends failed – returning mock result")
-        return self._mock_analysis(insurance_data)
+    async def _race(
+        self, backends: List[Backend], image: ImagePayload, prompt: str, on_attempt: Optional[AttemptCallback] = None
+    ) -> Optional[Dict]:
+        """
+        Hedged fallback. Backends start in chain order; the next one starts when
+        the newest running one fails or outlives its hedge delay. The first valid
+        result wins and the racers still in flight are cancelled.
+        """
+        pending = {}
+        next_index = 0
+        hedges = 0
+        attempts = 0
+        newest = None  # task of the most recently started backend
+        newest_started = 0.0
+        timed_out = False
+
+        try:
+            while True:
+                if newest not in pending or timed_out:
+                    while next_index < len(backends):
+                        label, fn = backends[next_index]
+                        next_index += 1
+                        if not self._admit(label):
+                            continue
+                        if pending:
+                            hedges += 1
+                            logger.warning(f"{pending[newest]} slow – hedging with {label}")
+                        attempts += 1
+                        self._started(on_attempt, label, attempts)
+                        newest = asyncio.ensure_future(self._timed_call(label, fn, image, prompt))
+                        newest_started = time.perf_counter()
+                        pending[newest] = label
+                        break
+
+                if not pending:
+                    self._record_race(winner=None, hedges=hedges)
+                    return None
+
+                timeout = None
+                if next_index < len(backends):
+                    deadline = newest_started + self.hedge_delay(pending[newest])
+                    timeout = max(0.0, deadline - time.perf_counter())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                timed_out = not done
+
+                for task in done:
+                    label = pending.pop(task)
+                    result = task.result()
+                    if result:
+                        self._record_race(winner=label, hedges=hedges)
+                        return result
+        finally:
+            for loser in pending:
+                loser.cancel()
+
+    def hedge_delay(self, label: str) -> float:
+        """Seconds to wait on a backend before hedging: its observed p95, else the configured default."""
+        tracker = self._tracker(label)
+        if len(tracker) < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, tracker.percentile(self.hedge_percentile))
+
+    def _tracker(self, label: str) -> LatencyTracker:
+        with self._stats_lock:
+            if label not in self._latency:
+                self._latency[label] = LatencyTracker()
+            return self._latency[label]
+
+    def cancelled_calls(self, label: str) -> int:
+        """Calls to a backend cancelled before they finished: the overhead hedging paid for its wins."""
+        with self._stats_lock:
+            return self._cancelled.get(label, 0)
+
+    def _record_race(self, winner: Optional[str], hedges: int):
+        with self._stats_lock:
+            self._races += 1
+            self._hedges_fired += hedges
+            if winner is None:
+                self._all_failed += 1
+            else:
+                self._wins[winner] = self._wins.get(winner, 0) + 1
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        """Hedge delays, winner counts and per-backend latency percentiles."""
+        labels = self.backend_labels()
+        latency = {}
+        for label in labels:
+            tracker = self._tracker(label)
+            p50, p95 = tracker.percentile(0.5), tracker.percentile(0.95)
+            latency[label] = {
+                "samples": len(tracker),
+                "censoredSamples": tracker.censored(),
+                "p50Ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95Ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "hedgeDelayMs": round(self.hedge_delay(label) * 1000, 1),
+            }
+        with self._stats_lock:
+            return {
+                "hedging": self.hedging,
+                "inFlight": self._in_flight,
+                "analyses": self._races,
+                "hedgesFired": self._hedges_fired,
+                "cancelledCalls": sum(self._cancelled.values()),
+                "allFailed": self._all_failed,
+                "wins": dict(self._wins),
+                "backends": latency,
+            }
 
     # ----------------------------------------------------------
     # GEMINI CALL
     # ----------------------------------------------------------
 
-    def _call_gemini(self, client, image_path: str, prompt: str, key_label: str) -> Optional[Dict]:
-        """Call a single Gemini client and return parsed result or None."""
+    async def _call_gemini(self, client, image: ImagePayload, prompt: str, key_label: str) -> Optional[Dict]:
+        """Call a single Gemini client and return parsed result, None for unusable output; raises on API errors."""
         try:
             from google.genai import types
-            with open(image_path, "rb") as f:
-                img_data = f.read()
-
-            # Detect mime type from extension
-            ext = image_path.lower().split(".")[-1]
-            mime = "image/jpeg" if ext in ("jpg", "jpeg") else f"image/{ext}"
+            image_part = types.Part.from_bytes(data=image.data, mime_type=image.mime)
 
-            image_part = types.Part.from_bytes(data=img_data, mime_type=mime)
-
-            response = client.models.generate_content(
+            response = await client.aio.models.generate_content(
                 model=self.model_name,
                 contents=[prompt, image_part],
                 config=types.GenerateContentConfig(
@@ -189,30 +548,24 @@ class CloudAnalyzer:
             logger.warning(f"Gemini {key_label} returned non-JSON: {raw[:200]}")
             return None
 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Gemini {key_label} error: {e}")
-            return None
+            raise
 
     # ----------------------------------------------------------
     # GROQ VISION CALL
     # ----------------------------------------------------------
 
-    def _call_groq(self, image_path: str, prompt: str) -> Optional[Dict]:
-        """Call Groq vision API (llama-4-scout or llama-3.2-90b-vision)."""
+    async def _call_groq(self, image: ImagePayload, prompt: str) -> Optional[Dict]:
+        """Call Groq vision API (llama-4-scout or llama-3.2-90b-vision); raises on API errors."""
         try:
-            from groq import Groq
+            client = self._get_groq_client()
 
-            client = Groq(api_key=self.groq_key)
+            data_url = image.data_url()
 
-            with open(image_path, "rb") as f:
-                img_bytes = f.read()
-            img_b64 = base64.b64encode(img_bytes).decode("utf-8")
-
-            ext = image_path.lower().split(".")[-1]
-            mime = "image/jpeg" if ext in ("jpg", "jpeg") else f"image/{ext}"
-            data_url = f"data:{mime};base64,{img_b64}"
-
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model="meta-llama/llama-4-scout-17b-16e-instruct",  # Groq vision model
                 messages=[
                     {
@@ -235,14 +588,28 @@ class CloudAnalyzer:
             logger.warning(f"Groq returned non-JSON: {raw[:200]}")
             return None
 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Groq vision error: {e}")
-            return None
+            raise
 
     # ----------------------------------------------------------
     # HELPERS
     # ----------------------------------------------------------
 
+    @staticmethod
+    def _rescale_boxes(result: Dict, scale: float) -> Dict:
+        """Map bounding boxes from the (downscaled) payload back onto the original image."""
+        if scale == 1.0:
+            return result
+        for dmg in result.get("damages", []):
+            box = dmg.get("boundingBox") or {}
+            dmg["boundingBox"] = {
+                key: float(box.get(key, 0) or 0) * scale for key in ("x", "y", "width", "height")
+            }
+        return result
+
     def _parse_json(self, text: str) -> Optional[Dict]:
         """Strip markdown fences and parse JSON robustly."""
         # Strip ```json ... ``` or ``` ... ```
@@ -0,0 +1,142 @@
+# backend/services/fast_json.py
+# Analysis/claim response bodies built straight from ORM rows and stored JSON, for orjson instead of Pydantic
+import math
+from typing import Any, Dict, Optional
+
+from schemas import AnalysisStatusEnum, ClaimStatusEnum, DamageTypeEnum, SeverityLevelEnum
+
+DAMAGE_TYPES = frozenset(member.value for member in DamageTypeEnum)
+SEVERITY_LEVELS = frozenset(member.value for member in SeverityLevelEnum)
+ANALYSIS_STATUSES = frozenset(member.value for member in AnalysisStatusEnum)
+CLAIM_STATUSES = frozenset(member.value for member in ClaimStatusEnum)
+
+
+class SchemaMismatch(Exception):
+    """A value the response schema would coerce or reject; the caller goes through the Pydantic models instead"""
+
+
+# Each helper accepts exactly what the schema passes through unchanged (ints widen to
+# float, as Pydantic does) and refuses the rest, so the fast path never has to
+# reproduce Pydantic's coercions or its errors.
+
+def _str(value: Any) -> str:
+    if type(value) is not str:
+        raise SchemaMismatch()
+    return value
+
+
+def _opt_str(value: Any) -> Optional[str]:
+    if value is not None and type(value) is not str:
+        raise SchemaMismatch()
+    return value
+
+
+def _opt_int(value: Any) -> Optional[int]:
+    if value is not None and type(value) is not int:
+        raise SchemaMismatch()
+    return value
+
+
+def _float(value: Any) -> float:
+    kind = type(value)
+    if kind is float:
+        if not math.isfinite(value):  # the stdlib encoder refuses these; orjson would write null
+            raise SchemaMismatch()
+        return value
+    if kind is int:
+        return float(value)
+    raise SchemaMismatch()
+
+
+def _enum(value: Any, allowed: frozenset) -> str:
+    value = getattr(value, "value", value)
+    if type(value) is not str or value not in allowed:
+        raise SchemaMismatch()
+    return value
+
+
+def vehicle_payload(info: Any) -> Dict[str, Any]:
+    """VehicleInfo from a dict of its fields (missing ones are None, unknown ones dropped)"""
+    if not info:
+        info = {}
+    elif type(info) is not dict:
+        raise SchemaMismatch()
+    get = info.get
+    return {
+        "make": _opt_str(get("make")),
+        "model": _opt_str(get("model")),
+        "year": _opt_int(get("year")),
+        "plateNumber": _opt_str(get("plateNumber")),
+        "vin": _opt_str(get("vin")),
+        "color": _opt_str(get("color")),
+    }
+
+
+def damage_payload(damage: Any) -> Dict[str, Any]:
+    """DamageAssessment from a stored damage dict, with the same defaults as model_to_analysis_result (ids are stored, never made up)"""
+    if type(damage) is not dict:
+        raise SchemaMismatch()
+    box = damage.get("boundingBox", {})
+    if type(box) is not dict:
+        raise SchemaMismatch()
+    return {
+        "id": _str(damage.get("id")),
+        "partIdentified": _str(damage.get("partIdentified", "Unknown")),
+        "damageType": _enum(damage.get("damageType", "scratch"), DAMAGE_TYPES),
+        "confidenceScore": _float(damage.get("confidenceScore", 0.0)),
+        "boundingBox": {
+            "x": _float(box.get("x", 0)),
+            "y": _float(box.get("y", 0)),
+            "width": _float(box.get("width", 0)),
+            "height": _float(box.get("height", 0)),
+        },
+        "estimatedCost": _float(damage.get("estimatedCost", 0.0)),
+    }
+
+
+def analysis_payload(db_result) -> Dict[str, Any]:
+    """The AnalysisResult body of an AnalysisResultModel row (raises SchemaMismatch)"""
+    return {
+        "id": _str(db_result.id),
+        "imageUrl": _str(db_result.imageUrl or ""),
+        "vehicleInfo": {
+            "make": _opt_str(db_result.vehicleMake),
+            "model": _opt_str(db_result.vehicleModel),
+            "year": _opt_int(db_result.vehicleYear),
+            "plateNumber": _opt_str(db_result.vehiclePlateNumber),
+            "vin": _opt_str(db_result.vehicleVin),
+            "color": _opt_str(db_result.vehicleColor),
+        },
+        "damages": [damage_payload(damage) for damage in db_result.damages or ()],
+        "overallSeverity": {
+            "level": _enum(db_result.overallSeverityLevel, SEVERITY_LEVELS),
+            "score": _float(db_result.overallSeverityScore),
+            "description": _str(db_result.overallSeverityDescription),
+        },
+        "totalEstimatedCost": _float(db_result.totalEstimatedCost),
+        "aiConfidence": _float(db_result.aiConfidence),
+        "processedAt": db_result.processedAt.isoformat() if db_result.processedAt else "",
+        "status": _enum(db_result.status, ANALYSIS_STATUSES),
+    }
+
+
+def claim_payload(db_claim, include_analysis: bool = True) -> Dict[str, Any]:
+    """The Claim body of a ClaimModel row, like model_to_claim (raises SchemaMismatch)"""
+    analysis = None
+    if include_analysis and db_claim.analysisResult:
+        analysis = analysis_payload(db_claim.analysisResult)
+    if db_claim.submittedAt is None:
+        raise SchemaMismatch()
+    return {
+        "id": _str(db_claim.id),
+        "claimNumber": _str(db_claim.claimNumber),
+        "vehiclePlate": _str(db_claim.vehiclePlate),
+        "vehicleInfo": vehicle_payload(db_claim.vehicleInfoJson),
+        "submittedAt": db_claim.submittedAt.isoformat(),
+        "processedAt": db_claim.processedAt.isoformat() if db_claim.processedAt else None,
+        "aiConfidence": _float(db_claim.aiConfidence),
+        "status": _enum(db_claim.status, CLAIM_STATUSES),
+        "totalPayout": _float(db_claim.totalPayout),
+        "analysisResult": analysis,
+        "adjusterNotes": _opt_str(db_claim.adjusterNotes),
+    }
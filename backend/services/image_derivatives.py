@@ -0,0 +1,153 @@
+# backend/services/image_derivatives.py
+# Resized upload variants (thumbnail / medium, WebP or JPEG) in a size-capped LRU disk cache
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from PIL import Image, ImageOps
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg")}
+
+
+class DerivativeCache:
+    """
+    Downscaled copies of uploads for previews, made at ingest or on first
+    request and kept on disk. Requested widths snap up to one of `widths` (so a handful of
+    variants per upload at most) and are never larger than the original.
+
+    The cache holds at most `max_bytes`; the least recently served variants
+    are deleted first. Recency lives in memory and is rebuilt from file
+    access/modification times at startup. Uploads are never rewritten, so
+    variants never go stale; eviction only costs a regeneration.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        widths: Optional[Sequence[int]] = None,
+        max_bytes: Optional[int] = None,
+        quality: Optional[int] = None,
+    ):
+        self.directory = Path(directory or settings.DERIVATIVE_CACHE_DIR)
+        self.widths = sorted(widths or settings.DERIVATIVE_WIDTHS)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.DERIVATIVE_CACHE_MAX_BYTES
+        self.quality = quality if quality is not None else settings.DERIVATIVE_QUALITY
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # filename -> bytes, oldest first
+        self._total = 0
+        self._generating: Dict[str, threading.Lock] = {}
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def snap_width(self, width: int) -> int:
+        """The smallest configured width that is at least `width` (the largest if none is)."""
+        for candidate in self.widths:
+            if candidate >= width:
+                return candidate
+        return self.widths[-1]
+
+    def get(self, source: Path, width: int, fmt: str) -> Path:
+        """Path of the variant of `source` for (width, fmt), generating it if needed (blocking)."""
+        self._load()
+        width = self.snap_width(width)
+        pil_format, extension = FORMATS[fmt]
+        name = f"{source.stem}-w{width}{extension}"
+        path = self.directory / name
+
+        with self._lock:
+            if name in self._entries and path.exists():
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return path
+            generating = self._generating.setdefault(name, threading.Lock())
+
+        # One thread generates a variant; concurrent requests for it wait and reuse the file
+        with generating:
+            with self._lock:
+                if name in self._entries and path.exists():
+                    self._entries.move_to_end(name)
+                    self.hits += 1
+                    return path
+            try:
+                size = self._generate(source, path, width, pil_format)
+            finally:
+                with self._lock:
+                    self._generating.pop(name, None)
+            with self._lock:
+                self.misses += 1
+                self._total += size - self._entries.pop(name, 0)
+                self._entries[name] = size
+                self._evict(keep=name)
+        return path
+
+    def _generate(self, source: Path, path: Path, width: int, pil_format: str) -> int:
+        with Image.open(source) as decoded:
+            # draft() lets the JPEG decoder skip most of the pixels for a small target
+            decoded.draft("RGB", (width, width))
+            image = ImageOps.exif_transpose(decoded).convert("RGB")
+        if image.width > width:
+            image.thumbnail((width, image.height), Image.LANCZOS)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{uuid.uuid4().hex}.part")
+        try:
+            image.save(partial, format=pil_format, quality=self.quality)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        return path.stat().st_size
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used variants until the cache fits (caller holds the lock)."""
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            name, size = next(iter(self._entries.items()))
+            if name == keep:
+                break
+            del self._entries[name]
+            self._total -= size
+            self.evictions += 1
+            (self.directory / name).unlink(missing_ok=True)
+
+    def _load(self) -> None:
+        """Index the variants already on disk, most recently used last (once per process)."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.directory.is_dir():
+                files = [
+                    (max(stat.st_atime, stat.st_mtime), entry.name, stat.st_size)
+                    for entry in os.scandir(self.directory)
+                    if entry.is_file() and not entry.name.startswith(".")
+                    for stat in (entry.stat(),)
+                ]
+                for _, name, size in sorted(files):
+                    self._entries[name] = size
+                    self._total += size
+                self._evict(keep="")
+            self._loaded = True
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "variants": len(self._entries),
+                "bytes": self._total,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
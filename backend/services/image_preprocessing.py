@@ -0,0 +1,161 @@
+# backend/services/image_preprocessing.py
+# Decode-once image preprocessing shared by the cloud and local engines
+import base64
+import io
+import logging
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+EXIF_ORIENTATION = 0x0112
+
+
+class ImagePayload:
+    """Encoded image bytes handed to a cloud backend."""
+
+    def __init__(self, data: bytes, mime: str, width: int = 0, height: int = 0, scale: float = 1.0):
+        self.data = data
+        self.mime = mime
+        self.width = width
+        self.height = height
+        # Multiply coordinates on this payload by scale to map them onto the oriented original
+        self.scale = scale
+        self._data_url: Optional[str] = None
+
+    @classmethod
+    def from_file(cls, image_path: str) -> "ImagePayload":
+        """Raw file bytes, for callers that did not go through the preprocessing stage."""
+        with open(image_path, "rb") as f:
+            data = f.read()
+
+        # Detect mime type from extension
+        ext = image_path.lower().split(".")[-1]
+        mime = "image/jpeg" if ext in ("jpg", "jpeg") else f"image/{ext}"
+        return cls(data, mime)
+
+    def data_url(self) -> str:
+        """base64 data URL (computed once, shared by every backend that needs it)."""
+        if self._data_url is None:
+            self._data_url = f"data:{self.mime};base64,{base64.b64encode(self.data).decode('utf-8')}"
+        return self._data_url
+
+
+class PreparedImage:
+    """
+    An upload decoded once, with EXIF orientation applied, turned into the
+    input each engine needs: a downscaled JPEG within the cloud byte budget and
+    a BGR array at the YOLO input size. The full-resolution pixels are dropped
+    afterwards, so an analysis waiting on the cloud holds only these buffers.
+    """
+
+    def __init__(self, content: bytes, stats: Optional["PreprocessingStats"] = None):
+        self.source_bytes = len(content)
+
+        started = time.perf_counter()
+        with Image.open(io.BytesIO(content)) as decoded:
+            source_format = decoded.format
+            reoriented = decoded.getexif().get(EXIF_ORIENTATION, 1) != 1
+            image = ImageOps.exif_transpose(decoded).convert("RGB")
+        self.width, self.height = image.size
+        decoded_at = time.perf_counter()
+
+        # Cloud: original bytes if already small enough, else a re-encoded JPEG
+        if (
+            self.source_bytes <= settings.CLOUD_IMAGE_BYTE_BUDGET
+            and max(self.width, self.height) <= settings.CLOUD_IMAGE_MAX_SIDE
+            and not reoriented
+            and source_format in ("JPEG", "PNG", "WEBP")
+        ):
+            self.cloud = ImagePayload(content, Image.MIME[source_format], self.width, self.height)
+        else:
+            self.cloud = self._encode_within_budget(image)
+
+        # YOLO: ultralytics takes numpy input as BGR
+        yolo_image = _downscale(image, settings.YOLO_INPUT_SIZE)
+        self.yolo_scale = self.width / yolo_image.width
+        self.yolo_input = np.ascontiguousarray(np.asarray(yolo_image)[:, :, ::-1])
+
+        if stats:
+            finished = time.perf_counter()
+            stats.record(
+                self.source_bytes,
+                len(self.cloud.data),
+                decode_ms=(decoded_at - started) * 1000,
+                encode_ms=(finished - decoded_at) * 1000,
+            )
+
+    @classmethod
+    def from_file(cls, image_path: str, stats: Optional["PreprocessingStats"] = None) -> "PreparedImage":
+        with open(image_path, "rb") as f:
+            return cls(f.read(), stats=stats)
+
+    def _encode_within_budget(self, image: Image.Image) -> ImagePayload:
+        """JPEG no larger than CLOUD_IMAGE_MAX_SIDE px and CLOUD_IMAGE_BYTE_BUDGET bytes."""
+        image = _downscale(image, settings.CLOUD_IMAGE_MAX_SIDE)
+        quality = settings.CLOUD_IMAGE_QUALITY
+        data = _encode_jpeg(image, quality)
+        while len(data) > settings.CLOUD_IMAGE_BYTE_BUDGET:
+            # Lower quality first, then shrink the image
+            if quality > 50:
+                quality -= 10
+            else:
+                image = image.resize((max(1, image.width * 3 // 4), max(1, image.height * 3 // 4)), Image.LANCZOS)
+            data = _encode_jpeg(image, quality)
+        return ImagePayload(data, "image/jpeg", image.width, image.height, scale=self.width / image.width)
+
+
+def _downscale(image: Image.Image, max_side: int) -> Image.Image:
+    if max(image.size) <= max_side:
+        return image
+    resized = image.copy()
+    resized.thumbnail((max_side, max_side), Image.LANCZOS)
+    return resized
+
+
+def _encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+class PreprocessingStats:
+    """Upload bytes and time saved by sending preprocessed payloads instead of the original file."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = 0
+        self.source_bytes = 0
+        self.payload_bytes = 0
+        self.decode_ms = 0.0
+        self.encode_ms = 0.0
+
+    def record(self, source_bytes: int, payload_bytes: int, decode_ms: float, encode_ms: float):
+        with self._lock:
+            self.images += 1
+            self.source_bytes += source_bytes
+            self.payload_bytes += payload_bytes
+            self.decode_ms += decode_ms
+            self.encode_ms += encode_ms
+
+    def stats(self) -> dict:
+        with self._lock:
+            saved = self.source_bytes - self.payload_bytes
+            return {
+                "images": self.images,
+                "sourceBytes": self.source_bytes,
+                "cloudPayloadBytes": self.payload_bytes,
+                "cloudBytesSaved": saved,
+                "cloudBytesSavedRatio": round(saved / self.source_bytes, 4) if self.source_bytes else 0.0,
+                "avgDecodeMs": round(self.decode_ms / self.images, 2) if self.images else 0.0,
+                "avgEncodeMs": round(self.encode_ms / self.images, 2) if self.images else 0.0,
+            }
+
+
+preprocessing_stats = PreprocessingStats()
@@ -0,0 +1,414 @@
+# backend/services/job_queue.py
+# Durable analysis job queue (database-backed, lease-based claims, retries with backoff)
+import asyncio
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import and_, exists, func, or_
+
+from config import settings
+from models.database import AnalysisJobModel, AnalysisResultModel, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def default_worker_id() -> str:
+    """Identifies the claiming process in leasedBy (host:pid:suffix)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class JobQueue:
+    """
+    Analysis jobs persisted in the analysis_jobs table.
+
+    A worker claims a job with a conditional UPDATE, which only one claimer can
+    win, and holds it under a lease (the visibility timeout). If the worker dies
+    the lease expires and the job becomes claimable again. A failed job is put
+    back with exponential backoff until it runs out of attempts, then the
+    analysis is marked failed.
+    """
+
+    # Candidates fetched per claim attempt; losers of a race move on to the next one
+    CLAIM_SCAN = 5
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        visibility_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        backoff_max_seconds: Optional[float] = None,
+    ):
+        self._session_factory = session_factory
+        self.visibility_timeout = visibility_timeout if visibility_timeout is not None else settings.JOB_VISIBILITY_TIMEOUT
+        self.max_attempts = max_attempts if max_attempts is not None else settings.JOB_MAX_ATTEMPTS
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else settings.JOB_RETRY_BACKOFF_SECONDS
+        self.backoff_max_seconds = backoff_max_seconds if backoff_max_seconds is not None else settings.JOB_RETRY_BACKOFF_MAX_SECONDS
+
+        self._lock = threading.Lock()
+        self.claimed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    # ---- producer side ----
+
+    def enqueue(self, db, analysis_id: str, payload: Dict) -> AnalysisJobModel:
+        """Add a job to the caller's session; it becomes visible when the caller commits."""
+        now = datetime.utcnow()
+        job = AnalysisJobModel(
+            id=str(uuid.uuid4()),
+            analysisId=analysis_id,
+            payload=payload,
+            status=QUEUED,
+            attempts=0,
+            maxAttempts=self.max_attempts,
+            availableAt=now,
+            createdAt=now,
+            updatedAt=now,
+        )
+        db.add(job)
+        return job
+
+    def recover_orphans(self, payload_builder: Callable[[AnalysisResultModel], Optional[Dict]]) -> int:
+        """
+        Re-enqueue analyses left in "processing" without a live job (e.g. uploads
+        accepted before this queue existed, or whose job was lost). Analyses the
+        builder can't rebuild a payload for are marked failed.
+        """
+        recovered = 0
+        with self._session_factory() as db:
+            live_job = exists().where(and_(
+                AnalysisJobModel.analysisId == AnalysisResultModel.id,
+                AnalysisJobModel.status.in_((QUEUED, RUNNING)),
+            ))
+            orphans = db.query(AnalysisResultModel).filter(
+                AnalysisResultModel.status == "processing",
+                ~live_job,
+            ).all()
+
+            for analysis in orphans:
+                payload = payload_builder(analysis)
+                if payload is None:
+                    analysis.status = "failed"
+                    analysis.overallSeverityDescription = "Processing error: upload could not be recovered"
+                    continue
+                self.enqueue(db, analysis.id, payload)
+                recovered += 1
+            db.commit()
+
+        if orphans:
+            logger.info(f"Recovered {recovered} orphaned analyses ({len(orphans) - recovered} unrecoverable)")
+        return recovered
+
+    # ---- consumer side ----
+
+    def _claimable(self, now: datetime):
+        return or_(
+            and_(AnalysisJobModel.status == QUEUED, AnalysisJobModel.availableAt <= now),
+            and_(
+                AnalysisJobModel.status == RUNNING,
+                AnalysisJobModel.leaseExpiresAt < now,
+                AnalysisJobModel.attempts < AnalysisJobModel.maxAttempts,
+            ),
+        )
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Lease the next due job to worker_id, or return None if there is nothing to do."""
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            candidates = db.query(AnalysisJobModel.id).filter(
+                self._claimable(now)
+            ).order_by(AnalysisJobModel.availableAt).limit(self.CLAIM_SCAN).all()
+
+            for (job_id,) in candidates:
+                # Only one worker's UPDATE matches; everyone else sees rowcount 0
+                won = db.query(AnalysisJobModel).filter(
+                    AnalysisJobModel.id == job_id,
+                    self._claimable(now),
+                ).update({
+                    AnalysisJobModel.status: RUNNING,
+                    AnalysisJobModel.leasedBy: worker_id,
+                    AnalysisJobModel.leaseExpiresAt: now + timedelta(seconds=self.visibility_timeout),
+                    AnalysisJobModel.attempts: AnalysisJobModel.attempts + 1,
+                    AnalysisJobModel.updatedAt: now,
+                }, synchronize_session=False)
+                db.commit()
+
+                if won:
+                    job = db.get(AnalysisJobModel, job_id)
+                    with self._lock:
+                        self.claimed += 1
+                    return {
+                        "id": job.id,
+                        "analysisId": job.analysisId,
+                        "payload": job.payload or {},
+                        "attempt": job.attempts,
+                        "maxAttempts": job.maxAttempts,
+                    }
+        return None
+
+    def extend_lease(self, job_id: str, worker_id: str) -> bool:
+        """Push the visibility timeout out while a long job is still running."""
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            updated = db.query(AnalysisJobModel).filter(
+                AnalysisJobModel.id == job_id,
+                AnalysisJobModel.status == RUNNING,
+                AnalysisJobModel.leasedBy == worker_id,
+            ).update({
+                AnalysisJobModel.leaseExpiresAt: now + timedelta(seconds=self.visibility_timeout),
+                AnalysisJobModel.updatedAt: now,
+            }, synchronize_session=False)
+            db.commit()
+        return bool(updated)
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            updated = db.query(AnalysisJobModel).filter(
+                AnalysisJobModel.id == job_id,
+                AnalysisJobModel.status == RUNNING,
+                AnalysisJobModel.leasedBy == worker_id,
+            ).update({
+                AnalysisJobModel.status: SUCCEEDED,
+                AnalysisJobModel.leaseExpiresAt: None,
+                AnalysisJobModel.updatedAt: now,
+            }, synchronize_session=False)
+            db.commit()
+
+        if updated:
+            with self._lock:
+                self.succeeded += 1
+        else:
+            logger.warning(f"Job {job_id} finished after its lease was lost")
+        return bool(updated)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """Requeue with backoff, or dead-letter the job once its attempts are used up."""
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            job = db.query(AnalysisJobModel).filter(
+                AnalysisJobModel.id == job_id,
+                AnalysisJobModel.status == RUNNING,
+                AnalysisJobModel.leasedBy == worker_id,
+            ).first()
+            if not job:
+                logger.warning(f"Job {job_id} failed after its lease was lost: {error}")
+                return
+
+            job.lastError = error[:2000]
+            job.leasedBy = None
+            job.leaseExpiresAt = None
+            job.updatedAt = now
+
+            if job.attempts >= job.maxAttempts:
+                job.status = FAILED
+                self._fail_analysis(db, job.analysisId, error)
+                logger.error(f"Job {job_id} for {job.analysisId} failed after {job.attempts} attempts: {error}")
+                with self._lock:
+                    self.dead_lettered += 1
+            else:
+                delay = self.backoff_delay(job.attempts)
+                job.status = QUEUED
+                job.availableAt = now + timedelta(seconds=delay)
+                logger.warning(f"Job {job_id} attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}")
+                with self._lock:
+                    self.retried += 1
+            db.commit()
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter, so retries of a shared outage don't land together."""
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * (2 ** max(attempts - 1, 0)))
+        return random.uniform(delay / 2, delay)
+
+    def dead_letter_expired(self) -> int:
+        """Jobs whose worker died on the last attempt can't be reclaimed; fail them and return how many."""
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            expired = db.query(AnalysisJobModel).filter(
+                AnalysisJobModel.status == RUNNING,
+                AnalysisJobModel.leaseExpiresAt < now,
+                AnalysisJobModel.attempts >= AnalysisJobModel.maxAttempts,
+            ).all()
+            for job in expired:
+                job.status = FAILED
+                job.lastError = job.lastError or "Lease expired on final attempt"
+                job.leasedBy = None
+                job.leaseExpiresAt = None
+                job.updatedAt = now
+                self._fail_analysis(db, job.analysisId, job.lastError)
+                logger.error(f"Job {job.id} for {job.analysisId} lost its lease on its last attempt")
+                with self._lock:
+                    self.dead_lettered += 1
+            if expired:
+                db.commit()
+        return len(expired)
+
+    @staticmethod
+    def _fail_analysis(db, analysis_id: str, error: str) -> None:
+        analysis = db.get(AnalysisResultModel, analysis_id)
+        if analysis and analysis.status == "processing":
+            analysis.status = "failed"
+            analysis.overallSeverityDescription = f"Processing error: {error}"
+
+    def stats(self) -> Dict:
+        with self._session_factory() as db:
+            counts = dict(db.query(
+                AnalysisJobModel.status, func.count(AnalysisJobModel.id)
+            ).group_by(AnalysisJobModel.status).all())
+            oldest = db.query(func.min(AnalysisJobModel.availableAt)).filter(
+                AnalysisJobModel.status == QUEUED
+            ).scalar()
+
+        with self._lock:
+            return {
+                "queued": counts.get(QUEUED, 0),
+                "running": counts.get(RUNNING, 0),
+                "succeeded": counts.get(SUCCEEDED, 0),
+                "failed": counts.get(FAILED, 0),
+                "oldestQueuedSeconds": round(max((datetime.utcnow() - oldest).total_seconds(), 0.0), 1) if oldest else 0.0,
+                "claimed": self.claimed,
+                "completed": self.succeeded,
+                "retried": self.retried,
+                "deadLettered": self.dead_lettered,
+            }
+
+
+class JobWorker:
+    """
+    Runs up to `concurrency` jobs at once on the current event loop.
+
+    Handlers are coroutines, so a worker process can keep many cloud calls in
+    flight with a handful of threads. Any number of workers (in the API
+    process or standalone via worker.py) can share one queue.
+
+    An idle worker costs one claim query per poll interval: a single idle slot
+    polls while the rest wait to be woken, by notify() or by a slot that just
+    got a job (more may be due). Expired final-attempt leases are swept by one
+    task on the same interval.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Callable[[Dict], Awaitable[None]],
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = max(1, concurrency if concurrency is not None else settings.JOB_CONCURRENCY)
+        self.poll_interval = poll_interval if poll_interval is not None else settings.JOB_POLL_INTERVAL
+        self.worker_id = worker_id or default_worker_id()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle_slots: Optional[asyncio.Condition] = None
+        self._polling = False
+        self._stopping = False
+        self.in_flight = 0
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._idle_slots = asyncio.Condition()
+        self._polling = False
+        self._stopping = False
+        logger.info(f"Job worker {self.worker_id} started with {self.concurrency} slots")
+        sweeper = asyncio.create_task(self._sweep())
+        try:
+            await asyncio.gather(*(self._slot() for _ in range(self.concurrency)))
+        finally:
+            sweeper.cancel()
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    def notify(self) -> None:
+        """Wake an idle slot now instead of at the next poll (safe from any thread)."""
+        if self._loop is not None and self._idle_slots is not None:
+            asyncio.run_coroutine_threadsafe(self._wake(), self._loop)
+
+    def stop(self) -> None:
+        """Let in-flight jobs finish and stop claiming new ones."""
+        self._stopping = True
+        if self._loop is not None and self._idle_slots is not None:
+            asyncio.run_coroutine_threadsafe(self._wake(self.concurrency), self._loop)
+
+    async def _wake(self, slots: int = 1) -> None:
+        async with self._idle_slots:
+            self._idle_slots.notify(slots)
+
+    async def _slot(self) -> None:
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+            except Exception as e:
+                logger.error(f"Job claim failed: {e}")
+                job = None
+
+            if job is None:
+                await self._idle()
+                continue
+            # More jobs may be due: another idle slot tries, and goes back to waiting if not
+            await self._wake()
+            await self._execute(job)
+
+    async def _idle(self) -> None:
+        """The first idle slot polls every poll_interval; the others wait until they are woken."""
+        async with self._idle_slots:
+            if self._stopping:
+                return
+            if self._polling:
+                await self._idle_slots.wait()
+                return
+            self._polling = True
+            try:
+                await asyncio.wait_for(self._idle_slots.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._polling = False
+
+    async def _sweep(self) -> None:
+        """Dead-letter expired final-attempt jobs once per poll interval, for the whole worker."""
+        while not self._stopping:
+            try:
+                await asyncio.to_thread(self.queue.dead_letter_expired)
+            except Exception as e:
+                logger.error(f"Dead-letter sweep failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _execute(self, job: Dict) -> None:
+        self.in_flight += 1
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            await self.handler(job)
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['analysisId']}) attempt {job['attempt']} raised: {e}")
+            await asyncio.to_thread(self.queue.fail, job["id"], self.worker_id, str(e) or type(e).__name__)
+        else:
+            await asyncio.to_thread(self.queue.complete, job["id"], self.worker_id)
+        finally:
+            heartbeat.cancel()
+            self.in_flight -= 1
+
+    async def _heartbeat(self, job_id: str) -> None:
+        interval = max(self.queue.visibility_timeout / 3, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await asyncio.to_thread(self.queue.extend_lease, job_id, self.worker_id):
+                    logger.warning(f"Lost lease on job {job_id}")
+                    return
+            except Exception as e:
+                logger.warning(f"Lease renewal failed for job {job_id}: {e}")
@@ -0,0 +1,114 @@
+# backend/services/lazy_engine.py
+# Lazily constructed, thread-safe engine holders with background warm-up and timings
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds spent on the first import of heavy modules (and of the app), for the readiness probe
+import_timings: Dict[str, float] = {}
+
+
+@contextmanager
+def timed_import(name: str):
+    started = time.perf_counter()
+    yield
+    import_timings.setdefault(name, round(time.perf_counter() - started, 3))
+
+IDLE = "idle"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class LazyEngine(Generic[T]):
+    """
+    Builds an engine on first use instead of at import time.
+
+    ``get()`` is safe to call from any thread; concurrent callers wait for the
+    one construction in progress. ``warm()`` builds the engine and runs the
+    optional warm-up (e.g. a dummy inference) so the first real request doesn't
+    pay for it; lifespan runs it in the background.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], T],
+        warm_up: Optional[Callable[[T], None]] = None,
+    ):
+        self.name = name
+        self._factory = factory
+        self._warm_up = warm_up
+        self._lock = threading.Lock()
+        self._instance: Optional[T] = None
+
+        self.state = IDLE
+        self.load_seconds: Optional[float] = None
+        self.warm_up_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def get(self) -> T:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                self.state = LOADING
+                started = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                except Exception as e:
+                    self.state = FAILED
+                    self.error = str(e)[:200]
+                    logger.error(f"Failed to load engine {self.name}: {e}")
+                    raise
+                self.load_seconds = time.perf_counter() - started
+                self.error = None
+                logger.info(f"Engine {self.name} loaded in {self.load_seconds:.2f}s")
+                self.state = READY if self._warm_up is None else WARMING
+            return self._instance
+
+    def peek(self) -> Optional[T]:
+        """The engine if it has been built, without building it."""
+        return self._instance
+
+    def warm(self) -> bool:
+        """Build the engine and run its warm-up; returns whether it is ready."""
+        try:
+            instance = self.get()
+        except Exception:
+            return False
+        if self.state == READY:
+            return True
+
+        started = time.perf_counter()
+        try:
+            if self._warm_up is not None:
+                self._warm_up(instance)
+        except Exception as e:
+            # The engine is built and still usable; the first request just isn't primed
+            logger.warning(f"Warm-up of engine {self.name} failed: {e}")
+            self.error = f"warm-up: {str(e)[:200]}"
+        self.warm_up_seconds = time.perf_counter() - started
+        self.state = READY
+        logger.info(f"Engine {self.name} warmed up in {self.warm_up_seconds:.2f}s")
+        return True
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "loadSeconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "warmUpSeconds": round(self.warm_up_seconds, 3) if self.warm_up_seconds is not None else None,
+            "error": self.error,
+        }
@@ -0,0 +1,205 @@
+# backend/services/onnx_service.py
+# ONNX Runtime CPU engine for the local YOLO model (optional dynamic INT8 quantization)
+import ast
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import settings
+from services.circuit_breaker import circuit_breakers
+from services.lazy_engine import timed_import
+from services.yolo_pool import CompactResult
+from services.yolo_service import MIN_DETECTION_CONFIDENCE, ImageSource, describe_source
+
+logger = logging.getLogger(__name__)
+
+# Same defaults as ultralytics predict(), so both engines report the same boxes
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+
+# Grey padding ultralytics uses when letterboxing
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+def _is_stale(target: str, source: str) -> bool:
+    return not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source)
+
+
+def export_onnx(weights: str, imgsz: int) -> str:
+    """Export a .pt model next to itself as .onnx (once; re-exported when the weights change)."""
+    onnx_path = os.path.splitext(weights)[0] + ".onnx"
+    if os.path.exists(weights) and not _is_stale(onnx_path, weights):
+        return onnx_path
+    if not os.path.exists(weights) and os.path.exists(onnx_path):
+        return onnx_path
+
+    logger.info(f"Exporting {weights} to ONNX at {imgsz}px")
+    with timed_import("ultralytics"):
+        from ultralytics import YOLO
+    exported = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    return onnx_path
+
+
+def quantize_int8(onnx_path: str) -> str:
+    """Dynamic INT8 weight quantization of an exported model (activations stay float)."""
+    int8_path = os.path.splitext(onnx_path)[0] + ".int8.onnx"
+    if not _is_stale(int8_path, onnx_path):
+        return int8_path
+
+    logger.info(f"Quantizing {onnx_path} to dynamic INT8")
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Resize keeping aspect ratio and pad to size x size; returns the ratio and (left, top) padding."""
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_w, pad_h = (size - new_w) / 2, (size - new_h) / 2
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return image, ratio, (left, top)
+
+
+class OnnxAnalyzer:
+    """
+    Runs the exported YOLO model with onnxruntime on CPU.
+
+    Same interface as LocalAnalyzer (detect / detect_batch / warm_up); results
+    are CompactResult objects, which the YOLO formatter reads like ultralytics
+    Results. Post-processing (box decoding and class-aware NMS) uses OpenCV.
+    """
+
+    def __init__(self, quantize: bool = False, threads: int = 0):
+        self.breaker = circuit_breakers.get("LOCAL_YOLO")
+        self.imgsz = settings.YOLO_INPUT_SIZE
+
+        custom = os.path.join("models", "damage_model.pt")
+        weights = custom if os.path.exists(custom) or os.path.exists(os.path.splitext(custom)[0] + ".onnx") else "yolov8n.pt"
+        model_path = export_onnx(weights, self.imgsz)
+        if quantize:
+            model_path = quantize_int8(model_path)
+
+        with timed_import("onnxruntime"):
+            import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.model_path = model_path
+
+        # ultralytics stores the class names in the model metadata as a dict literal
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        try:
+            self.names = ast.literal_eval(metadata.get("names", "{}"))
+        except (ValueError, SyntaxError):
+            self.names = {}
+        logger.info(f"ONNX Runtime model loaded from {model_path} ({len(self.names)} classes)")
+
+    def warm_up(self):
+        """Run one dummy inference so the session's kernels are primed."""
+        self.infer(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8))
+
+    def infer(self, image_path: ImageSource) -> Optional[CompactResult]:
+        """Detection without breaker accounting; errors propagate."""
+        image = image_path if isinstance(image_path, np.ndarray) else cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Could not read image {describe_source(image_path)}")
+
+        blob, ratio, pad = self._preprocess(image)
+        output = self.session.run(None, {self.input_name: blob})[0]
+        result = self._postprocess(output[0], ratio, pad, image.shape[:2])
+        return self._filter_result(result, describe_source(image_path))
+
+    def detect(self, image_path: ImageSource):
+        """
+        Run detection on an image.
+
+        Args:
+            image_path: Path to image file, or an already decoded BGR array
+
+        Returns:
+            CompactResult if detections found, None if confidence too low
+        """
+        started = time.perf_counter()
+        try:
+            result = self.infer(image_path)
+            self.breaker.record_success(time.perf_counter() - started)
+            return result
+        except Exception as e:
+            logger.error(f"ONNX detection error: {str(e)}")
+            self.breaker.record_failure(time.perf_counter() - started, str(e)[:200])
+            return None
+
+    def detect_batch(self, image_paths: List[ImageSource]) -> List[Optional[CompactResult]]:
+        """The exported graph has a fixed batch of 1, so a batch is run image by image."""
+        return [self.detect(path) for path in image_paths]
+
+    def _preprocess(self, image: np.ndarray):
+        padded, ratio, pad = letterbox(image, self.imgsz)
+        blob = cv2.dnn.blobFromImage(padded, scalefactor=1 / 255.0, swapRB=True)  # BGR HWC -> RGB NCHW float32
+        return blob, ratio, pad
+
+    def _postprocess(self, output: np.ndarray, ratio: float, pad: Tuple[float, float], shape) -> CompactResult:
+        """Decode (4 + classes, anchors) predictions into boxes in original image pixels."""
+        predictions = output.T  # anchors x (cx, cy, w, h, class scores...)
+        scores = predictions[:, 4:]
+        classes = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(classes)), classes]
+
+        keep = confidences >= CONF_THRESHOLD
+        boxes, confidences, classes = predictions[keep, :4], confidences[keep], classes[keep]
+        empty = CompactResult(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.float32), self.names)
+        if len(confidences) == 0:
+            return empty
+
+        # cx, cy, w, h -> x, y, w, h for NMS
+        xywh = boxes.copy()
+        xywh[:, 0] -= xywh[:, 2] / 2
+        xywh[:, 1] -= xywh[:, 3] / 2
+        indices = cv2.dnn.NMSBoxesBatched(
+            xywh.tolist(), confidences.tolist(), classes.tolist(), CONF_THRESHOLD, IOU_THRESHOLD
+        )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)[:MAX_DETECTIONS]
+        if len(indices) == 0:
+            return empty
+
+        # Undo the letterbox and clip to the image
+        xyxy = np.column_stack([
+            xywh[indices, 0], xywh[indices, 1],
+            xywh[indices, 0] + xywh[indices, 2], xywh[indices, 1] + xywh[indices, 3],
+        ])
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad[0]) / ratio).clip(0, shape[1])
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad[1]) / ratio).clip(0, shape[0])
+
+        order = np.argsort(-confidences[indices])
+        return CompactResult(
+            xyxy[order].astype(np.float32),
+            confidences[indices][order].astype(np.float32),
+            classes[indices][order].astype(np.float32),
+            self.names,
+        )
+
+    def _filter_result(self, result: CompactResult, image_path: str) -> Optional[CompactResult]:
+        if len(result.boxes) == 0 or result.boxes.conf.max() < MIN_DETECTION_CONFIDENCE:
+            logger.warning(f"No detections or low confidence for {image_path}")
+            return None
+
+        logger.info(f"ONNX detection successful: {len(result.boxes)} objects")
+        return result
@@ -0,0 +1,216 @@
+# backend/services/result_writer.py
+# Group-commit writer: finished analysis results from every worker, committed together by one thread
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from config import settings
+from models.database import AnalysisResultModel, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Applies a finished result to its (session-bound) analysis row: apply(db_analysis, db)
+ApplyResult = Callable[[AnalysisResultModel, object], None]
+
+
+class _ResultFailed(Exception):
+    """A result could not be applied in the shared transaction"""
+
+
+class ResultWriter:
+    """
+    Collects finished analysis results from the worker threads and writes them
+    in shared transactions: a batch is flushed once it holds `max_batch`
+    results or `max_delay_ms` after its first one arrived, whichever comes
+    first. On SQLite every commit is a write-lock acquisition plus a WAL sync,
+    so one commit per batch leaves the lock free for uploads and claim writes
+    far more often than one commit per analysis.
+
+    A batch is applied without savepoints; if any result raises, the batch is
+    rolled back and redone with a SAVEPOINT per result, so the failing result
+    fails alone (its job is retried) and the rest still commits. Either way the
+    batch is one transaction (on SQLite, opened by an explicit BEGIN).
+
+    Durability: write() returns only after the transaction holding the result
+    has committed, and the job queue marks a job succeeded only after that,
+    so a succeeded job always has its result in the database. A result waiting
+    for its batch exists only in memory; if the process dies it is lost, its
+    job is still leased and runs again once the lease expires (applying a
+    result overwrites the analysis and its damage rows, so a re-run is safe).
+    Whether a commit survives an OS crash or power loss is up to the database:
+    with SQLite WAL and synchronous=NORMAL (the defaults) the last commits can
+    roll back; set SQLITE_SYNCHRONOUS=FULL if they must not.
+
+    With enabled=False every result is committed on its own in the caller's
+    thread, as before.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        enabled: Optional[bool] = None,
+        max_batch: Optional[int] = None,
+        max_delay_ms: Optional[float] = None,
+    ):
+        self._session_factory = session_factory
+        self.enabled = enabled if enabled is not None else settings.RESULT_WRITER_ENABLED
+        self.max_batch = max(1, max_batch if max_batch is not None else settings.RESULT_WRITER_MAX_BATCH)
+        self.max_delay = (max_delay_ms if max_delay_ms is not None else settings.RESULT_WRITER_MAX_DELAY_MS) / 1000
+
+        self._queue: "queue.Queue[Optional[Tuple[str, ApplyResult, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.results = 0
+        self.failed = 0
+        self.largest_batch = 0
+        self.commit_seconds = 0.0
+
+    # ---- producer side ----
+
+    def write(self, analysis_id: str, apply: ApplyResult) -> None:
+        """Apply a finished result and block until it is committed (raises if it wasn't)."""
+        self.submit(analysis_id, apply).result()
+
+    def submit(self, analysis_id: str, apply: ApplyResult) -> Future:
+        """Queue a finished result; the future resolves once its batch has committed."""
+        future = Future()
+        if not self.enabled:
+            self._flush([(analysis_id, apply, future)])
+            return future
+        self._ensure_started()
+        self._queue.put((analysis_id, apply, future))
+        return future
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush what is queued and stop the writer thread."""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    # ---- writer thread ----
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[str, ApplyResult, Future]]) -> None:
+        started = time.perf_counter()
+        try:
+            try:
+                errors = self._commit(batch, isolated=False)
+            except _ResultFailed:
+                # Redo the batch with a savepoint per result, so only the failing ones are dropped
+                errors = self._commit(batch, isolated=True)
+        except Exception as e:
+            # The load or the commit failed: nothing in the batch was written
+            logger.error(f"Group commit of {len(batch)} results failed: {e}")
+            errors = [e] * len(batch)
+
+        for (_, _, future), error in zip(batch, errors):
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+        with self._lock:
+            self.batches += 1
+            self.results += len(batch)
+            self.failed += sum(1 for error in errors if error is not None)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.commit_seconds += time.perf_counter() - started
+
+    def _commit(self, batch: List[Tuple[str, ApplyResult, Future]], isolated: bool) -> List[Optional[Exception]]:
+        """Apply the batch in one transaction; returns each result's error (None once committed)."""
+        errors: List[Optional[Exception]] = []
+        with self._session_factory() as db:
+            self._begin(db)
+            ids = list({analysis_id for analysis_id, _, _ in batch})
+            analyses = {
+                analysis.id: analysis
+                for analysis in db.query(AnalysisResultModel).filter(AnalysisResultModel.id.in_(ids))
+            }
+            for analysis_id, apply, _ in batch:
+                analysis = analyses.get(analysis_id)
+                if analysis is None:
+                    logger.error(f"Analysis {analysis_id} not found")
+                    errors.append(None)
+                    continue
+                if not isolated:
+                    try:
+                        apply(analysis, db)
+                    except Exception as e:
+                        raise _ResultFailed() from e
+                    errors.append(None)
+                    continue
+                try:
+                    with db.begin_nested():
+                        apply(analysis, db)
+                except Exception as e:
+                    logger.error(f"Writing result for {analysis_id} failed: {e}")
+                    errors.append(e)
+                else:
+                    errors.append(None)
+            if not isolated:
+                try:
+                    db.flush()
+                except Exception as e:
+                    raise _ResultFailed() from e
+            db.commit()
+        return errors
+
+    @staticmethod
+    def _begin(db) -> None:
+        """
+        Open the batch's transaction explicitly on SQLite. pysqlite only emits
+        BEGIN before an INSERT/UPDATE/DELETE, so the first SAVEPOINT of an
+        isolated redo would start a transaction of its own, committed as soon
+        as the savepoint is released. IMMEDIATE takes the write lock up front
+        (waiting busy_timeout for it), rather than upgrading a read snapshot
+        that another writer may have moved past.
+        """
+        if db.get_bind().dialect.name == "sqlite":
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "groupCommit": self.enabled,
+                "maxBatch": self.max_batch,
+                "maxDelayMs": round(self.max_delay * 1000, 1),
+                "batches": self.batches,
+                "results": self.results,
+                "failed": self.failed,
+                "avgBatchSize": round(self.results / self.batches, 2) if self.batches else 0.0,
+                "largestBatch": self.largest_batch,
+                "avgFlushMs": round(self.commit_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+                "pending": self._queue.qsize(),
+            }
@@ -0,0 +1,252 @@
+# backend/services/upload_storage.py
+# Upload ingestion (chunked copy with size cap, magic-byte check and hashing in one pass) and cache-friendly serving
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import UploadFile
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of the formats the engines can decode -> (extension, MIME type)
+SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+)
+
+
+# Stored uploads are named by analysis id and never rewritten, so caches may keep them for good
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Content digests of stored files, for ETags without reading the file (or the database) per request
+DIGEST_CACHE_SIZE = 4096
+
+
+class UploadTooLarge(Exception):
+    """The upload passed MAX_UPLOAD_SIZE while it was being copied"""
+
+
+class UnsupportedImage(Exception):
+    """The first bytes are not a JPEG, PNG or WebP signature"""
+
+
+class RangeNotSatisfiable(Exception):
+    """A Range header that selects no bytes of the file"""
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    filename: str
+    size: int
+    sha256: str
+    mime: str
+
+
+def sniff_image(head: bytes) -> Optional[tuple]:
+    """(extension, MIME type) from an upload's first bytes, or None if it isn't a supported image."""
+    for signature, extension, mime in SIGNATURES:
+        if head.startswith(signature):
+            return extension, mime
+    if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp", "image/webp"
+    return None
+
+
+def _write_chunk(f, hasher, chunk: bytes) -> None:
+    f.write(chunk)
+    hasher.update(chunk)
+
+
+async def store_upload(
+    upload: UploadFile,
+    directory: Path,
+    name: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> StoredUpload:
+    """
+    Copy an upload to directory/<name><ext> a chunk at a time, so a request
+    holds one chunk in memory however large the photo is. The extension comes
+    from the magic bytes of the first chunk, not the client's filename. File
+    writes and hashing run in a worker thread, off the event loop.
+
+    The multipart parser has already spooled the part (in memory up to 1MB,
+    then to a temporary file); this is the copy out of that spool. Raises
+    UnsupportedImage or UploadTooLarge, leaving nothing behind.
+    """
+    max_bytes = max_bytes if max_bytes is not None else settings.MAX_UPLOAD_SIZE
+    chunk_size = chunk_size if chunk_size is not None else settings.UPLOAD_CHUNK_SIZE
+
+    first = await upload.read(chunk_size)
+    detected = sniff_image(first)
+    if detected is None:
+        raise UnsupportedImage()
+    extension, mime = detected
+
+    filename = f"{name}{extension}"
+    path = directory / filename
+    partial = directory / f"{filename}.part"
+    hasher = hashlib.sha256()
+    size = 0
+    f = await asyncio.to_thread(open, partial, "wb")
+    chunk, first = first, None
+    try:
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge()
+            await asyncio.to_thread(_write_chunk, f, hasher, chunk)
+            chunk = await upload.read(chunk_size)
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, partial, path)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(partial.unlink, missing_ok=True)
+        raise
+
+    sha256 = hasher.hexdigest()
+    remember_digest(path, await asyncio.to_thread(path.stat), sha256)
+    return StoredUpload(path=path, filename=filename, size=size, sha256=sha256, mime=mime)
+
+
+# ---- serving ----
+
+@dataclass
+class UploadInfo:
+    path: Path
+    stat: os.stat_result
+    mime: str
+    etag: str
+    last_modified: str
+
+    @property
+    def size(self) -> int:
+        return self.stat.st_size
+
+
+_digests: "OrderedDict[tuple, str]" = OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def remember_digest(path: Path, stat: os.stat_result, sha256: str) -> None:
+    """Record a file's sha256 (computed at ingest); size and mtime are in the key, so a replaced file is rehashed."""
+    with _digests_lock:
+        _digests[(str(path), stat.st_size, stat.st_mtime_ns)] = sha256
+        while len(_digests) > DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+
+
+def file_digest(path: Path, stat: Optional[os.stat_result] = None) -> str:
+    """sha256 of a stored file: the one recorded at ingest, or read and hashed once (blocking)."""
+    stat = stat if stat is not None else path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        sha256 = _digests.get(key)
+        if sha256 is not None:
+            _digests.move_to_end(key)
+            return sha256
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    sha256 = hasher.hexdigest()
+    remember_digest(path, stat, sha256)
+    return sha256
+
+
+def describe_upload(path: Path, source: Optional[Path] = None) -> Optional[UploadInfo]:
+    """
+    Validators and MIME type of a stored upload, or None if there is no such
+    file (blocking). The type is sniffed from the first bytes, since uploads
+    stored before ingestion checked them kept the client's extension.
+
+    The strong ETag is the content hash. For a derived copy of source (a
+    resized preview), it is the source's hash plus the copy's suffix (e.g.
+    "-w640.webp").
+    """
+    try:
+        stat = path.stat()
+        if not path.is_file():
+            return None
+        with open(path, "rb") as f:
+            head = f.read(16)
+        if source is None:
+            sha256, variant = file_digest(path, stat), ""
+        else:
+            sha256, variant = file_digest(source), path.name[len(source.stem):]
+    except FileNotFoundError:
+        return None
+    detected = sniff_image(head)
+    mime = detected[1] if detected else (mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+    return UploadInfo(
+        path=path,
+        stat=stat,
+        mime=mime,
+        etag=f'"{sha256}{variant}"',
+        last_modified=formatdate(stat.st_mtime, usegmt=True),
+    )
+
+
+def not_modified(info: UploadInfo, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """Whether a conditional GET can be answered 304 (If-None-Match takes precedence, as in RFC 9110)."""
+    if if_none_match is not None:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        return "*" in tags or info.etag in tags or f"W/{info.etag}" in tags
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(info.stat.st_mtime) <= since.timestamp()
+    return False
+
+
+def byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single-range "bytes=" header, or None to send
+    the whole file (no header, another unit, several ranges or a malformed
+    one, all of which may be ignored). Raises RangeNotSatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+    if start < 0 or start > end or start >= size:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+async def iter_file_range(path: Path, start: int, end: int, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Bytes start..end (inclusive) of a file, read in a worker thread a chunk at a time."""
+    chunk_size = chunk_size if chunk_size is not None else settings.UPLOAD_CHUNK_SIZE
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
@@ -0,0 +1,241 @@
+# backend/services/yolo_pool.py
+# Process-pool YOLO execution: one preloaded model per worker process
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+from services.circuit_breaker import circuit_breakers
+from services.yolo_service import ImageSource, describe_source
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# COMPACT RESULTS (what crosses the process boundary)
+# ============================================================
+
+class CompactBox:
+    """One detection, shaped like an ultralytics box (conf[0], xyxy[0], cls[0])"""
+
+    __slots__ = ("conf", "xyxy", "cls")
+
+    def __init__(self, conf: np.ndarray, xyxy: np.ndarray, cls: np.ndarray):
+        self.conf = conf
+        self.xyxy = xyxy
+        self.cls = cls
+
+
+class CompactBoxes:
+    """Detection arrays with the parts of the ultralytics Boxes API the formatters use"""
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __iter__(self):
+        for i in range(len(self.conf)):
+            yield CompactBox(self.conf[i:i + 1], self.xyxy[i:i + 1], self.cls[i:i + 1])
+
+
+class CompactResult:
+    """Stand-in for an ultralytics Results object, built from plain arrays"""
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray, names: Optional[dict] = None):
+        self.boxes = CompactBoxes(xyxy, conf, cls)
+        self.names = names or {}
+
+
+# ============================================================
+# WORKER PROCESS SIDE
+# ============================================================
+
+_worker_analyzer = None
+
+
+def _init_worker():
+    """Load the model once when the worker process starts."""
+    global _worker_analyzer
+    logging.basicConfig(level=logging.INFO)
+    from services.yolo_service import create_local_analyzer
+    _worker_analyzer = create_local_analyzer()
+
+
+def _warm_up_worker():
+    _worker_analyzer.warm_up()
+
+
+def _attach(shm_name: str, shape: Tuple[int, ...], dtype: str) -> np.ndarray:
+    """Copy an image out of the parent's shared memory block."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf).copy()
+    finally:
+        shm.close()
+
+
+def _detect_in_worker(source, shm_spec):
+    """
+    Run one detection and return (xyxy, conf, cls, names) arrays, or None below
+    the confidence floor. Errors propagate so the parent can count them.
+    """
+    image = _attach(*shm_spec) if shm_spec else source
+    results = _worker_analyzer.infer(image)
+    if results is None:
+        return None
+
+    boxes = results.boxes
+    return (
+        np.asarray(_to_numpy(boxes.xyxy), dtype=np.float32).reshape(-1, 4),
+        np.asarray(_to_numpy(boxes.conf), dtype=np.float32).reshape(-1),
+        np.asarray(_to_numpy(boxes.cls), dtype=np.float32).reshape(-1),
+        dict(getattr(results, "names", {}) or {}),
+    )
+
+
+def _to_numpy(values):
+    """ultralytics returns torch tensors; take them to host memory without importing torch here"""
+    return values.cpu().numpy() if hasattr(values, "cpu") else values
+
+
+# ============================================================
+# API PROCESS SIDE
+# ============================================================
+
+class YoloProcessPool:
+    """
+    Runs YOLO in a pool of worker processes, each with its own preloaded model,
+    so inference doesn't compete with request handling for the GIL.
+
+    Decoded arrays are handed over through shared memory and file paths are
+    passed as-is; only the compact detection arrays come back. ``detect`` is a
+    blocking drop-in for LocalAnalyzer.detect.
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = max(1, workers)
+        self.breaker = circuit_breakers.get("LOCAL_YOLO")
+
+        self._pool_lock = threading.Lock()
+        self._pool = self._start_pool()
+
+        self._stats_lock = threading.Lock()
+        self._latency_ms = deque(maxlen=1000)
+        self._images = 0
+        self._errors = 0
+        self._restarts = 0
+        self._shared_bytes = 0
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that already holds threads (and possibly CUDA) is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        with self._pool_lock:
+            if self._pool is broken:
+                logger.error("YOLO worker process died, restarting the pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._start_pool()
+                with self._stats_lock:
+                    self._restarts += 1
+
+    def warm_up(self) -> None:
+        """Start every worker (each loads its model) and prime it with a dummy inference."""
+        futures = [self._pool.submit(_warm_up_worker) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, image_path: ImageSource) -> Future:
+        """Queue an image and return a Future resolving to a CompactResult (or None)."""
+        result_future: Future = Future()
+        started = time.perf_counter()
+
+        shm = None
+        shm_spec = None
+        source = image_path
+        if isinstance(image_path, np.ndarray):
+            image = np.ascontiguousarray(image_path)
+            shm = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+            np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)[...] = image
+            shm_spec = (shm.name, image.shape, image.dtype.str)
+            source = None
+            with self._stats_lock:
+                self._shared_bytes += image.nbytes
+
+        pool = self._pool
+        try:
+            worker_future = pool.submit(_detect_in_worker, source, shm_spec)
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+            pool = self._pool
+            worker_future = pool.submit(_detect_in_worker, source, shm_spec)
+
+        def done(f: Future):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            elapsed = time.perf_counter() - started
+            try:
+                compact = f.result()
+            except Exception as e:
+                logger.error(f"YOLO worker error on {describe_source(image_path)}: {str(e)}")
+                self.breaker.record_failure(elapsed, str(e)[:200])
+                with self._stats_lock:
+                    self._errors += 1
+                if isinstance(e, BrokenProcessPool):
+                    self._restart_pool(pool)
+                result_future.set_result(None)
+                return
+
+            self.breaker.record_success(elapsed)
+            with self._stats_lock:
+                self._images += 1
+                self._latency_ms.append(elapsed * 1000)
+            result_future.set_result(CompactResult(*compact) if compact is not None else None)
+
+        worker_future.add_done_callback(done)
+        return result_future
+
+    def detect(self, image_path: ImageSource, timeout: Optional[float] = None):
+        """Blocking drop-in replacement for LocalAnalyzer.detect."""
+        try:
+            return self.submit(image_path).result(timeout=timeout)
+        except Exception as e:
+            logger.error(f"YOLO pooled detection error: {str(e)}")
+            return None
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            latency = sorted(self._latency_ms)
+            images, errors = self._images, self._errors
+            restarts, shared_bytes = self._restarts, self._shared_bytes
+
+        def pct(values, p):
+            return round(values[min(len(values) - 1, int(len(values) * p))], 2) if values else 0.0
+
+        return {
+            "workers": self.workers,
+            "images": images,
+            "errors": errors,
+            "poolRestarts": restarts,
+            "sharedMemoryBytes": shared_bytes,
+            "latencyMs": {"p50": pct(latency, 0.5), "p95": pct(latency, 0.95)},
+        }
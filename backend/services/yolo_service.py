@@ -1,15 +1,43 @@
 # backend/services/yolo_service.py (UPDATED WITH ERROR HANDLING)
-from ultralytics import YOLO
 import os
 import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import List, Optional, Union
+
+import numpy as np
+
+from config import settings
+from services.circuit_breaker import circuit_breakers
+from services.lazy_engine import timed_import
 
 logger = logging.getLogger(__name__)
 
+# Minimum top-box confidence for a YOLO result to count as a detection
+MIN_DETECTION_CONFIDENCE = 0.4
+
+# An image path, or a preprocessed BGR array (see services.image_preprocessing)
+ImageSource = Union[str, np.ndarray]
+
+
+def describe_source(source: ImageSource) -> str:
+    if isinstance(source, np.ndarray):
+        return f"<array {source.shape[1]}x{source.shape[0]}>"
+    return str(source)
+
 class LocalAnalyzer:
     def __init__(self):
         """Initialize YOLO model with error handling for corrupted files"""
         model_path = os.path.join("models", "damage_model.pt")
         self.model = None
+        self.breaker = circuit_breakers.get("LOCAL_YOLO")
+        
+        # ultralytics pulls in torch; import it here so importing this module stays cheap
+        with timed_import("ultralytics"):
+            from ultralytics import YOLO
         
         # Try to load custom model
         if os.path.exists(model_path):
@@ -34,36 +62,209 @@ class LocalAnalyzer:
                 logger.error(f"Failed to load default YOLO model: {str(e)}")
                 raise RuntimeError("Could not initialize any YOLO model")
 
-    def detect(self, image_path: str):
+    def warm_up(self):
+        """Run one dummy inference so kernels are primed before the first real image."""
+        if self.model is None:
+            return
+        size = settings.YOLO_INPUT_SIZE
+        self.model(np.zeros((size, size, 3), dtype=np.uint8), verbose=False)
+
+    def infer(self, image_path: ImageSource):
+        """Detection without breaker accounting; errors propagate."""
+        results = self.model(image_path)[0]
+        return self._filter_result(results, describe_source(image_path))
+
+    def detect(self, image_path: ImageSource):
         """
         Run YOLO detection on an image.
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, or an already decoded BGR array
             
         Returns:
             YOLO results object if detections found, None if confidence too low
         """
+        started = time.perf_counter()
         try:
             if self.model is None:
                 logger.error("YOLO model not initialized")
                 return None
             
-            results = self.model(image_path)[0]
+            result = self.infer(image_path)
+            self.breaker.record_success(time.perf_counter() - started)
+            return result
             
-            # Check if any detections with sufficient confidence
-            if (
-                not hasattr(results, 'boxes') or 
-                results.boxes is None or 
-                len(results.boxes) == 0 or 
-                results.boxes.conf.max() < 0.4
-            ):
-                logger.warning(f"No detections or low confidence for {image_path}")
-                return None
+        except Exception as e:
+            logger.error(f"YOLO detection error: {str(e)}")
+            self.breaker.record_failure(time.perf_counter() - started, str(e)[:200])
+            return None
+
+    def detect_batch(self, image_paths: List[ImageSource]) -> List[Optional[object]]:
+        """
+        Run YOLO detection on several images in a single forward pass.
+        
+        Args:
+            image_paths: Paths to image files and/or decoded BGR arrays
+            
+        Returns:
+            One entry per input path, in order - a YOLO results object or None
+        """
+        if not image_paths:
+            return []
+        started = time.perf_counter()
+        try:
+            if self.model is None:
+                logger.error("YOLO model not initialized")
+                return [None] * len(image_paths)
             
-            logger.info(f"YOLO detection successful: {len(results.boxes)} objects")
-            return results
+            batch_results = self.model(list(image_paths))
+            elapsed = time.perf_counter() - started
+            for _ in image_paths:
+                self.breaker.record_success(elapsed)
+            return [
+                self._filter_result(results, describe_source(path))
+                for results, path in zip(batch_results, image_paths)
+            ]
             
         except Exception as e:
-            logger.error(f"YOLO detection error: {str(e)}")
-            return None
\ No newline at end of file
+            logger.error(f"YOLO batch detection error: {str(e)}")
+            for _ in image_paths:
+                self.breaker.record_failure(time.perf_counter() - started, str(e)[:200])
+            return [None] * len(image_paths)
+
+    def _filter_result(self, results, image_path: str):
+        """Return the results object if it holds a confident detection, else None"""
+        # Check if any detections with sufficient confidence
+        if (
+            not hasattr(results, 'boxes') or 
+            results.boxes is None or 
+            len(results.boxes) == 0 or 
+            results.boxes.conf.max() < MIN_DETECTION_CONFIDENCE
+        ):
+            logger.warning(f"No detections or low confidence for {image_path}")
+            return None
+        
+        logger.info(f"YOLO detection successful: {len(results.boxes)} objects")
+        return results
+
+
+def create_local_analyzer():
+    """The configured local engine: ultralytics/torch, or ONNX Runtime when YOLO_ENGINE=onnx"""
+    if settings.YOLO_ENGINE == "onnx":
+        from services.onnx_service import OnnxAnalyzer
+        return OnnxAnalyzer(quantize=settings.YOLO_ONNX_INT8, threads=settings.YOLO_ONNX_THREADS)
+    return LocalAnalyzer()
+
+
+# ============================================================
+# MICRO-BATCHING INFERENCE QUEUE
+# ============================================================
+
+class YoloBatchQueue:
+    """
+    Collects pending detection requests and runs them through the model together.
+
+    A batch is flushed when it reaches ``max_batch_size`` or when ``window_ms``
+    has passed since its first image arrived, whichever comes first. Callers use
+    the same ``detect(image_path)`` interface as LocalAnalyzer and get back only
+    their own result.
+    """
+
+    def __init__(self, analyzer: LocalAnalyzer, max_batch_size: int = 8, window_ms: int = 25):
+        self.analyzer = analyzer
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0, window_ms) / 1000.0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=1000)
+        self._wait_ms = deque(maxlen=1000)
+        self._inference_ms = deque(maxlen=1000)
+        self._batches = 0
+        self._images = 0
+
+        self._thread = threading.Thread(target=self._run, name="yolo-batcher", daemon=True)
+        self._thread.start()
+
+    def warm_up(self):
+        self.analyzer.warm_up()
+
+    def submit(self, image_path: ImageSource) -> Future:
+        """Queue an image and return a Future resolving to its YOLO result (or None)."""
+        future: Future = Future()
+        self._queue.put((image_path, future, time.perf_counter()))
+        return future
+
+    def detect(self, image_path: ImageSource, timeout: Optional[float] = None):
+        """Blocking drop-in replacement for LocalAnalyzer.detect."""
+        try:
+            return self.submit(image_path).result(timeout=timeout)
+        except Exception as e:
+            logger.error(f"YOLO batched detection error: {str(e)}")
+            return None
+
+    def _collect(self) -> list:
+        """Block for the first request, then gather more until the window closes or the batch is full."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            paths = [path for path, _, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = self.analyzer.detect_batch(paths)
+            except Exception as e:
+                logger.error(f"YOLO batch worker error: {str(e)}")
+                results = [None] * len(batch)
+            finished = time.perf_counter()
+
+            if len(results) != len(batch):
+                logger.error(f"YOLO batch returned {len(results)} results for {len(batch)} images")
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            # Never leave a caller waiting on an image the engine dropped
+            for _, future, _ in batch[len(results):]:
+                future.set_exception(RuntimeError("YOLO batch returned no result for this image"))
+
+            with self._stats_lock:
+                self._batches += 1
+                self._images += len(batch)
+                self._batch_sizes.append(len(batch))
+                self._inference_ms.append((finished - started) * 1000)
+                self._wait_ms.extend((started - enqueued) * 1000 for _, _, enqueued in batch)
+            logger.info(f"YOLO batch of {len(batch)} processed in {(finished - started) * 1000:.1f}ms")
+
+    def stats(self) -> dict:
+        """Batch-size and latency statistics over the most recent batches."""
+        with self._stats_lock:
+            sizes = list(self._batch_sizes)
+            waits = sorted(self._wait_ms)
+            inference = sorted(self._inference_ms)
+            batches, images = self._batches, self._images
+
+        def pct(values, p):
+            return round(values[min(len(values) - 1, int(len(values) * p))], 2) if values else 0.0
+
+        return {
+            "maxBatchSize": self.max_batch_size,
+            "windowMs": self.window * 1000,
+            "batches": batches,
+            "images": images,
+            "pending": self._queue.qsize(),
+            "avgBatchSize": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            "largestBatch": max(sizes) if sizes else 0,
+            "queueWaitMs": {"p50": pct(waits, 0.5), "p95": pct(waits, 0.95)},
+            "inferenceMs": {"p50": pct(inference, 0.5), "p95": pct(inference, 0.95)},
+            "perImageMs": round(sum(inference) / sum(sizes), 2) if sizes else 0.0,
+        }
@@ -0,0 +1,135 @@
+# backend/tests/conftest.py
+# Run the tests from anywhere: backend modules import each other as top-level packages (config, services, models)
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from models.database import AnalysisResultModel, ClaimModel, ClaimStatus, InsuranceDetailsModel  # noqa: E402
+
+DAMAGE_TYPES = ["scratch", "dent", "crack", "shatter", "deformation", "missing"]
+
+
+def make_damages(rng: random.Random, count: int) -> list:
+    return [
+        {
+            "id": f"dmg-{i}",
+            "partIdentified": rng.choice(["Front Bumper", "Hood", "Left Door", "Windshield"]),
+            "damageType": rng.choice(DAMAGE_TYPES),
+            "confidenceScore": round(rng.random(), 4),
+            # Whole-number coordinates and costs, as YOLO and the cloud often store them: the schema widens them
+            "boundingBox": {"x": rng.randint(0, 90), "y": rng.uniform(0, 90), "width": 10, "height": 7.5},
+            "estimatedCost": rng.choice([5000, 12500.5, 800]),
+            "severity": "moderate",  # stored, but not part of the response schema
+        }
+        for i in range(count)
+    ]
+
+
+def make_analysis(rng: random.Random, analysis_id: str, damage_count: int, **overrides) -> AnalysisResultModel:
+    values = dict(
+        id=analysis_id,
+        imageUrl=f"/api/v1/uploads/{analysis_id}.jpg",
+        vehicleMake="Maruti",
+        vehicleModel="Swift",
+        vehicleYear=2019,
+        vehiclePlateNumber="MH 01 AB 1234",
+        damages=make_damages(rng, damage_count),
+        overallSeverityLevel="moderate",
+        overallSeverityScore=55,
+        overallSeverityDescription="Moderate vehicle damage detected",
+        totalEstimatedCost=24000.0,
+        aiConfidence=0.87,
+        processedAt=datetime(2026, 1, 2, 3, 4, 5, 678900),
+        status="completed",
+    )
+    values.update(overrides)
+    return AnalysisResultModel(**values)
+
+
+def populate(Session, damages: int, claims: int) -> list:
+    """Fixtures; returns the analysis ids to compare (the fast path refuses some of them on purpose)."""
+    rng = random.Random(0)
+    ids = ["big", "plain", "coerced-confidence", "no-processed", "processing", "legacy-ids"]
+    with Session() as db:
+        db.add(make_analysis(rng, "big", damages))
+        db.add(InsuranceDetailsModel(
+            id="ins-big", analysisId="big", ownerName="A Kumar", city="Noida", fuelType="Petrol",
+            vehiclePriceLakhs=8, purchaseDate=datetime(2019, 5, 1), vehicleCondition=0.9,
+            hasZeroDepreciation=True, hasReturnToInvoice=False, estimatedRepairBill=42000,
+            calculatedIDV=5.6, estimatedResale=4.9, insurerPayout=30000, ownerLiability=12000, vehicleAgeYears=6.7,
+        ))
+        db.add(make_analysis(rng, "plain", 3, vehicleMake=None, vehicleYear=None))
+        coerced = make_damages(rng, 2)
+        coerced[0]["confidenceScore"] = "0.9"  # Pydantic converts the string; the fast path hands it over
+        db.add(make_analysis(rng, "coerced-confidence", 0, damages=coerced))
+        db.add(make_analysis(rng, "no-processed", 1, processedAt=None))
+        db.add(make_analysis(rng, "processing", 0, status="processing", damages=[]))
+        legacy = make_damages(rng, 2)
+        for damage in legacy:
+            del damage["id"]  # stored before damages got ids, and not migrated
+        db.add(make_analysis(rng, "legacy-ids", 0, damages=legacy))
+
+        submitted = datetime(2026, 1, 1)
+        for i in range(claims):
+            analysis_id = f"claim-{i:04d}"
+            db.add(make_analysis(rng, analysis_id, 5))
+            db.add(ClaimModel(
+                id=analysis_id,
+                claimNumber=f"CLM-{i:06d}",
+                vehiclePlate="MH 01 AB 1234",
+                vehicleInfoJson={"make": "Maruti", "model": "Swift", "year": 2019, "plateNumber": "MH 01 AB 1234",
+                                 "vin": None, "extra": "dropped"} if i % 7 else {},
+                submittedAt=submitted + timedelta(minutes=i),
+                processedAt=submitted + timedelta(minutes=i, seconds=30) if i % 3 else None,
+                aiConfidence=0.9 if i % 2 else 1,
+                status=list(ClaimStatus)[i % len(ClaimStatus)],
+                totalPayout=15000 if i % 2 else 15000.25,
+                adjusterNotes="ok" if i % 4 == 0 else None,
+            ))
+        db.commit()
+    return ids
+
+
+@pytest.fixture(scope="module")
+def fast_json_app(tmp_path_factory):
+    """TestClient on a throwaway SQLite file holding the populate() rows; yields (client, analysis ids)"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from sqlalchemy.orm import sessionmaker
+
+    from config import settings
+    from main import app
+    from models.database import Base, create_async_db_engine, get_db, get_sync_db
+
+    url = f"sqlite:///{tmp_path_factory.mktemp('fast_json') / 'test.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    ids = populate(Session, damages=200, claims=30)
+
+    AsyncSession = async_sessionmaker(create_async_db_engine(url, echo=False), expire_on_commit=False)
+
+    async def override_get_db():
+        async with AsyncSession() as db:
+            yield db
+
+    def override_get_sync_db():
+        with Session() as db:
+            yield db
+
+    fast_setting = settings.FAST_JSON_RESPONSES
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_sync_db] = override_get_sync_db
+    # No context manager: the app's lifespan (engines, worker) isn't started
+    yield TestClient(app), ids
+    app.dependency_overrides.clear()
+    settings.FAST_JSON_RESPONSES = fast_setting
+    engine.dispose()
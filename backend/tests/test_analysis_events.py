@@ -0,0 +1,98 @@
+# backend/tests/test_analysis_events.py
+# Analysis event bus: events published on worker threads reach subscribers on their own event loop
+import asyncio
+import threading
+
+from services.analysis_events import AnalysisEventBus, stage_progress
+
+
+def publish_from_thread(bus: AnalysisEventBus, analysis_id: str, stages) -> None:
+    def run():
+        for stage, details in stages:
+            bus.publish(analysis_id, stage, **details)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+
+def test_events_from_a_worker_thread_reach_the_subscribers_loop():
+    bus = AnalysisEventBus(history=10)
+    stages = [("started", {}), ("cloud_attempt", {"attempt": 2, "backend": "KEY_2"}), ("saving", {}), ("completed", {})]
+
+    async def watch():
+        with bus.subscribe("a1") as subscription, bus.subscribe("other") as unrelated:
+            await asyncio.to_thread(publish_from_thread, bus, "a1", stages)
+            received = [await subscription.next(timeout=1) for _ in stages]
+            assert await subscription.next(timeout=0.05) is None
+            assert await unrelated.next(timeout=0.05) is None
+            return received
+
+    received = asyncio.run(watch())
+    assert [event["stage"] for event in received] == ["started", "cloud_attempt", "saving", "completed"]
+    assert [event["progress"] for event in received] == [10, 30, 85, 100]
+    assert [event["status"] for event in received] == ["processing"] * 3 + ["completed"]
+    assert received[1]["backend"] == "KEY_2"
+    assert bus.stats() == {
+        "published": 4, "delivered": 4, "subscribers": 0, "watchedAnalyses": 0, "trackedAnalyses": 1,
+    }
+
+
+def test_every_subscriber_gets_each_event():
+    bus = AnalysisEventBus(history=10)
+
+    async def watch():
+        first, second = bus.subscribe("a1"), bus.subscribe("a1")
+        await asyncio.to_thread(publish_from_thread, bus, "a1", [("saving", {})])
+        events = [await first.next(timeout=1), await second.next(timeout=1)]
+        first.close()
+        await asyncio.to_thread(publish_from_thread, bus, "a1", [("completed", {})])
+        events.append(await second.next(timeout=1))
+        assert await first.next(timeout=0.05) is None
+        second.close()
+        return events
+
+    assert [event["stage"] for event in asyncio.run(watch())] == ["saving", "saving", "completed"]
+    assert bus.stats()["delivered"] == 3
+
+
+def test_subscriber_on_a_closed_loop_is_skipped():
+    bus = AnalysisEventBus(history=10)
+
+    async def subscribe():
+        return bus.subscribe("a1")
+
+    stale = asyncio.run(subscribe())  # its loop is closed once run() returns
+    bus.publish("a1", "completed")
+    assert bus.stats()["delivered"] == 0
+    stale.close()
+
+
+def test_history_keeps_the_latest_event_of_recent_analyses():
+    bus = AnalysisEventBus(history=2)
+    bus.publish("a1", "started")
+    bus.publish("a2", "started")
+    bus.publish("a1", "saving")  # a1 becomes the most recent
+    bus.publish("a3", "started")  # evicts a2, the least recently updated
+
+    assert bus.latest("a1")["stage"] == "saving"
+    assert bus.latest("a2") is None
+    assert bus.latest("a3")["stage"] == "started"
+    assert bus.stats()["trackedAnalyses"] == 2
+
+
+def test_current_prefers_the_latest_event_while_it_agrees_with_the_database():
+    bus = AnalysisEventBus(history=10)
+    bus.publish("a1", "local_fallback")
+
+    assert bus.current("a1", "processing")["stage"] == "local_fallback"
+    # The stored status moved on (e.g. a standalone worker finished it): trust the database
+    finished = bus.current("a1", "completed")
+    assert (finished["stage"], finished["status"], finished["progress"]) == ("completed", "completed", 100)
+    # Never published here at all
+    unknown = bus.current("a9", "processing")
+    assert (unknown["stage"], unknown["progress"]) == ("processing", stage_progress("processing"))
+
+
+def test_cloud_attempt_progress_is_capped():
+    assert [stage_progress("cloud_attempt", attempt) for attempt in (1, 2, 3, 4, 9)] == [20, 30, 40, 50, 50]
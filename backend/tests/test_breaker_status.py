@@ -0,0 +1,20 @@
+# backend/tests/test_breaker_status.py
+# Monitoring endpoints report on the engines without building them
+from fastapi.testclient import TestClient
+
+from main import app, circuit_breakers, cloud_engine
+
+
+def test_breakers_do_not_build_the_cloud_engine():
+    assert cloud_engine.peek() is None
+    circuit_breakers.get("KEY_1").record_failure(0.2, "quota")
+
+    # No context manager: the app's lifespan (engines, worker) isn't started
+    response = TestClient(app).get("/api/v1/system/breakers")
+
+    assert response.status_code == 200
+    backends = response.json()["backends"]
+    assert list(backends)[-1] == "LOCAL_YOLO"
+    assert backends["KEY_1"]["calls"] == 1
+    assert backends["KEY_1"]["cancelledCalls"] == 0
+    assert cloud_engine.peek() is None
@@ -0,0 +1,160 @@
+# backend/tests/test_cloud_hedging.py
+# Hedged cloud racing with stub backends: who wins, what the losers cost, and what the breakers see
+import asyncio
+import time
+
+import pytest
+
+from services.circuit_breaker import OPEN, BreakerRegistry
+from services.fallback_service import CloudAnalyzer, LatencyTracker
+from services.image_preprocessing import ImagePayload
+
+STUB_IMAGE = ImagePayload(b"", "image/jpeg")
+
+
+class StubBackend:
+    """Answers after ``delay`` seconds with a result naming itself, or raises / returns None."""
+
+    def __init__(self, label: str, delay: float = 0.0, error: str = None, result: bool = True):
+        self.label = label
+        self.delay = delay
+        self.error = error
+        self.result = result
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self, image, prompt):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise RuntimeError(self.error)
+        return {"damages": [], "confidence": 0.9, "backend": self.label} if self.result else None
+
+
+@pytest.fixture
+def make_analyzer():
+    analyzers = []
+
+    def make(*stubs, hedge_delay: float = 0.05):
+        analyzer = CloudAnalyzer(backends=[(stub.label, stub) for stub in stubs], hedging=True, breakers=BreakerRegistry())
+        analyzer.hedge_default_delay = hedge_delay
+        analyzer.hedge_min_samples = 1000  # keep the default delay: no p95 to learn from in a test
+        analyzers.append(analyzer)
+        return analyzer
+
+    yield make
+    for analyzer in analyzers:
+        analyzer.close()
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    """Losers are cancelled as the race returns; their bookkeeping lands a loop turn later."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_fast_hedge_wins_and_the_slow_call_is_cancelled(make_analyzer):
+    slow, fast = StubBackend("KEY_1", delay=5.0), StubBackend("KEY_2", delay=0.01)
+    analyzer = make_analyzer(slow, fast)
+    attempts = []
+
+    started = time.perf_counter()
+    result = analyzer.get_analysis("stub.jpg", image=STUB_IMAGE, on_attempt=lambda label, n: attempts.append((label, n)))
+    elapsed = time.perf_counter() - started
+
+    assert result["backend"] == "KEY_2"
+    assert elapsed < 1.0  # didn't wait out the slow backend
+    assert attempts == [("KEY_1", 1), ("KEY_2", 2)]
+    assert wait_until(lambda: analyzer.cancelled_calls("KEY_1") == 1)
+    assert (slow.cancelled, fast.cancelled) == (1, 0)
+
+    stats = analyzer.hedge_stats()
+    assert (stats["analyses"], stats["hedgesFired"], stats["cancelledCalls"], stats["wins"]) == (1, 1, 1, {"KEY_2": 1})
+    # The loser's latency is kept as a censored lower bound (at least the hedge delay), not dropped
+    assert stats["backends"]["KEY_1"]["samples"] == 1
+    assert stats["backends"]["KEY_1"]["censoredSamples"] == 1
+    assert stats["backends"]["KEY_1"]["p95Ms"] >= 50
+    assert stats["backends"]["KEY_2"]["censoredSamples"] == 0
+
+    # Being cancelled isn't a failure of the backend
+    breakers = analyzer.breakers.snapshot()
+    assert breakers["KEY_1"]["calls"] == 0
+    assert (breakers["KEY_2"]["calls"], breakers["KEY_2"]["errorRate"]) == (1, 0)
+
+
+def test_fast_first_backend_wins_without_hedging(make_analyzer):
+    first, second = StubBackend("KEY_1", delay=0.01), StubBackend("KEY_2")
+    analyzer = make_analyzer(first, second, hedge_delay=1.0)
+
+    assert analyzer.get_analysis("stub.jpg", image=STUB_IMAGE)["backend"] == "KEY_1"
+    assert second.calls == 0
+    stats = analyzer.hedge_stats()
+    assert (stats["hedgesFired"], stats["cancelledCalls"], stats["wins"]) == (0, 0, {"KEY_1": 1})
+
+
+def test_raising_backend_falls_through_to_the_next(make_analyzer):
+    broken, working = StubBackend("KEY_1", error="quota exceeded"), StubBackend("GROQ", delay=0.01)
+    analyzer = make_analyzer(broken, working, hedge_delay=1.0)
+
+    result = analyzer.get_analysis("stub.jpg", image=STUB_IMAGE)
+
+    assert result["backend"] == "GROQ"
+    stats = analyzer.hedge_stats()
+    # Started on the failure, not on the hedge delay, so not a hedge
+    assert (stats["hedgesFired"], stats["cancelledCalls"], stats["wins"]) == (0, 0, {"GROQ": 1})
+    breakers = analyzer.breakers.snapshot()
+    assert (breakers["KEY_1"]["calls"], breakers["KEY_1"]["errorRate"]) == (1, 1.0)
+    assert breakers["KEY_1"]["lastError"] == "quota exceeded"
+    assert (breakers["GROQ"]["calls"], breakers["GROQ"]["errorRate"]) == (1, 0)
+
+
+def test_every_backend_failing_returns_the_mock_and_opens_the_breakers(make_analyzer):
+    broken, empty = StubBackend("KEY_1", error="quota exceeded"), StubBackend("KEY_2", result=False)
+    analyzer = make_analyzer(broken, empty)
+
+    result = analyzer.get_analysis("stub.jpg", image=STUB_IMAGE)
+
+    assert "backend" not in result
+    assert result["damages"][0]["description"].startswith("Mock result")
+    stats = analyzer.hedge_stats()
+    assert (stats["analyses"], stats["allFailed"], stats["wins"], stats["cancelledCalls"]) == (1, 1, {}, 0)
+    breakers = analyzer.breakers.snapshot()
+    assert breakers["KEY_2"]["lastError"] == "no usable result"
+
+    # Enough failures open both circuits (min 5 calls at >= 50% errors); then nothing is called at all
+    for _ in range(4):
+        analyzer.get_analysis("stub.jpg", image=STUB_IMAGE)
+    breakers = analyzer.breakers.snapshot()
+    assert [breakers[label]["state"] for label in ("KEY_1", "KEY_2")] == [OPEN, OPEN]
+    assert (broken.calls, empty.calls) == (5, 5)
+
+    analyzer.get_analysis("stub.jpg", image=STUB_IMAGE)
+    assert (broken.calls, empty.calls) == (5, 5)
+    breakers = analyzer.breakers.snapshot()
+    assert (breakers["KEY_1"]["rejectedCalls"], breakers["KEY_2"]["rejectedCalls"]) == (1, 1)
+    assert analyzer.hedge_stats()["allFailed"] == 6
+
+
+def test_censored_samples_leave_the_at_risk_set():
+    tracker = LatencyTracker()
+    for seconds in (0.1, 0.2):
+        tracker.record(seconds)
+    for _ in range(8):
+        tracker.record(0.05, censored=True)  # cancelled early: only known to take more than 50 ms
+
+    assert tracker.censored() == 8
+    # Counted as completed 50 ms calls, the losers would put the p50 at 0.05
+    assert tracker.percentile(0.5) == 0.2
+    assert tracker.percentile(0.95) == 0.2
+
+    plain = LatencyTracker()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        plain.record(seconds)
+    assert plain.percentile(0.5) == 0.3
+    assert plain.percentile(0.95) == 0.4
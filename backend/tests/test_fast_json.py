@@ -0,0 +1,50 @@
+# backend/tests/test_fast_json.py
+# Responses built by services.fast_json must be byte-for-byte what the Pydantic models produce
+import json
+
+import orjson
+import pytest
+
+from config import settings
+
+CLAIMS = 30  # the fast_json_app fixture's page of claims
+
+
+def fetch(client, url: str, fast: bool) -> bytes:
+    settings.FAST_JSON_RESPONSES = fast
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code, response.text[:200])
+    return response.content
+
+
+def canonical(body: bytes) -> bytes:
+    # Parse and re-encode with one encoder: key order, int vs float and values survive, number spelling doesn't
+    return orjson.dumps(json.loads(body))
+
+
+def golden_paths(ids) -> list:
+    paths = [f"/api/v1/analysis/{analysis_id}" for analysis_id in ids]
+    paths += [f"/api/v1/analysis/{analysis_id}/with-insurance" for analysis_id in ids]
+    paths += [f"/api/v1/claims/claim-{i:04d}" for i in range(10)]
+    paths += [f"/api/v1/claims?limit={CLAIMS}", "/api/v1/claims?limit=20&view=summary",
+              "/api/v1/claims?limit=10&page=2&status=approved", "/api/v1/claims?limit=10&fields=id,status"]
+    return paths
+
+
+def test_fast_path_matches_pydantic(fast_json_app):
+    """Same keys in the same order, same types (5000.0 stays a float) and same values, including
+    for the rows the fast path refuses and hands to the models."""
+    client, ids = fast_json_app
+    for path in golden_paths(ids):
+        fast, slow = fetch(client, path, True), fetch(client, path, False)
+        assert canonical(fast) == canonical(slow), f"{path} differs:\n{fast[:300]}\n{slow[:300]}"
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_damage_ids_are_stable(fast_json_app, fast):
+    client, _ = fast_json_app
+    for analysis_id in ("big", "legacy-ids"):
+        first = json.loads(fetch(client, f"/api/v1/analysis/{analysis_id}", fast))["damages"]
+        second = json.loads(fetch(client, f"/api/v1/analysis/{analysis_id}", fast))["damages"]
+        assert first and [d["id"] for d in first] == [d["id"] for d in second]
+        assert len({d["id"] for d in first}) == len(first)
@@ -0,0 +1,186 @@
+# backend/tests/test_job_queue.py
+# Durable job queue: leases, retries with backoff, dead-lettering, and what an idle worker costs
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models.database import AnalysisJobModel, AnalysisResultModel, create_db_engine, init_db
+from services.job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobWorker
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def make_queue(Session, **options) -> JobQueue:
+    options = {"visibility_timeout": 60, "max_attempts": 3, "backoff_seconds": 0, "backoff_max_seconds": 0, **options}
+    return JobQueue(session_factory=Session, **options)
+
+
+def enqueue(Session, queue: JobQueue, analysis_id: str = "a1") -> str:
+    with Session() as db:
+        db.add(AnalysisResultModel(id=analysis_id, status="processing"))
+        job = queue.enqueue(db, analysis_id, {"imagePath": f"uploads/{analysis_id}.jpg"})
+        db.commit()
+        return job.id
+
+
+def job_row(Session, job_id: str) -> AnalysisJobModel:
+    with Session() as db:
+        return db.get(AnalysisJobModel, job_id)
+
+
+def analysis_status(Session, analysis_id: str = "a1") -> str:
+    with Session() as db:
+        return db.get(AnalysisResultModel, analysis_id).status
+
+
+def test_claim_leases_a_job_to_one_worker(Session):
+    queue = make_queue(Session)
+    job_id = enqueue(Session, queue)
+
+    job = queue.claim("w1")
+    assert job["id"] == job_id and job["attempt"] == 1 and job["payload"] == {"imagePath": "uploads/a1.jpg"}
+    assert queue.claim("w2") is None  # leased
+
+    assert queue.complete(job_id, "w1")
+    assert job_row(Session, job_id).status == SUCCEEDED
+    assert queue.claim("w2") is None
+
+
+def test_expired_lease_is_reclaimed(Session):
+    queue = make_queue(Session, visibility_timeout=0.05)
+    job_id = enqueue(Session, queue)
+    assert queue.claim("dead-worker")["attempt"] == 1
+
+    time.sleep(0.1)
+    job = queue.claim("w2")
+    assert job["id"] == job_id and job["attempt"] == 2
+    # The first worker's late result doesn't count; the lease holder's does
+    assert not queue.complete(job_id, "dead-worker")
+    assert queue.complete(job_id, "w2")
+
+
+def test_failed_job_is_retried_after_backoff(Session):
+    queue = make_queue(Session, backoff_seconds=60, backoff_max_seconds=60)
+    job_id = enqueue(Session, queue)
+    queue.claim("w1")
+
+    queue.fail(job_id, "w1", "cloud timeout")
+    row = job_row(Session, job_id)
+    assert row.status == QUEUED and row.lastError == "cloud timeout" and row.leasedBy is None
+    assert queue.claim("w1") is None  # not due yet
+    assert queue.retried == 1
+
+    with Session() as db:
+        db.get(AnalysisJobModel, job_id).availableAt = row.updatedAt
+        db.commit()
+    assert queue.claim("w1")["attempt"] == 2
+
+
+def test_backoff_grows_and_is_capped(Session):
+    queue = make_queue(Session, backoff_seconds=2, backoff_max_seconds=10)
+    for attempts, ceiling in ((1, 2), (2, 4), (3, 8), (4, 10), (9, 10)):
+        delay = queue.backoff_delay(attempts)
+        assert ceiling / 2 <= delay <= ceiling
+
+
+def test_last_failed_attempt_dead_letters_the_job(Session):
+    queue = make_queue(Session, max_attempts=2)
+    job_id = enqueue(Session, queue)
+    for attempt in (1, 2):
+        assert queue.claim("w1")["attempt"] == attempt
+        queue.fail(job_id, "w1", "model crashed")
+
+    assert job_row(Session, job_id).status == FAILED
+    assert analysis_status(Session) == "failed"
+    assert queue.claim("w1") is None
+    assert (queue.retried, queue.dead_lettered) == (1, 1)
+
+
+def test_lease_expired_on_last_attempt_is_dead_lettered_by_the_sweep(Session):
+    queue = make_queue(Session, visibility_timeout=0.05, max_attempts=1)
+    job_id = enqueue(Session, queue)
+    queue.claim("dead-worker")
+
+    assert queue.dead_letter_expired() == 0  # lease still valid
+    time.sleep(0.1)
+    assert queue.claim("w2") is None  # no attempts left, so not reclaimable
+    assert job_row(Session, job_id).status == RUNNING
+
+    assert queue.dead_letter_expired() == 1
+    row = job_row(Session, job_id)
+    assert row.status == FAILED and row.lastError == "Lease expired on final attempt"
+    assert analysis_status(Session) == "failed"
+    assert queue.dead_letter_expired() == 0
+
+
+class CountingQueue(JobQueue):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.claims = 0
+        self.sweeps = 0
+
+    def claim(self, worker_id):
+        self.claims += 1
+        return super().claim(worker_id)
+
+    def dead_letter_expired(self):
+        self.sweeps += 1
+        return super().dead_letter_expired()
+
+
+async def run_worker(worker: JobWorker, until, timeout: float = 5.0):
+    task = asyncio.create_task(worker.run())
+    try:
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+    finally:
+        worker.stop()
+        await asyncio.wait_for(task, 5)
+
+
+def test_idle_worker_polls_from_one_slot(Session):
+    queue = CountingQueue(session_factory=Session)
+    worker = JobWorker(queue, handler=None, concurrency=8, poll_interval=0.1)
+
+    started = time.monotonic()
+    asyncio.run(run_worker(worker, until=lambda: time.monotonic() - started > 0.5))
+
+    # ~6 poll intervals: one claim and one sweep each, not one per slot
+    assert 5 <= queue.sweeps <= 8
+    assert queue.claims <= 8 + 8  # each slot's first claim, then a single poller
+
+
+def test_worker_runs_notified_jobs_and_retries_failures(Session):
+    queue = CountingQueue(session_factory=Session, max_attempts=2, backoff_seconds=0, backoff_max_seconds=0)
+    attempts = []
+
+    async def handler(job):
+        attempts.append((job["analysisId"], job["attempt"]))
+        if job["analysisId"] == "flaky" and job["attempt"] == 1:
+            raise RuntimeError("first attempt fails")
+
+    # A long poll interval: only notify() and the hand-off between slots can get the jobs run promptly
+    worker = JobWorker(queue, handler, concurrency=4, poll_interval=30)
+
+    async def scenario():
+        async def enqueue_later():
+            await asyncio.sleep(0.1)
+            for analysis_id in ("a1", "a2", "flaky"):
+                enqueue(Session, queue, analysis_id)
+            worker.notify()
+
+        asyncio.create_task(enqueue_later())
+        await run_worker(worker, until=lambda: queue.succeeded == 3, timeout=3)
+
+    asyncio.run(scenario())
+    assert queue.succeeded == 3 and queue.retried == 1
+    assert sorted(attempts) == [("a1", 1), ("a2", 1), ("flaky", 1), ("flaky", 2)]
@@ -0,0 +1,57 @@
+# backend/tests/test_migrations.py
+# The alembic revisions must build the models' schema and carry existing data forward
+import json
+
+from alembic import command
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from models.database import alembic_config, create_db_engine, derived_damage_id, init_db
+from services.claim_search import ClaimSearchIndex
+
+
+def upgrade_to(engine, revision: str) -> None:
+    alembic_cfg = alembic_config()
+    with engine.begin() as connection:
+        alembic_cfg.attributes["connection"] = connection
+        command.upgrade(alembic_cfg, revision)
+
+
+def test_damage_ids_backfilled_as_reads_derived_them(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    upgrade_to(engine, "0007")
+    damages = [{"partIdentified": "Hood"}, {"id": "kept", "partIdentified": "Door"}, {"partIdentified": "Roof"}]
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO analysis_results (id, imageUrl, damages, overallSeverityLevel, overallSeverityScore,"
+            " overallSeverityDescription, totalEstimatedCost, aiConfidence, status)"
+            " VALUES ('legacy', '', :damages, 'minor', 0, '', 0, 0, 'completed')"
+        ), {"damages": json.dumps(damages)})
+
+    init_db(engine)
+
+    with engine.connect() as connection:
+        stored = json.loads(connection.scalar(text("SELECT damages FROM analysis_results WHERE id = 'legacy'")))
+    # The ids clients were shown before the migration, not new ones
+    assert [damage["id"] for damage in stored] == [
+        derived_damage_id("legacy", 0), "kept", derived_damage_id("legacy", 2),
+    ]
+    engine.dispose()
+
+
+def test_schema_matches_models_after_startup(tmp_path):
+    """The revisions build what the models describe; the search index's FTS5 tables don't count as drift"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    init_db(engine)
+    search = ClaimSearchIndex()
+    with sessionmaker(bind=engine)() as db:
+        search.ensure(db)
+    assert search.available
+
+    alembic_cfg = alembic_config()
+    with engine.connect() as connection:
+        alembic_cfg.attributes["connection"] = connection
+        command.check(alembic_cfg)  # raises AutoGenerateDiffsDetected on drift
+        tables = set(inspect(connection).get_table_names())
+    assert {"claim_search", "claim_search_vocab"} <= tables
+    engine.dispose()
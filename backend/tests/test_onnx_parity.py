@@ -0,0 +1,140 @@
+# backend/tests/test_onnx_parity.py
+# The ONNX Runtime engine must report the same detections as ultralytics for the same model
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from config import settings
+from services.onnx_service import CONF_THRESHOLD, OnnxAnalyzer, letterbox
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PHOTO = os.path.join(BACKEND_DIR, "..", "frontend", "src", "assets", "demo-car-damage.jpg")
+
+
+def iou(a, b) -> float:
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def unmatched(reference, candidate, min_conf: float, min_iou: float, max_conf_diff: float) -> list:
+    """Reference boxes (conf >= min_conf) without a same-class candidate box at min_iou and a close confidence"""
+    missing = []
+    for box, conf, cls in zip(*reference):
+        if conf < min_conf:
+            continue
+        if not any(
+            cand_cls == cls and iou(box, cand_box) >= min_iou and abs(cand_conf - conf) <= max_conf_diff
+            for cand_box, cand_conf, cand_cls in zip(*candidate)
+        ):
+            missing.append((box.tolist(), float(conf), int(cls)))
+    return missing
+
+
+def as_arrays(boxes) -> tuple:
+    convert = lambda values: values.cpu().numpy() if hasattr(values, "cpu") else np.asarray(values)
+    return convert(boxes.xyxy), convert(boxes.conf), convert(boxes.cls)
+
+
+# ---- post-processing (no model needed) ----
+
+def bare_analyzer(imgsz: int = 640) -> OnnxAnalyzer:
+    analyzer = OnnxAnalyzer.__new__(OnnxAnalyzer)  # no session: only the pure pre/post-processing is used
+    analyzer.imgsz = imgsz
+    analyzer.names = {0: "dent", 1: "scratch"}
+    return analyzer
+
+
+def raw_output(predictions) -> np.ndarray:
+    """(4 + classes, anchors) like the exported graph, from (cx, cy, w, h, score class 0, score class 1) rows"""
+    return np.asarray(predictions, dtype=np.float32).T
+
+
+def test_postprocess_class_aware_nms_and_confidence_threshold():
+    output = raw_output([
+        (100, 100, 40, 40, 0.90, 0.0),  # kept
+        (102, 101, 40, 40, 0.80, 0.0),  # same class, IoU ~0.9 with the first: suppressed
+        (101, 100, 40, 40, 0.0, 0.85),  # same place, other class: kept (NMS is per class)
+        (400, 300, 60, 20, 0.50, 0.0),  # elsewhere: kept
+        (500, 500, 30, 30, 0.20, 0.10),  # below CONF_THRESHOLD: dropped
+    ])
+    result = bare_analyzer()._postprocess(output, 1.0, (0, 0), (640, 640))
+
+    assert result.boxes.conf.tolist() == pytest.approx([0.90, 0.85, 0.50])
+    assert result.boxes.cls.tolist() == [0.0, 1.0, 0.0]
+    assert result.boxes.xyxy[0].tolist() == pytest.approx([80, 80, 120, 120])
+    assert result.boxes.xyxy[2].tolist() == pytest.approx([370, 290, 430, 310])
+
+
+def test_postprocess_undoes_the_letterbox():
+    image = np.zeros((480, 1280, 3), dtype=np.uint8)
+    padded, ratio, pad = letterbox(image, 640)
+    assert padded.shape == (640, 640, 3)
+    assert ratio == 0.5 and pad == (0, 200)
+
+    # A box at (100..300, 250..350) in the padded input is (200..600, 100..300) in the photo; one overhangs the edge
+    output = raw_output([(200, 300, 200, 100, 0.9, 0.0), (630, 440, 40, 40, 0.8, 0.0)])
+    result = bare_analyzer()._postprocess(output, ratio, pad, image.shape[:2])
+
+    assert result.boxes.xyxy[0].tolist() == pytest.approx([200, 100, 600, 300])
+    assert result.boxes.xyxy[1].tolist() == pytest.approx([1220, 440, 1280, 480])
+
+
+def test_postprocess_without_detections():
+    result = bare_analyzer()._postprocess(raw_output([(100, 100, 40, 40, 0.1, 0.1)]), 1.0, (0, 0), (640, 640))
+    assert len(result.boxes) == 0 and result.boxes.xyxy.shape == (0, 4)
+
+
+# ---- parity with ultralytics (needs the model) ----
+
+@pytest.fixture(scope="module")
+def engines():
+    pytest.importorskip("ultralytics")
+    pytest.importorskip("onnxruntime")
+    weights = [os.path.join("models", "damage_model.pt"), "yolov8n.pt"]
+    if not any(os.path.exists(os.path.join(BACKEND_DIR, path)) for path in weights):
+        pytest.skip("no YOLO weights in backend/ (models/damage_model.pt or yolov8n.pt)")
+
+    # Both engines resolve the weights relative to the backend directory
+    previous = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        from ultralytics import YOLO
+        onnx = OnnxAnalyzer()
+        torch_weights = next(path for path in weights if os.path.exists(path))
+        yield YOLO(torch_weights), onnx
+    finally:
+        os.chdir(previous)
+
+
+def sample_images() -> list:
+    photo = cv2.imread(SAMPLE_PHOTO)
+    if photo is None:
+        pytest.skip(f"sample photo missing: {SAMPLE_PHOTO}")
+    height, width = photo.shape[:2]
+    return [
+        photo,
+        cv2.flip(photo, 1),
+        cv2.resize(photo, (width * 3 // 4, height)),  # a different aspect ratio, so other letterbox padding
+    ]
+
+
+def test_onnx_matches_ultralytics(engines):
+    torch_model, onnx = engines
+    compared = 0
+    for image in sample_images():
+        reference = as_arrays(torch_model(image, imgsz=settings.YOLO_INPUT_SIZE, verbose=False)[0].boxes)
+        blob, ratio, pad = onnx._preprocess(image)
+        output = onnx.session.run(None, {onnx.input_name: blob})[0]
+        candidate = as_arrays(onnx._postprocess(output[0], ratio, pad, image.shape[:2]).boxes)
+
+        # Boxes right at the confidence threshold may legitimately fall on either side of it
+        margin = dict(min_conf=CONF_THRESHOLD + 0.05, min_iou=0.9, max_conf_diff=0.02)
+        assert unmatched(reference, candidate, **margin) == [], "ultralytics boxes missing from ONNX"
+        assert unmatched(candidate, reference, **margin) == [], "ONNX boxes missing from ultralytics"
+        compared += len(reference[1])
+    assert compared > 0, "the sample photos produced no detections to compare"
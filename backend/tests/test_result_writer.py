@@ -0,0 +1,83 @@
+# backend/tests/test_result_writer.py
+# Group commits: one transaction per batch, and a bad result rolled back alone
+import sqlite3
+from concurrent.futures import Future
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models.database import AnalysisResultModel, create_db_engine, init_db
+from services.result_writer import ResultWriter
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "results.db"
+    engine = create_db_engine(f"sqlite:///{path}")
+    init_db(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all(AnalysisResultModel(id=f"a{i}", status="processing") for i in range(4))
+        db.commit()
+    yield Session, path
+    engine.dispose()
+
+
+def statuses(Session) -> dict:
+    with Session() as db:
+        return dict(db.query(AnalysisResultModel.id, AnalysisResultModel.status).all())
+
+
+def complete(analysis, db):
+    analysis.status = "completed"
+    analysis.engine = "test"
+
+
+def half_written_then_fails(analysis, db):
+    analysis.status = "completed"
+    db.flush()
+    raise ValueError("bad result")
+
+
+def test_batch_commits_together(database):
+    Session, _ = database
+    writer = ResultWriter(session_factory=Session, enabled=False)
+    writer._flush([(f"a{i}", complete, Future()) for i in range(3)])
+    assert statuses(Session) == {"a0": "completed", "a1": "completed", "a2": "completed", "a3": "processing"}
+
+
+def test_bad_result_rolls_back_alone(database):
+    Session, path = database
+    writer = ResultWriter(session_factory=Session, enabled=False)
+    seen_from_outside = []
+
+    def complete_and_look(analysis, db):
+        complete(analysis, db)
+        # Another connection must not see the batch's earlier results before the batch commits
+        with sqlite3.connect(path) as other:
+            seen_from_outside.append(dict(other.execute("SELECT id, status FROM analysis_results").fetchall()))
+
+    batch = [("a0", complete, Future()), ("a1", half_written_then_fails, Future()),
+             ("a2", complete, Future()), ("a3", complete_and_look, Future())]
+    writer._flush(batch)
+
+    assert [future.exception() is None for _, _, future in batch] == [True, False, True, True]
+    assert isinstance(batch[1][2].exception(), ValueError)
+    assert statuses(Session) == {"a0": "completed", "a1": "processing", "a2": "completed", "a3": "completed"}
+    # Looked during the redo with a savepoint per result (the first pass stopped at a1): a0 and a2 were
+    # already applied and their savepoints released, but nothing is committed until the batch is
+    assert seen_from_outside == [{"a0": "processing", "a1": "processing", "a2": "processing", "a3": "processing"}]
+    assert writer.stats()["failed"] == 1
+
+
+def test_queued_results_resolve_after_commit(database):
+    Session, _ = database
+    writer = ResultWriter(session_factory=Session, enabled=True, max_batch=8, max_delay_ms=20)
+    futures = [writer.submit(f"a{i}", half_written_then_fails if i == 2 else complete) for i in range(4)]
+    writer.close(timeout=5)
+
+    with pytest.raises(ValueError):
+        futures[2].result(timeout=1)
+    for i in (0, 1, 3):
+        futures[i].result(timeout=1)
+    assert statuses(Session) == {"a0": "completed", "a1": "completed", "a2": "processing", "a3": "completed"}
@@ -0,0 +1,161 @@
+# backend/tests/test_upload_storage.py
+# Streaming ingestion of uploads (size cap, magic-byte check, hashing, nothing left behind on failure) and
+# the validators and ranges they are served with
+import asyncio
+import hashlib
+import io
+import os
+from email.utils import formatdate
+
+import pytest
+from fastapi import UploadFile
+
+from services.upload_storage import (
+    RangeNotSatisfiable, UnsupportedImage, UploadTooLarge, byte_range, describe_upload, not_modified, store_upload,
+)
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+
+class RecordingUpload(UploadFile):
+    """UploadFile that remembers the largest read, to check ingestion holds one chunk at a time"""
+
+    largest_read = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        self.largest_read = max(self.largest_read, size)
+        return await super().read(size)
+
+
+def upload(content: bytes) -> RecordingUpload:
+    return RecordingUpload(file=io.BytesIO(content), filename="client-name.gif")
+
+
+def store(content: bytes, directory, **options):
+    return asyncio.run(store_upload(upload(content), directory, "analysis-1", **options))
+
+
+def test_multi_chunk_upload_is_hashed_and_sized(tmp_path):
+    source = upload(JPEG)
+    stored = asyncio.run(store_upload(source, tmp_path, "analysis-1", max_bytes=len(JPEG), chunk_size=1000))
+
+    assert stored.filename == "analysis-1.jpg"  # from the magic bytes, not the client's name
+    assert stored.mime == "image/jpeg"
+    assert stored.size == len(JPEG)
+    assert stored.sha256 == hashlib.sha256(JPEG).hexdigest()
+    assert stored.path.read_bytes() == JPEG
+    assert source.largest_read == 1000
+    assert [p.name for p in tmp_path.iterdir()] == ["analysis-1.jpg"]
+
+
+def test_png_signature(tmp_path):
+    assert store(PNG, tmp_path).filename == "analysis-1.png"
+
+
+def test_oversize_upload_raises_and_leaves_nothing(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        store(JPEG, tmp_path, max_bytes=len(JPEG) - 1, chunk_size=1000)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("content", [b"GIF89a" + b"\x00" * 100, b"", b"RIFF\x00\x00\x00\x00WAVE"])
+def test_unsupported_signature_raises_and_leaves_nothing(tmp_path, content):
+    with pytest.raises(UnsupportedImage):
+        store(content, tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_uploads_do_not_mix(tmp_path):
+    contents = [JPEG + bytes([i]) * (i * 500) for i in range(8)]
+
+    async def store_all():
+        return await asyncio.gather(*(
+            store_upload(upload(content), tmp_path, f"analysis-{i}", chunk_size=700)
+            for i, content in enumerate(contents)
+        ))
+
+    for content, stored in zip(contents, asyncio.run(store_all())):
+        assert stored.path.read_bytes() == content
+        assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert not list(tmp_path.glob("*.part"))
+
+
+# ---- serving ----
+
+@pytest.fixture
+def stored_info(tmp_path):
+    stored = store(JPEG, tmp_path)
+    return describe_upload(stored.path)
+
+
+def test_etag_is_the_content_hash(tmp_path, stored_info):
+    assert stored_info.etag == f'"{hashlib.sha256(JPEG).hexdigest()}"'
+    assert stored_info.mime == "image/jpeg"
+    # A copy of the same bytes (new mtime, and not seen at ingest) gets the same validator
+    copy = tmp_path / "copy.jpg"
+    copy.write_bytes(JPEG)
+    os.utime(copy, ns=(1, 1))
+    assert describe_upload(copy).etag == stored_info.etag
+
+
+def test_derived_copy_etag(tmp_path, stored_info):
+    preview = tmp_path / "analysis-1-w320.webp"
+    preview.write_bytes(b"RIFF\x00\x00\x00\x00WEBPVP8 ")
+    info = describe_upload(preview, source=stored_info.path)
+    assert info.etag == f'"{hashlib.sha256(JPEG).hexdigest()}-w320.webp"'
+    assert info.mime == "image/webp"
+
+
+def test_missing_upload(tmp_path):
+    assert describe_upload(tmp_path / "nope.jpg") is None
+    assert describe_upload(tmp_path) is None
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ('"other"', False),
+    ("*", True),
+    ("ETAG", True),
+    ("W/ETAG", True),  # weak comparison, as RFC 9110 requires for If-None-Match
+    ('"other", ETAG', True),
+    ('"other",W/ETAG', True),
+])
+def test_not_modified_if_none_match(stored_info, if_none_match, expected):
+    header = if_none_match.replace("ETAG", stored_info.etag) if if_none_match else None
+    assert not_modified(stored_info, header, None) is expected
+
+
+def test_not_modified_if_modified_since(stored_info):
+    mtime = stored_info.stat.st_mtime
+    assert not_modified(stored_info, None, formatdate(mtime + 60, usegmt=True))
+    assert not_modified(stored_info, None, stored_info.last_modified)
+    assert not not_modified(stored_info, None, formatdate(mtime - 60, usegmt=True))
+    assert not not_modified(stored_info, None, "not a date")
+    # If-None-Match takes precedence: a stale tag means a full response whatever the date says
+    assert not not_modified(stored_info, '"other"', formatdate(mtime + 60, usegmt=True))
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("items=0-9", None),           # another unit
+    ("bytes=0-9,20-29", None),     # several ranges: may be ignored
+    ("bytes=a-9", None),           # malformed
+    ("bytes=-", None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=0-0", (0, 0)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=90-500", (90, 99)),    # end clamped to the last byte
+    ("bytes=-10", (90, 99)),       # suffix: the last 10 bytes
+    ("bytes=-500", (0, 99)),       # suffix longer than the file
+    ("bytes= 5-6", (5, 6)),
+])
+def test_byte_range(header, expected):
+    assert byte_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200", "bytes=9-5", "bytes=-0"])
+def test_byte_range_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        byte_range(header, 100)
@@ -0,0 +1,63 @@
+# backend/worker.py
+"""
+Standalone analysis worker.
+
+Claims jobs from the same database queue as the API, so analyses can be
+processed in other processes or on other machines. Start the API with
+JOB_WORKER_IN_PROCESS=False to leave all processing to these workers.
+
+Run from the backend directory:
+    python worker.py --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from config import settings
+from models.database import init_db
+
+# The API module holds the analysis pipeline and the engines it uses
+from main import job_queue, build_job_payload, run_analysis_job, cloud_engine, result_writer, warm_up_engines
+from services.job_queue import JobWorker
+
+logger = logging.getLogger("worker")
+
+
+async def serve(concurrency: int, poll_interval: float) -> None:
+    worker = JobWorker(job_queue, run_analysis_job, concurrency=concurrency, poll_interval=poll_interval)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:  # Windows
+            pass
+
+    await worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL)
+    parser.add_argument("--recover", action="store_true", help="re-enqueue orphaned processing analyses first")
+    args = parser.parse_args()
+
+    init_db()
+    if args.recover:
+        job_queue.recover_orphans(build_job_payload)
+
+    # Load models before claiming anything, so the first job doesn't hold its lease through a cold start
+    warm_up_engines()
+
+    try:
+        asyncio.run(serve(args.concurrency, args.poll_interval))
+    finally:
+        result_writer.close()
+        if cloud_engine.peek():
+            cloud_engine.peek().close()
+
+
+if __name__ == "__main__":
+    main()
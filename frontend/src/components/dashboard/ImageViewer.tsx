@@ -64,7 +64,10 @@ export function ImageViewer({
 
   const displayImage = isValidImageUrl(imageUrl)
     ? (imageUrl.startsWith("/")
-      ? (imageUrl.startsWith("/api/v1")
+      ? (imageUrl.startsWith("/api/v1/uploads/")
+        // Medium derivative: the panel never shows more than ~1280px, even zoomed
+        ? `http://localhost:8000${imageUrl}?width=1280`
+        : imageUrl.startsWith("/api/v1")
         ? `http://localhost:8000${imageUrl}`
         : `${import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000'}${imageUrl}`)
       : imageUrl)
@@ -56,7 +56,8 @@ export default function ClaimsLedger() {
   const [statusFilter, setStatusFilter] = useState<string>("all");
   const [sortField, setSortField] = useState<SortField>("submittedAt");
   const [sortDirection, setSortDirection] = useState<SortDirection>("desc");
-  const [page, setPage] = useState(1);
+  const [cursor, setCursor] = useState<string | undefined>(undefined); // undefined = first page
+  const [pageCursors, setPageCursors] = useState<{ next?: string | null; prev?: string | null }>({});
   const [pageSize] = useState(10);
   const navigate = useNavigate();
 
@@ -64,7 +65,7 @@ export default function ClaimsLedger() {
   useEffect(() => {
     const timer = setTimeout(() => {
       setDebouncedSearch(searchQuery);
-      setPage(1); // reset to page 1 on new search
+      setCursor(undefined); // reset to the first page on new search
     }, 500);
     return () => clearTimeout(timer); // cancel if user keeps typing
   }, [searchQuery]);
@@ -78,10 +79,13 @@ export default function ClaimsLedger() {
         const response = await apiService.getClaims({
           status: statusFilter !== "all" ? (statusFilter as any) : undefined,
           searchQuery: debouncedSearch || undefined,
-          page,
+          cursor,
           limit: pageSize,
+          count: "none", // the ledger only pages back and forth, it never shows a total
+          view: "summary", // ledger rows don't need the nested damage analysis
         });
         setClaims(response.data);
+        setPageCursors({ next: response.nextCursor, prev: response.prevCursor });
       } catch (err) {
         setError(err instanceof Error ? err.message : "Failed to load claims");
         console.error("Error fetching claims:", err);
@@ -91,7 +95,7 @@ export default function ClaimsLedger() {
     };
 
     fetchClaims();
-  }, [statusFilter, debouncedSearch, page, pageSize]);
+  }, [statusFilter, debouncedSearch, cursor, pageSize]);
 
   const getStatusIcon = (status: Claim["status"]) => {
     switch (status) {
@@ -201,11 +205,11 @@ export default function ClaimsLedger() {
           <div className="relative">
             <Search className="absolute left-3 top-2.5 w-4 h-4 text-muted-foreground" />
             <Input
-              placeholder="Search by claim number or plate..."
+              placeholder="Search by claim number, plate or owner..."
               value={searchQuery}
               onChange={(e) => {
                 setSearchQuery(e.target.value);
-                setPage(1);
+                setCursor(undefined);
               }}
               className="pl-10"
             />
@@ -213,7 +217,7 @@ export default function ClaimsLedger() {
 
           <Select value={statusFilter} onValueChange={(value) => {
             setStatusFilter(value);
-            setPage(1);
+            setCursor(undefined);
           }}>
             <SelectTrigger>
               <SelectValue placeholder="Filter by status" />
@@ -324,7 +328,9 @@ export default function ClaimsLedger() {
                               View Details
                             </DropdownMenuItem>
                             <DropdownMenuItem
-                              onClick={() => {
+                              onClick={async () => {
+                                // The ledger lists summaries; fetch the full claim for its damages
+                                const fullClaim = await apiService.getClaim(claim.id).catch(() => claim);
                                 const report = {
                                   claimNumber: claim.claimNumber,
                                   status: claim.status,
@@ -334,8 +340,8 @@ export default function ClaimsLedger() {
                                   processedAt: claim.processedAt,
                                   aiConfidence: `${Math.round(claim.aiConfidence * 100)}%`,
                                   totalPayout: claim.totalPayout,
-                                  damages: claim.analysisResult?.damages || [],
-                                  overallSeverity: claim.analysisResult?.overallSeverity || null,
+                                  damages: fullClaim.analysisResult?.damages || [],
+                                  overallSeverity: fullClaim.analysisResult?.overallSeverity || null,
                                   adjusterNotes: claim.adjusterNotes || null,
                                   generatedAt: new Date().toISOString(),
                                 };
@@ -373,16 +379,16 @@ export default function ClaimsLedger() {
               <Button
                 variant="outline"
                 size="sm"
-                onClick={() => setPage(Math.max(1, page - 1))}
-                disabled={page === 1}
+                onClick={() => setCursor(pageCursors.prev ?? undefined)}
+                disabled={!pageCursors.prev}
               >
                 Previous
               </Button>
               <Button
                 variant="outline"
                 size="sm"
-                onClick={() => setPage(page + 1)}
-                disabled={claims.length < pageSize}
+                onClick={() => setCursor(pageCursors.next ?? undefined)}
+                disabled={!pageCursors.next}
               >
                 Next
               </Button>
@@ -19,7 +19,7 @@ import { SeverityMeter } from "@/components/dashboard/SeverityMeter";
 import { PayoutDisplay } from "@/components/dashboard/PayoutDisplay";
 import { InsuranceDetailsPanel } from "@/components/dashboard/InsuranceDetailsPanel";
 import { AppLayout } from "@/components/layout/AppLayout";
-import { apiService, AnalysisResult, Claim, InsuranceDetailsResponse } from "@/services/apiService";
+import { apiService, AnalysisEvent, AnalysisResult, Claim, InsuranceDetailsResponse } from "@/services/apiService";
 
 export default function Dashboard() {
   const [searchParams] = useSearchParams();
@@ -29,6 +29,7 @@ export default function Dashboard() {
   const [insuranceDetails, setInsuranceDetails] = useState<InsuranceDetailsResponse | null>(null);
   const [loading, setLoading] = useState(true);
   const [polling, setPolling] = useState(false);
+  const [progress, setProgress] = useState<AnalysisEvent | null>(null);
   const [error, setError] = useState<string | null>(null);
   const navigate = useNavigate();
 
@@ -64,7 +65,7 @@ export default function Dashboard() {
     }
   };
 
-  // Fetch analysis with polling
+  // Fetch analysis, then wait for it on the push channel (polling if that fails)
   useEffect(() => {
     if (!analysisId) {
       setError("No analysis ID provided");
@@ -72,6 +73,9 @@ export default function Dashboard() {
       return;
     }
 
+    let closeStream: (() => void) | null = null;
+    let pushFailed = false;
+
     const fetchAnalysis = async () => {
       try {
         setError(null);
@@ -83,10 +87,28 @@ export default function Dashboard() {
           setSelectedDamageId(data.damages[0].id);
         }
 
-        // If still processing, poll again after 3 seconds
         if (data.status === "processing") {
           setPolling(true);
-          setTimeout(fetchAnalysis, 3000);
+          if (pushFailed) {
+            // No event stream: poll again after 3 seconds
+            setTimeout(fetchAnalysis, 3000);
+          } else if (!closeStream) {
+            closeStream = apiService.subscribeToAnalysis(
+              analysisId,
+              (event) => {
+                setProgress(event);
+                if (event.status !== "processing") {
+                  closeStream = null;
+                  fetchAnalysis();
+                }
+              },
+              () => {
+                closeStream = null;
+                pushFailed = true;
+                fetchAnalysis();
+              },
+            );
+          }
         } else {
           setPolling(false);
           setLoading(false);
@@ -108,6 +130,7 @@ export default function Dashboard() {
     };
 
     fetchAnalysis();
+    return () => closeStream?.();
   }, [analysisId]);
 
   const fetchInsuranceDetails = async (id: string) => {
@@ -141,7 +164,9 @@ export default function Dashboard() {
             Analyzing vehicle damage...
           </p>
           <p className="text-muted-foreground">
-            This may take 10-15 seconds. Please wait.
+            {progress
+              ? `${progress.progress}% · ${progress.stage.replace("_", " ")}${progress.backend ? ` (${progress.backend})` : ""}`
+              : "This may take 10-15 seconds. Please wait."}
           </p>
         </div>
       </AppLayout>
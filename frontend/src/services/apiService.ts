@@ -72,14 +72,20 @@ export interface ClaimFilters {
   searchQuery?: string;
   page?: number;
   limit?: number;
+  cursor?: string;
+  count?: 'exact' | 'estimate' | 'none';
+  view?: 'full' | 'summary';
+  fields?: string;
 }
 
 export interface PaginatedResponse<T> {
   data: T[];
-  total: number;
+  total: number | null;
   page: number;
   limit: number;
-  totalPages: number;
+  totalPages: number | null;
+  nextCursor?: string | null;
+  prevCursor?: string | null;
 }
 
 export interface UploadResponse {
@@ -88,6 +94,19 @@ export interface UploadResponse {
   estimatedTime: number; // seconds
 }
 
+// Pushed by /analysis/{id}/events as the pipeline moves through its stages
+export interface AnalysisEvent {
+  analysisId: string;
+  stage: 'queued' | 'processing' | 'started' | 'cloud_attempt' | 'local_fallback' | 'saving' | 'retrying' | 'completed' | 'failed';
+  status: 'processing' | 'completed' | 'failed';
+  progress: number; // 0-100
+  at: string;
+  backend?: string; // cloud_attempt
+  attempt?: number; // cloud_attempt
+  jobAttempt?: number;
+  error?: string;
+}
+
 export interface ReportRequest {
   claimId: string;
   includeImages: boolean;
@@ -261,6 +280,28 @@ class ApiService {
     return this.request(`/analysis/${analysisId}/status`);
   }
 
+  // Server-Sent Events instead of polling; returns a function that closes the stream
+  subscribeToAnalysis(
+    analysisId: string,
+    onEvent: (event: AnalysisEvent) => void,
+    onError: () => void,
+  ): () => void {
+    const source = new EventSource(`${this.baseUrl}/analysis/${analysisId}/events`);
+    source.onmessage = (message) => {
+      const event: AnalysisEvent = JSON.parse(message.data);
+      if (event.status !== 'processing') {
+        source.close();
+      }
+      onEvent(event);
+    };
+    source.onerror = () => {
+      // Don't let EventSource reconnect forever; the caller falls back to polling
+      source.close();
+      onError();
+    };
+    return () => source.close();
+  }
+
   // ============================================
   // CLAIMS ENDPOINTS
   // ============================================